@@ -10,11 +10,20 @@ import yaml
 from config import ALLOW_ORIGINS, ARROW_INFER_CONFIG, LOG_DIR, PERSON_INFER_CONFIG
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import auth, user, weather, webrtc, ws
+from routers import auth, camera, stats, user, weather, webrtc, ws
 from services.arrow.registry import arrow_registry
+from services.arrow.scheduler import HitScheduler
+from services.arrow.visualizer import hit_visualizer
+from services.events.bus import event_bus
+from services.events.hub import event_hub
+from services.frame.history import FRAME_HISTORY_ENABLED, frame_history
+from services.monitor.loop_lag import loop_lag_monitor
 from services.person.registry import person_registry
+from services.recorder.recorder import RECORD_ENABLED, event_recorder
 from services.weather.service import weather_loop
-from subscriber import start_subscriber_thread
+from services.webrtc.broadcaster import compose_executor
+from subscriber import ingest_engine
+from utils.event_codec import SUPPORTED_FORMATS
 from utils.zmq_utils import get_req_socket
 
 os.makedirs(LOG_DIR, exist_ok=True)
@@ -37,82 +46,91 @@ except Exception:
 logger = logging.getLogger("smartbow")
 
 
-def on_arrow_event(cam_id, event):
-    # logger.info(f"DEBUG: [화살 이벤트 수신] 카메라: {cam_id}, 데이터: {event}")
+def on_arrow_event(cam_id, events):
+    event_recorder.record(cam_id, "arrow", events)
+
     arrow_service = arrow_registry.get(cam_id)
     if arrow_service is None:
         logger.warning(f"화살 서비스를 찾을 수 없음 - 카메라 ID: {cam_id}")
         return
 
-    event_type = event.get("type")
-
-    if event_type == "arrow":
-        arrow_service.add_event(event)
-        return
+    arrow_service.add_events(events)
 
-    elif event_type == "splash":
-        arrow_service.add_splash_event(event)
-        return
 
+def on_person_event(cam_id, events):
+    event_recorder.record(cam_id, "person", events)
 
-def on_person_event(cam_id, event):
     person_service = person_registry.get(cam_id)
     if person_service is None:
         logger.warning(f"사람 감지 서비스를 찾을 수 없음 - 카메라 ID: {cam_id}")
         return
-    person_service.update_detections(event["person"])
+    person_service.update_batch(events)
 
 
-def idle_watcher():
-    """화살 적중 감지 백그라운드 워커"""
-    logger.info("화살 적중 감지 스레드 시작")
+def judge_camera(cam_id):
+    """카메라가 idle 상태가 되는 시각에 호출되는 화살 적중 판정
 
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
+    다음 판정 시각을 반환 (None 이면 다음 이벤트까지 대기)
+    """
+    arrow_service = arrow_registry.get(cam_id)
 
-    while True:
+    def on_hit(hit):
+        logger.info(
+            f"🎯 [HIT 발견] 카메라: {cam_id}, 좌표: {hit['point']}, 과녁 안: {hit['inside']}"
+        )
+
+        # 전송은 서버 이벤트 루프가 맡고 판정 스레드는 게시만 하고 바로 돌아감
+        # (허브가 켜져 있으면 모든 워커로 퍼짐)
+        event_hub.publish(
+            cam_id,
+            {
+                "type": "hit",
+                "tip": hit["point"],
+                "inside": hit["inside"],
+                "ts": arrow_service.last_hit_time,
+            },
+        )
+
+        # idle 판정 시각부터 게시까지 지연 (게시 → 전달 지연은 /stats/events)
+        idle_at = arrow_service.last_event_time + arrow_service.idle_sec
+        logger.debug(
+            f"적중 게시 지연 - 카메라: {cam_id}, {(time.time() - idle_at) * 1000:.1f}ms"
+        )
+
+        # 시각화는 게시 뒤에 복사본만 떠두고 워커에서 렌더링 / 저장
+        # (버퍼는 judge 가 on_hit 이 끝난 뒤에 비움)
         try:
-            for cam_id, arrow_service in list(arrow_registry.items()):
-                try:
-                    if arrow_service.is_idle():
-                        hit = arrow_service.find_hit_point()
-                        if hit is not None:
-                            logger.info(
-                                f"🎯 [HIT 발견] 카메라: {cam_id}, 좌표: {hit['point']}, 과녁 안: {hit['inside']}"
-                            )
-                            arrow_service.last_hit_time = time.time()
-
-                            try:
-                                arrow_service.visualize_buffer(
-                                    hit["point"], hit["type"], hit["h"]
-                                )
-                            except Exception as e:
-                                logger.error(
-                                    f"버퍼 시각화 실패 - 카메라: {cam_id}, 오류: {e}"
-                                )
-
-                            loop.run_until_complete(
-                                ws.broadcast(
-                                    cam_id,
-                                    {
-                                        "type": "hit",
-                                        "tip": hit["point"],
-                                        "inside": hit["inside"],
-                                    },
-                                )
-                            )
-
-                        arrow_service.clear_buffer()
-                except Exception as e:
-                    logger.error(
-                        f"화살 적중 처리 중 오류 발생 - 카메라: {cam_id}, 오류: {e}",
-                        exc_info=True,
-                    )
-
-            time.sleep(0.1)
+            snapshot = arrow_service.snapshot_hit(hit["point"], hit["type"], hit["h"])
         except Exception as e:
-            logger.critical(f"화살 감지 워커 오류: {e}", exc_info=True)
-            time.sleep(1)
+            logger.error(f"버퍼 시각화 실패 - 카메라: {cam_id}, 오류: {e}")
+            return
+
+        hit_visualizer.submit(snapshot)
+
+    arrow_service.judge(on_hit=on_hit)
+    return arrow_service.next_deadline()
+
+
+def expire_camera(cam_id):
+    """judge 가 아닌 워커용: 판정은 하지 않고 idle 이 되면 화면 표시 / 버퍼만 정리"""
+    arrow_service = arrow_registry.get(cam_id)
+    if arrow_service.is_idle():
+        arrow_service.clear_buffer()
+    return arrow_service.next_deadline()
+
+
+def apply_hit(cam_id, event):
+    """judge 가 아닌 워커용: 허브로 받은 적중 시각으로 쿨다운 시작 / 버퍼 정리"""
+    arrow_registry.get(cam_id).apply_hit(event.get("ts") or time.time())
+
+
+def apply_target(cam_id, event):
+    """허브로 받은 과녁을 이 워커의 ArrowService 에 반영 (같은 과녁이면 무시됨)"""
+    if "target" in event:
+        arrow_registry.get(cam_id).set_target(event["target"], event["frame_size"])
+
+
+hit_scheduler = HitScheduler(judge_camera)
 
 
 @asynccontextmanager
@@ -121,6 +139,35 @@ async def lifespan(app: FastAPI):
     logger.info("SmartBow 서버 시작 중...")
     logger.info("=" * 60)
 
+    # 워커가 여럿이면 judge 잠금을 잡은 워커 하나만 판정 / 기록 / 적중 시각화
+    is_judge = event_hub.claim_judge()
+
+    if RECORD_ENABLED and is_judge:
+        event_recorder.start()
+
+    if is_judge:
+        hit_visualizer.start()
+    loop_lag_monitor.start()
+
+    event_bus.subscribe("polygon", apply_target)
+    if not is_judge:
+        event_bus.subscribe("hit", apply_hit)
+    ws.attach_event_bus(event_bus)
+    event_bus.start(asyncio.get_running_loop())
+    event_hub.start(event_bus)
+
+    if not is_judge:
+        hit_scheduler.handler = expire_camera
+    arrow_registry.attach_scheduler(hit_scheduler)
+    hit_scheduler.start()
+    if is_judge:
+        logger.info("화살 적중 판정 스케줄러 시작")
+    else:
+        logger.info("화살 표시 정리 스케줄러 시작 (판정은 judge 워커 담당)")
+
+    ingest_engine.start()
+    logger.info("이벤트 수신 엔진 시작")
+
     logger.info(f"화살 추론 서비스 초기화 시작 (총 {len(ARROW_INFER_CONFIG)} 개)")
     for cam_key, config in ARROW_INFER_CONFIG.items():
         cam_id = config["id"]
@@ -128,7 +175,7 @@ async def lifespan(app: FastAPI):
 
         try:
             logger.info(f"  → 카메라 연결 시도: {cam_id} (식별자: {ipc_name})")
-            start_subscriber_thread(ipc_name, cam_id, on_arrow_event)
+            ingest_engine.subscribe(ipc_name, cam_id, on_arrow_event)
             logger.info(f"  ✓ 카메라 연결 성공: {cam_id}")
         except Exception as e:
             logger.error(f"  ✗ 카메라 연결 실패: {cam_id} - {e}")
@@ -140,25 +187,55 @@ async def lifespan(app: FastAPI):
         while True:
             try:
                 req = get_req_socket(target_port)
-                req.send_json({"type": "get_target"})
+                # accept: 지원하는 이벤트 전송 포맷 (미지원 추론 서버는 무시하고 JSON 유지)
+                req.send_json({"type": "get_target", "accept": SUPPORTED_FORMATS})
                 resp = req.recv_json()
 
                 arrow_service = arrow_registry.get(cam_id)
                 arrow_service.set_target(
                     target=resp["target"], frame_size=resp["frame_size"]
                 )
+                event_recorder.record(
+                    cam_id,
+                    "target",
+                    [{"target": resp["target"], "frame_size": resp["frame_size"]}],
+                )
+                event_hub.publish(
+                    cam_id,
+                    {
+                        "type": "polygon",
+                        "target": resp["target"],
+                        "frame_size": resp["frame_size"],
+                    },
+                )
                 break
             except Exception as e:
                 logger.error(f"[{cam_id}] 과녁 영역 초기화 실패 {e}")
                 time.sleep(60)
 
+    # 워커가 여럿이면 WebRTC 시청자가 다른 워커에 붙어 judge 워커의 last_frame 이 비어 있을 수
+    # 있으므로, 허브가 켜져 있으면 judge 워커는 히스토리를 항상 켬 (적중 이미지 프레임 확보)
+    if is_judge and (FRAME_HISTORY_ENABLED or event_hub.enabled):
+        if not FRAME_HISTORY_ENABLED:
+            logger.info("이벤트 허브 사용 중 - judge 워커 프레임 히스토리 강제 사용")
+        # 판정은 적중 시각보다 최대 idle_sec + 버퍼 길이(이벤트 수 / 이벤트 fps) 늦게 돌므로
+        # 그만큼만 보관
+        window_sec = 0.0
+        for cam_key, config in ARROW_INFER_CONFIG.items():
+            cam_id = config["id"]
+            frame_history.add_camera(cam_id)
+            window_sec = max(window_sec, arrow_registry.get(cam_id).hit_window_sec())
+        frame_history.set_window(window_sec)
+        frame_history.start()
+        logger.info(f"프레임 히스토리 수집 시작 - 카메라당 {frame_history.size}프레임")
+
     logger.info(f"사람 감지 서비스 초기화 시작 (총 {len(PERSON_INFER_CONFIG)}개)")
     for cam_key, config in PERSON_INFER_CONFIG.items():
         cam_id = config["id"]
         ipc_name = config["infer_port"]
         try:
             logger.info(f"  → 카메라 연결 시도: {cam_id} (식별자: {ipc_name})")
-            start_subscriber_thread(ipc_name, cam_id, on_person_event)
+            ingest_engine.subscribe(ipc_name, cam_id, on_person_event)
             logger.info(f"  ✓ 카메라 연결 성공: {cam_id}")
         except Exception as e:
             logger.error(f"  ✗ 카메라 연결 실패: {cam_id} - {e}")
@@ -167,8 +244,6 @@ async def lifespan(app: FastAPI):
     weather_thread.start()
     logger.info("날씨 백그라운드 워커 시작")
 
-    t = threading.Thread(target=idle_watcher, daemon=True)
-    t.start()
     logger.info("백그라운드 워커 시작 완료")
 
     logger.info("=" * 60)
@@ -181,6 +256,16 @@ async def lifespan(app: FastAPI):
     logger.info("SmartBow 서버 종료 중...")
     logger.info("=" * 60)
 
+    ingest_engine.stop()
+    hit_scheduler.stop()
+    event_hub.stop()
+    event_bus.stop()
+    event_recorder.stop()
+    hit_visualizer.stop()
+    frame_history.stop()
+    await loop_lag_monitor.stop()
+    compose_executor.shutdown(wait=False, cancel_futures=True)
+
 
 app = FastAPI(
     title="SmartBow",
@@ -200,6 +285,8 @@ app.include_router(ws.router, prefix="/ws", tags=["ws"])
 app.include_router(auth.router, prefix="/auth", tags=["auth"])
 app.include_router(user.router, prefix="/user", tags=["user"])
 app.include_router(weather.router, prefix="/weather", tags=["weather"])
+app.include_router(stats.router, prefix="/stats", tags=["stats"])
+app.include_router(camera.router, prefix="/camera", tags=["camera"])
 
 
 @app.get("/")
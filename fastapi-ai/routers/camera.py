@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import os
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from services.arrow.registry import arrow_registry
+from services.frame.camera_shape import get_arrow_camera_ids
+from services.person.registry import person_registry
+from services.webrtc.jpeg_cache import get_jpeg_cache
+
+logger = logging.getLogger("smartbow.camera")
+
+router = APIRouter()
+
+SNAPSHOT_TIMEOUT_SEC = float(os.getenv("SMARTBOW_SNAPSHOT_TIMEOUT_SEC", "3"))
+MJPEG_BOUNDARY = "frame"
+NO_CACHE = {"Cache-Control": "no-store"}
+
+
+def _jpeg_cache(cam_id: str):
+    """(JpegCache, None), 열 수 없으면 (None, 오류 응답)
+
+    설정에 없는 id 는 레지스트리에 서비스를 만들기 전에 404 로 거른다.
+    """
+    if cam_id not in get_arrow_camera_ids():
+        logger.warning(f"알 수 없는 카메라 ID 요청: {cam_id}")
+        return None, JSONResponse(
+            {"detail": f"Unknown camera id: {cam_id}"}, status_code=404
+        )
+
+    try:
+        cache = get_jpeg_cache(
+            cam_id, arrow_registry.get(cam_id), person_registry.get(cam_id)
+        )
+    except (FileNotFoundError, ValueError) as e:
+        # 프레임 생산자가 아직 공유 메모리를 만들지 않았거나 헤더가 맞지 않음
+        logger.warning(f"프레임 버퍼 열기 실패 - 카메라: {cam_id}, 오류: {e}")
+        return None, JSONResponse(
+            {"detail": "Camera stream not available"}, status_code=503
+        )
+    return cache, None
+
+
+async def _multipart(frames):
+    async for jpeg in frames:
+        yield (
+            f"--{MJPEG_BOUNDARY}\r\n"
+            "Content-Type: image/jpeg\r\n"
+            f"Content-Length: {len(jpeg)}\r\n\r\n"
+        ).encode() + jpeg + b"\r\n"
+
+
+@router.get("/{cam_id}/snapshot.jpg")
+async def snapshot(cam_id: str):
+    cache, error = _jpeg_cache(cam_id)
+    if cache is None:
+        return error
+
+    try:
+        seq, jpeg = await cache.snapshot(SNAPSHOT_TIMEOUT_SEC)
+    except asyncio.TimeoutError:
+        logger.warning(f"스냅샷 프레임 없음 - 카메라: {cam_id}")
+        return JSONResponse({"detail": "No frame available"}, status_code=503)
+
+    return Response(
+        jpeg, media_type="image/jpeg", headers={**NO_CACHE, "X-Frame-Seq": str(seq)}
+    )
+
+
+@router.get("/{cam_id}/mjpeg")
+async def mjpeg(cam_id: str, fps: float | None = None):
+    cache, error = _jpeg_cache(cam_id)
+    if cache is None:
+        return error
+
+    return StreamingResponse(
+        _multipart(cache.frames(fps)),
+        media_type=f"multipart/x-mixed-replace; boundary={MJPEG_BOUNDARY}",
+        headers=NO_CACHE,
+    )
@@ -0,0 +1,64 @@
+from fastapi import APIRouter
+from routers.ws import get_ws_stats
+from services.arrow.visualizer import hit_visualizer
+from services.events.bus import event_bus
+from services.events.hub import event_hub
+from services.monitor.loop_lag import loop_lag_monitor
+from services.person.registry import person_registry
+from services.recorder.recorder import event_recorder
+from services.webrtc.broadcaster import get_broadcaster_stats
+from services.webrtc.jpeg_cache import get_jpeg_cache_stats
+from services.webrtc.mosaic import get_mosaic_stats
+from services.webrtc.peers import peer_registry
+from subscriber import ingest_engine
+
+router = APIRouter()
+
+
+@router.get("/ingest")
+def get_ingest_stats():
+    return {"sockets": ingest_engine.get_stats()}
+
+
+@router.get("/recorder")
+def get_recorder_stats():
+    return event_recorder.get_stats()
+
+
+@router.get("/visualizer")
+def get_visualizer_stats():
+    return hit_visualizer.get_stats()
+
+
+@router.get("/loop")
+async def get_loop_stats():
+    return loop_lag_monitor.get_stats()
+
+
+@router.get("/person")
+async def get_person_stats():
+    # 레지스트리는 수신 스레드에서도 추가되므로 복사본으로 순회
+    services = list(person_registry.items())
+    return {cam_id: service.get_stats() for cam_id, service in services}
+
+
+# 브로드캐스터 / 모자이크 / JPEG 캐시 / 피어 목록은 이벤트 루프에서만 바뀌므로
+# 스레드풀이 아니라 루프에서 순회 (연결 / 해제 중 "changed size during iteration" 방지)
+@router.get("/webrtc")
+async def get_webrtc_stats():
+    return {
+        "cameras": get_broadcaster_stats(),
+        "mosaic": get_mosaic_stats(),
+        "jpeg": get_jpeg_cache_stats(),
+        "peers": peer_registry.get_stats(),
+    }
+
+
+@router.get("/ws")
+async def get_websocket_stats():
+    return get_ws_stats()
+
+
+@router.get("/events")
+def get_event_bus_stats():
+    return {**event_bus.get_stats(), "hub": event_hub.get_stats()}
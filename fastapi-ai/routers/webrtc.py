@@ -1,114 +1,234 @@
-import asyncio
 import logging
 
 from aiortc import RTCPeerConnection, RTCSessionDescription
 from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
+from routers.ws import max_video_size
 from services.arrow.registry import arrow_registry
-from services.frame.camera_shape import get_camera_shape
+from services.frame.camera_shape import get_arrow_camera_ids
 from services.person.registry import person_registry
-from services.webrtc.video_track import CameraVideoTrack
+from services.webrtc.adaptation import PeerAdapter
+from services.webrtc.mosaic import MOSAIC_MAX_CAMERAS, get_mosaic, get_mosaic_layout
+from services.webrtc.peers import RETRY_AFTER_SEC, peer_registry
+from services.webrtc.video_track import BroadcastVideoTrack, CameraVideoTrack
 
 logger = logging.getLogger("smartbow.webrtc")
 
 router = APIRouter()
-pcs = set()
+
+
+def admission_error(label: str):
+    """시청자 수 제한에 걸리면 503 응답, 아니면 None
+
+    통과한 뒤에는 await 없이 바로 negotiate() 를 호출해야 제한이 지켜짐
+    """
+    reason = peer_registry.reject_reason(label)
+    if reason is None:
+        return None
+    logger.warning(f"WebRTC 연결 거부 - 카메라: {label}, 사유: {reason}")
+    return JSONResponse(
+        {"detail": reason},
+        status_code=503,
+        headers={"Retry-After": str(RETRY_AFTER_SEC)},
+    )
+
+
+async def parse_offer(request: Request, label: str):
+    """요청 본문 (params, RTCSessionDescription), 형식이 잘못되면 (JSONResponse, None)"""
+    try:
+        params = await request.json()
+        offer = RTCSessionDescription(sdp=params["sdp"], type=params["type"])
+    except KeyError as e:
+        logger.error(f"요청 필드 누락 - 카메라: {label}, 필드: {e}")
+        return (
+            JSONResponse({"detail": f"Missing required field: {e}"}, status_code=400),
+            None,
+        )
+    except Exception as e:
+        logger.error(f"요청 파싱 실패 - 카메라: {label}, 오류: {e}")
+        return JSONResponse({"detail": "Invalid request format"}, status_code=400), None
+    return params, offer
+
+
+async def negotiate(offer, label: str, make_track, size_cap=None):
+    """PeerConnection 을 만들어 make_track() 트랙을 붙이고 answer 반환"""
+    pc = RTCPeerConnection()
+    peer = peer_registry.add(pc, label)
+
+    @pc.on("connectionstatechange")
+    async def on_connectionstatechange():
+        state = pc.connectionState
+        logger.info(f"연결 상태 변경 - 카메라: {label}, 상태: {state}")
+        peer_registry.update_state(pc)
+
+        if state in ("failed", "closed"):
+            await peer_registry.close(pc)
+            logger.info(
+                f"PeerConnection 제거 - 카메라: {label} "
+                f"(남은 연결: {len(peer_registry)}개)"
+            )
+
+    @pc.on("iceconnectionstatechange")
+    async def on_iceconnectionstatechange():
+        logger.debug(f"ICE 연결 상태 - 카메라: {label}, 상태: {pc.iceConnectionState}")
+
+    try:
+        video_track = make_track()
+        pc.addTrack(video_track)
+        peer.track = video_track
+        logger.debug(f"비디오 트랙 추가 완료 - 카메라: {label}")
+
+        # 연결 상태에 따라 fps / 해상도 조정
+        video_track.adapter = PeerAdapter(pc, video_track, size_cap=size_cap)
+        video_track.adapter.start()
+    except Exception as e:
+        logger.error(f"트랙 추가 실패 - 카메라: {label}, 오류: {e}")
+        await peer_registry.close(pc)
+        raise
+
+    try:
+        await pc.setRemoteDescription(offer)
+        answer = await pc.createAnswer()
+        await pc.setLocalDescription(answer)
+        logger.info(f"WebRTC 협상 완료 - 카메라: {label}")
+    except Exception as e:
+        logger.error(f"WebRTC 협상 실패 - 카메라: {label}, 오류: {e}", exc_info=True)
+        await peer_registry.close(pc)
+        raise
+    return {
+        "sdp": pc.localDescription.sdp,
+        "type": pc.localDescription.type,
+    }
 
 
 @router.post("/offer/{cam_id}")
 async def offer(cam_id: str, request: Request):
     try:
-        arrow_service = arrow_registry.get(cam_id)
-        person_service = person_registry.get(cam_id)
-
-        if arrow_service is None or person_service is None:
+        # 설정에 없는 id 는 레지스트리에 서비스를 만들기 전에 거름 (routers.camera 와 같음)
+        if cam_id not in get_arrow_camera_ids():
             logger.warning(f"알 수 없는 카메라 ID 요청: {cam_id}")
             return JSONResponse(
                 {"detail": f"Unknown camera id: {cam_id}"}, status_code=404
             )
 
-        try:
-            params = await request.json()
-            offer = RTCSessionDescription(sdp=params["sdp"], type=params["type"])
-        except KeyError as e:
-            logger.error(f"요청 필드 누락 - 카메라: {cam_id}, 필드: {e}")
-            return JSONResponse(
-                {"detail": f"Missing required field: {e}"}, status_code=400
-            )
-        except Exception as e:
-            logger.error(f"요청 파싱 실패 - 카메라: {cam_id}, 오류: {e}")
-            return JSONResponse({"detail": "Invalid request format"}, status_code=400)
-
-        pc = RTCPeerConnection()
-        pcs.add(pc)
-
-        @pc.on("connectionstatechange")
-        async def on_connectionstatechange():
-            state = pc.connectionState
-            logger.info(f"연결 상태 변경 - 카메라: {cam_id}, 상태: {state}")
-
-            if state in ("failed", "closed"):
-                pcs.discard(pc)
-                await pc.close()
-                logger.info(
-                    f"PeerConnection 제거 - 카메라: {cam_id} (남은 연결: {len(pcs)}개)"
-                )
-
-        @pc.on("iceconnectionstatechange")
-        async def on_iceconnectionstatechange():
-            logger.debug(
-                f"ICE 연결 상태 - 카메라: {cam_id}, 상태: {pc.iceConnectionState}"
-            )
+        arrow_service = arrow_registry.get(cam_id)
+        person_service = person_registry.get(cam_id)
 
-        try:
-            shape = get_camera_shape(cam_id)
-            video_track = CameraVideoTrack(
+        params, offer = await parse_offer(request, cam_id)
+        if offer is None:
+            return params
+
+        rejected = admission_error(cam_id)
+        if rejected is not None:
+            return rejected
+
+        # WebSocket 으로 보고된 표시 크기가 해상도 상한
+        return await negotiate(
+            offer,
+            cam_id,
+            lambda: CameraVideoTrack(
                 cam_id=cam_id,
-                shape=shape,
                 arrow_service=arrow_service,
                 person_service=person_service,
-            )
-            pc.addTrack(video_track)
-            logger.debug(f"비디오 트랙 추가 완료 - 카메라: {cam_id}")
-        except Exception as e:
-            logger.error(f"트랙 추가 실패 - 카메라: {cam_id}, 오류: {e}")
-            pcs.discard(pc)
-            raise
-
-        try:
-            await pc.setRemoteDescription(offer)
-            answer = await pc.createAnswer()
-            await pc.setLocalDescription(answer)
-            logger.info(f"WebRTC 협상 완료 - 카메라: {cam_id}")
-        except Exception as e:
-            logger.error(
-                f"WebRTC 협상 실패 - 카메라: {cam_id}, 오류: {e}", exc_info=True
-            )
-            pcs.discard(pc)
-            await pc.close()
-            raise
-        return {
-            "sdp": pc.localDescription.sdp,
-            "type": pc.localDescription.type,
-        }
+            ),
+            size_cap=lambda: max_video_size(cam_id),
+        )
 
     except Exception as e:
         logger.error(f"예상치 못한 오류 - 카메라: {cam_id}, 오류: {e}", exc_info=True)
         return JSONResponse({"detail": "Internal server error"}, status_code=500)
 
 
+def mosaic_cameras(cams):
+    """요청한 카메라 목록 (쉼표 구분 문자열 또는 리스트, 없으면 설정된 전체 카메라)
+
+    (cam_ids, None), 잘못된 요청이면 (None, 오류 응답).
+    중복을 없애고 설정 순서로 정렬해 같은 조합은 같은 모자이크를 공유한다.
+    """
+    configured = get_arrow_camera_ids()
+    if isinstance(cams, str):
+        cams = [cam.strip() for cam in cams.split(",") if cam.strip()]
+    elif cams is not None and not (
+        isinstance(cams, list) and all(isinstance(cam, str) for cam in cams)
+    ):
+        return None, JSONResponse(
+            {"detail": "cams must be a list of camera ids"}, status_code=400
+        )
+
+    if not cams:
+        cams = configured
+    if not cams:
+        return None, JSONResponse({"detail": "No cameras configured"}, status_code=404)
+
+    unknown = sorted(set(cams) - set(configured))
+    if unknown:
+        logger.warning(f"알 수 없는 모자이크 카메라 요청: {unknown}")
+        return None, JSONResponse(
+            {"detail": f"Unknown camera ids: {','.join(unknown)}"}, status_code=404
+        )
+
+    requested = set(cams)
+    cam_ids = [cam_id for cam_id in configured if cam_id in requested]
+    if len(cam_ids) > MOSAIC_MAX_CAMERAS:
+        return None, JSONResponse(
+            {"detail": f"Too many cameras (max {MOSAIC_MAX_CAMERAS})"},
+            status_code=400,
+        )
+    return cam_ids, None
+
+
+@router.get("/mosaic/layout")
+async def mosaic_layout(cams: str | None = None):
+    cam_ids, error = mosaic_cameras(cams)
+    if cam_ids is None:
+        return error
+    return get_mosaic_layout(cam_ids).to_dict()
+
+
+@router.post("/mosaic/offer")
+async def mosaic_offer(request: Request):
+    """여러 카메라를 그리드 하나로 합성한 트랙 (개요 화면용)
+
+    본문: {"sdp", "type", "cams": [...]} (cams 생략 시 전체 카메라)
+    응답에 타일 배치(layout)가 함께 오며, 타일 클릭 시 /offer/{cam_id} 로 전환
+    """
+    try:
+        params, offer = await parse_offer(request, "mosaic")
+        if offer is None:
+            return params
+
+        cam_ids, error = mosaic_cameras(params.get("cams"))
+        if cam_ids is None:
+            return error
+
+        rejected = admission_error("mosaic")
+        if rejected is not None:
+            return rejected
+
+        # 모자이크는 트랙을 만들 때 가져와 바로 구독 (실패해도 캐시에 빈 모자이크가 남지 않게)
+        answer = await negotiate(
+            offer, "mosaic", lambda: BroadcastVideoTrack("mosaic", get_mosaic(cam_ids))
+        )
+        answer["layout"] = get_mosaic_layout(cam_ids).to_dict()
+        return answer
+
+    except Exception as e:
+        logger.error(f"예상치 못한 오류 - 모자이크, 오류: {e}", exc_info=True)
+        return JSONResponse({"detail": "Internal server error"}, status_code=500)
+
+
 @router.on_event("shutdown")
 async def on_shutdown():
     logger.info("=" * 60)
     logger.info("WebRTC 서비스 종료 시작")
     logger.info("=" * 60)
 
-    if pcs:
-        logger.info(f"PeerConnection 종료 중... (총 {len(pcs)}개)")
-        await asyncio.gather(*(pc.close() for pc in pcs), return_exceptions=True)
-        pcs.clear()
+    if len(peer_registry):
+        logger.info(f"PeerConnection 종료 중... (총 {len(peer_registry)}개)")
+        await peer_registry.stop()
         logger.info("  ✓ 모든 PeerConnection 종료 완료")
     else:
+        await peer_registry.stop()
         logger.info("종료할 PeerConnection 없음")
 
     logger.info("=" * 60)
@@ -1,60 +1,325 @@
+import asyncio
 import logging
+import math
+import os
+import time
+from collections import defaultdict
 
+import orjson
 from fastapi import APIRouter, WebSocket
 from services.arrow.registry import arrow_registry
+from services.arrow.trajectory import (
+    TRAJECTORY_DEFAULT_FPS,
+    TRAJECTORY_MAX_FPS,
+    TrajectoryStream,
+    encode_trajectory,
+    render_trajectory,
+)
 from starlette.websockets import WebSocketDisconnect
 
 logger = logging.getLogger("smartbow.ws")
 
 router = APIRouter()
 
-connected_clients: dict[str, dict[WebSocket, dict]] = {}
+WS_SEND_TIMEOUT_SEC = float(os.getenv("SMARTBOW_WS_SEND_TIMEOUT_SEC", "2.0"))
+WS_SEND_QUEUE = int(os.getenv("SMARTBOW_WS_SEND_QUEUE", "16"))
+WS_SLOW_CLOSE_CODE = 1013  # Try Again Later
+
+
+class WsClient:
+    """WebSocket 클라이언트 하나의 송신 큐 / 송신 작업
+
+    브로드캐스트는 큐에 넣기만 하고, 실제 전송은 클라이언트별 작업이 한다.
+    큐가 가득 차거나 전송이 send_timeout 을 넘기면 느린 클라이언트로 보고 연결을 끊는다.
+    큐에는 텍스트(JSON) 메시지와 바이너리(msgpack 궤적) 프레임이 함께 들어간다.
+    """
+
+    def __init__(
+        self,
+        ws: WebSocket,
+        cam_id: str,
+        maxsize=WS_SEND_QUEUE,
+        timeout=WS_SEND_TIMEOUT_SEC,
+    ):
+        self.ws = ws
+        self.cam_id = cam_id
+        self.video_size = None
+        self.trajectory = None  # TrajectoryStream (궤적 구독 시)
+        self.evicted = False
+        self.timeout = timeout
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.task = asyncio.ensure_future(self._send_loop())
+        self.sent = 0
+
+    def offer(self, text: str | bytes):
+        """송신 큐에 추가, 큐가 가득 찼으면 False"""
+        try:
+            self.queue.put_nowait(text)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _send_loop(self):
+        try:
+            while True:
+                text = await self.queue.get()
+                if isinstance(text, bytes):
+                    send = self.ws.send_bytes(text)
+                else:
+                    send = self.ws.send_text(text)
+                await asyncio.wait_for(send, timeout=self.timeout)
+                self.sent += 1
+        except asyncio.CancelledError:
+            pass
+        except asyncio.TimeoutError:
+            evict(self, "send_timeout")
+        except Exception as e:
+            logger.debug(f"클라이언트 전송 실패 - 카메라: {self.cam_id}, 오류: {e}")
+            remove_client(self)
+
+
+connected_clients: dict[str, dict[WebSocket, WsClient]] = {}
+_trajectory_tasks = {}  # cam_id -> 궤적 전송 작업
+
+ws_stats = defaultdict(int)
+
+
+def get_ws_stats():
+    return {
+        "clients": {
+            cam_id: len(clients) for cam_id, clients in connected_clients.items()
+        },
+        "trajectory_clients": {
+            cam_id: sum(1 for c in clients.values() if c.trajectory is not None)
+            for cam_id, clients in connected_clients.items()
+        },
+        **ws_stats,
+        "avg_fanout_ms": (
+            ws_stats["fanout_time"] / ws_stats["broadcasts"] * 1000
+            if ws_stats["broadcasts"]
+            else 0.0
+        ),
+    }
+
+
+def remove_client(client: WsClient):
+    clients = connected_clients.get(client.cam_id, {})
+    if clients.get(client.ws) is client:
+        del clients[client.ws]
+    client.task.cancel()
+
+
+def evict(client: WsClient, reason: str):
+    """느린 클라이언트 연결 종료 (수신 루프는 WebSocketDisconnect 로 정리됨)"""
+    client.evicted = True
+    ws_stats[f"evicted_{reason}"] += 1
+    logger.warning(
+        f"느린 WebSocket 클라이언트 종료 - 카메라: {client.cam_id}, 사유: {reason}"
+    )
+    remove_client(client)
+    asyncio.ensure_future(_close(client.ws))
 
 
-async def broadcast(cam_id: str, event: dict):
+async def _close(ws: WebSocket):
     try:
-        clients = connected_clients.get(cam_id, {})
-        if not clients:
-            return
-
-        if event.get("type") != "hit":
-            return
-
-        arrow_service = arrow_registry.get(cam_id)
-
-        if not arrow_service:
-            logger.warning(f"브로드캐스트 실패: ArrowService 없음 - 카메라: {cam_id}")
+        await ws.close(code=WS_SLOW_CLOSE_CODE)
+    except Exception:
+        pass
+
+
+def send_to(client: WsClient, text: str | bytes):
+    if client.evicted:
+        return
+    if not client.offer(text):
+        evict(client, "queue_full")
+
+
+def max_video_size(cam_id: str):
+    """카메라 화면을 보고 있는 클라이언트 중 가장 큰 표시 크기 (보고된 게 없으면 None)"""
+    sizes = [
+        client.video_size
+        for client in connected_clients.get(cam_id, {}).values()
+        if client.video_size
+    ]
+    if not sizes:
+        return None
+    return max(sizes, key=lambda size: size[0] * size[1])
+
+
+def fan_out_hit(cam_id: str, event: dict):
+    """표시 크기(video_size)별로 좌표 변환 / 직렬화를 한 번씩 하고 각 클라이언트 큐에 추가
+
+    이벤트 버스 handler 로 서버 이벤트 루프에서 호출됨
+    """
+    clients = connected_clients.get(cam_id, {})
+    if not clients:
+        return
+
+    arrow_service = arrow_registry.get(cam_id)
+    if not arrow_service:
+        logger.warning(f"브로드캐스트 실패: ArrowService 없음 - 카메라: {cam_id}")
+        return
+
+    start = time.perf_counter()
+    raw_x, raw_y = event["tip"]
+    inside = event.get("inside", False)
+
+    groups = defaultdict(list)
+    for client in list(clients.values()):
+        if client.video_size is not None:
+            groups[client.video_size].append(client)
+
+    for video_size, group in groups.items():
+        render_tip = arrow_service.to_render_coords(raw_x, raw_y, video_size)
+        payload = {"type": "hit", "tip": render_tip, "inside": inside}
+        text = orjson.dumps(payload).decode()
+        for client in group:
+            send_to(client, text)
+
+    ws_stats["broadcasts"] += 1
+    ws_stats["groups"] += len(groups)
+    ws_stats["fanout_time"] += time.perf_counter() - start
+
+
+def fan_out_polygon(cam_id: str, event: dict):
+    """과녁이 바뀌었을 때 표시 크기별로 한 번씩 변환 / 직렬화한 폴리곤 전송"""
+    clients = connected_clients.get(cam_id, {})
+    if not clients:
+        return
+
+    arrow_service = arrow_registry.get(cam_id)
+    groups = defaultdict(list)
+    for client in list(clients.values()):
+        if client.video_size is not None:
+            groups[client.video_size].append(client)
+
+    for video_size, group in groups.items():
+        render_polygon = arrow_service.polygon_to_render(video_size)
+        if render_polygon is None:
             return
-        raw_x, raw_y = event["tip"]
-        inside = event.get("inside", False)
-
-        disconnected = []
-
-        for ws, info in list(clients.items()):
-            video_size = info.get("video_size")
-
-            if video_size is None:
-                continue
+        payload = {"type": "polygon", "points": render_polygon}
+        text = orjson.dumps(payload).decode()
+        for client in group:
+            send_to(client, text)
+
+
+def fan_out_status(cam_id: str, event: dict):
+    """좌표 변환이 필요 없는 상태 이벤트는 한 번 직렬화해 그대로 전송"""
+    clients = connected_clients.get(cam_id, {})
+    if not clients:
+        return
+
+    text = orjson.dumps(event).decode()
+    for client in list(clients.values()):
+        send_to(client, text)
+
+
+def attach_event_bus(bus):
+    """이벤트 버스의 hit / polygon / status 이벤트를 WebSocket 으로 전달"""
+    bus.subscribe("hit", fan_out_hit)
+    bus.subscribe("polygon", fan_out_polygon)
+    bus.subscribe("status", fan_out_status)
+
+
+def fan_out_trajectory(cam_id: str, clients, now: float):
+    """궤적 구독 클라이언트 중 전송 간격이 된 클라이언트에 바뀐 부분만 전송
+
+    좌표 변환은 video_size 별로, 인코딩은 (video_size, 마지막으로 보낸 값) 별로 한 번씩.
+    한 video_size 묶음에서 오류가 나면 그 묶음만 구독을 해제하고 다른 묶음은 계속 보낸다.
+    """
+    arrow_service = arrow_registry.get(cam_id)
+    groups = defaultdict(list)
+    for client in clients:
+        stream = client.trajectory
+        if stream is not None and client.video_size is not None and stream.due(now):
+            groups[client.video_size].append(client)
+
+    for video_size, group in groups.items():
+        try:
+            state = render_trajectory(arrow_service, video_size)
+            packets = {}
+            for client in group:
+                stream = client.trajectory
+                if not stream.pending(state):
+                    continue
+
+                packet = packets.get(stream.last)
+                if packet is None:
+                    packet = packets[stream.last] = encode_trajectory(stream.last, state)
+
+                stream.mark_sent(state, len(packet), now)
+                send_to(client, packet)
+                ws_stats["trajectory_frames"] += 1
+                ws_stats["trajectory_bytes"] += len(packet)
+        except Exception as e:
+            # 같은 오류가 매 주기 반복되지 않게 이 묶음의 구독은 해제 (다시 구독 가능)
+            for client in group:
+                client.trajectory = None
+            ws_stats["trajectory_errors"] += 1
+            logger.error(
+                f"궤적 전송 실패, 구독 해제 - 카메라: {cam_id}, "
+                f"표시 크기: {video_size}, 클라이언트: {len(group)}개, 오류: {e}",
+                exc_info=True,
+            )
+
+
+async def _trajectory_loop(cam_id: str):
+    """카메라별 궤적 전송 (TRAJECTORY_MAX_FPS 주기, 구독자가 없으면 종료)"""
+    interval = 1.0 / TRAJECTORY_MAX_FPS
+    try:
+        while True:
+            clients = [
+                client
+                for client in connected_clients.get(cam_id, {}).values()
+                if client.trajectory is not None
+            ]
+            if not clients:
+                break
+            fan_out_trajectory(cam_id, clients, time.monotonic())
+            await asyncio.sleep(interval)
+    except Exception as e:
+        logger.error(f"궤적 전송 실패 - 카메라: {cam_id}, 오류: {e}", exc_info=True)
+    finally:
+        if _trajectory_tasks.get(cam_id) is asyncio.current_task():
+            del _trajectory_tasks[cam_id]
 
-            render_tip = arrow_service.to_render_coords(raw_x, raw_y, video_size)
 
-            payload = {"type": "hit", "tip": render_tip, "inside": inside}
+def subscribe_trajectory(client: WsClient, msg: dict):
+    """{"type": "trajectory", "enabled": bool, "fps": float} 처리"""
+    if not msg.get("enabled", True):
+        client.trajectory = None
+        return
 
-            try:
-                await ws.send_json(payload)
-            except Exception as e:
-                logger.error(f"클라이언트 전송 실패 - 카메라: {cam_id}, 오류: {e}")
-                disconnected.append(ws)
+    try:
+        fps = float(msg.get("fps", TRAJECTORY_DEFAULT_FPS))
+        if not math.isfinite(fps):
+            raise ValueError(f"non-finite fps: {fps}")
+    except (TypeError, ValueError):
+        logger.warning(f"잘못된 궤적 fps - 카메라: {client.cam_id}, 값: {msg.get('fps')}")
+        fps = TRAJECTORY_DEFAULT_FPS
+    client.trajectory = TrajectoryStream(fps)
+
+    task = _trajectory_tasks.get(client.cam_id)
+    if task is None or task.done():
+        _trajectory_tasks[client.cam_id] = asyncio.ensure_future(
+            _trajectory_loop(client.cam_id)
+        )
 
-        for ws in disconnected:
-            if ws in clients:
-                del clients[ws]
 
-    except Exception as e:
-        logger.error(f"브로드캐스트 오류 - 카메라: {cam_id}, 오류: {e}", exc_info=True)
+def parse_video_size(msg: dict):
+    """video_size 메시지의 (width, height), 양의 정수가 아니면 None"""
+    size = []
+    for key in ("width", "height"):
+        value = msg.get(key)
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if isinstance(value, bool) or not isinstance(value, int) or value <= 0:
+            return None
+        size.append(value)
+    return tuple(size)
 
 
-async def send_polygon(ws: WebSocket, cam_id: str, video_size=None):
+def send_polygon(client: WsClient, cam_id: str, video_size=None):
     try:
         arrow_service = arrow_registry.get(cam_id)
         if arrow_service is None:
@@ -67,11 +332,9 @@ async def send_polygon(ws: WebSocket, cam_id: str, video_size=None):
             logger.debug(f"폴리곤 없음 - 카메라: {cam_id}")
             return
 
-        await ws.send_json(
-            {
-                "type": "polygon",
-                "points": render_polygon,
-            }
+        send_to(
+            client,
+            orjson.dumps({"type": "polygon", "points": render_polygon}).decode(),
         )
     except Exception as e:
         logger.error(f"폴리곤 전송 실패 - 카메라: {cam_id}, 오류: {e}", exc_info=True)
@@ -83,7 +346,8 @@ async def hit_ws(ws: WebSocket, cam_id: str):
 
     if cam_id not in connected_clients:
         connected_clients[cam_id] = {}
-    connected_clients[cam_id][ws] = {"video_size": None}
+    client = WsClient(ws, cam_id)
+    connected_clients[cam_id][ws] = client
 
     logger.info(
         f"WebSocket 연결 - 카메라: {cam_id} (총 {len(connected_clients[cam_id])}개)"
@@ -94,29 +358,40 @@ async def hit_ws(ws: WebSocket, cam_id: str):
             msg_type = msg.get("type")
 
             if msg_type == "video_size":
-                width = msg["width"]
-                height = msg["height"]
-
-                if ws in connected_clients[cam_id]:
-                    connected_clients[cam_id][ws]["video_size"] = (width, height)
+                video_size = parse_video_size(msg)
+                if video_size is None:
+                    logger.warning(
+                        f"잘못된 video_size 무시 - 카메라: {cam_id}, "
+                        f"width: {msg.get('width')!r}, height: {msg.get('height')!r}"
+                    )
+                    continue
+                client.video_size = video_size
+                if client.trajectory is not None:
+                    client.trajectory.reset()
+
+                send_polygon(client, cam_id, video_size)
+                continue
 
-                await send_polygon(ws, cam_id, (width, height))
+            # 클라이언트가 직접 그릴 화살 / 모래 위치 구독 (바이너리 msgpack 프레임)
+            if msg_type == "trajectory":
+                subscribe_trajectory(client, msg)
                 continue
 
             # 소리테스트용 끝나면 삭제
             if msg_type == "hit":
-                clients = connected_clients.get(cam_id, {})
-                for client_ws in list(clients.keys()):
-                    try:
-                        await client_ws.send_json(msg)
-                    except Exception:
-                        continue
+                text = orjson.dumps(msg).decode()
+                for other in list(connected_clients.get(cam_id, {}).values()):
+                    send_to(other, text)
 
     except WebSocketDisconnect:
-        if cam_id in connected_clients and ws in connected_clients[cam_id]:
-            del connected_clients[cam_id][ws]
+        pass
 
     except Exception as e:
-        logger.error(f"WebSocket 오류 - 카메라: {cam_id}, 오류: {e}", exc_info=True)
-        if cam_id in connected_clients and ws in connected_clients[cam_id]:
-            del connected_clients[cam_id][ws]
+        # 느린 클라이언트로 끊은 연결은 수신 중 오류가 나도 정상
+        if not client.evicted:
+            logger.error(
+                f"WebSocket 오류 - 카메라: {cam_id}, 오류: {e}", exc_info=True
+            )
+
+    finally:
+        remove_client(client)
@@ -0,0 +1,323 @@
+"""ArrowService 판정 경로 점검 / 벤치마크
+
+    python -m scripts.bench_arrow            # 기존 deque 구현과의 판정 결과 비교 + 벤치마크
+"""
+
+import argparse
+import random
+import time
+from collections import Counter, deque
+
+import cv2
+import numpy as np
+
+from services.arrow.geometry import TargetGeometry
+from services.arrow.service import ArrowService, trajectory_stats
+
+TARGET = [[860, 300], [1060, 300], [1060, 520], [860, 520]]
+FRAME_SIZE = (1920, 1080)
+
+
+def legacy_trajectory_stats(y_coords):
+    """deque 기반 구현의 높이 / 변곡점 계산 (비교 기준)"""
+    height = max(y_coords) - min(y_coords)
+    hit_idx = -1
+    for i in range(len(y_coords) - 1):
+        if y_coords[i] - y_coords[i + 1] > 0:
+            hit_idx = i
+            break
+    return height, hit_idx
+
+
+def legacy_closest_point(point, polygon):
+    """변 단위 루프 구현 (비교 기준)"""
+    px, py = point
+    min_dist = float("inf")
+    closest_point = None
+    for i in range(len(polygon)):
+        p1, p2 = polygon[i], polygon[(i + 1) % len(polygon)]
+        x1, y1 = float(p1[0]), float(p1[1])
+        x2, y2 = float(p2[0]), float(p2[1])
+        dx, dy = x2 - x1, y2 - y1
+        if dx == 0 and dy == 0:
+            continue
+        t = max(0, min(1, ((px - x1) * dx + (py - y1) * dy) / (dx * dx + dy * dy)))
+        cx, cy = x1 + t * dx, y1 + t * dy
+        dist = np.sqrt((px - cx) ** 2 + (py - cy) ** 2)
+        if dist < min_dist:
+            min_dist = dist
+            closest_point = (cx, cy)
+    return closest_point
+
+
+def make_polygon(rng):
+    cx, cy = rng.uniform(600, 1300), rng.uniform(250, 700)
+    n = rng.randint(3, 8)
+    angles = sorted(rng.uniform(0, 2 * np.pi) for _ in range(n))
+    points = []
+    for a in angles:
+        r = rng.uniform(40, 200)
+        points.append([int(cx + r * np.cos(a)), int(cy + r * np.sin(a))])
+    return points
+
+
+def check_geometry_parity(cases):
+    rng = random.Random(2)
+    for _ in range(cases):
+        polygon = make_polygon(rng)
+        geometry = TargetGeometry(polygon, FRAME_SIZE)
+        contour = np.array(polygon, dtype=np.int32)
+
+        min_x, min_y, max_x, max_y = geometry.bbox
+        for _ in range(50):
+            if rng.random() < 0.5:
+                # 경계 근처 점
+                i = rng.randrange(len(polygon))
+                (x1, y1), (x2, y2) = polygon[i], polygon[(i + 1) % len(polygon)]
+                t = rng.random()
+                point = [
+                    x1 + t * (x2 - x1) + rng.uniform(-3, 3),
+                    y1 + t * (y2 - y1) + rng.uniform(-3, 3),
+                ]
+            else:
+                point = [
+                    rng.uniform(min_x - 20, max_x + 20),
+                    rng.uniform(min_y - 20, max_y + 20),
+                ]
+
+            expected = cv2.pointPolygonTest(contour, point, False) >= 0
+            assert geometry.contains(point) == expected, (polygon, point)
+
+            ex = legacy_closest_point(point, contour)
+            ac = geometry.closest_point(point)
+            assert np.allclose(ex, ac), (polygon, point, ex, ac)
+
+    print(f"geometry parity ok ({cases} polygons)")
+
+
+def make_trajectory(rng, n):
+    """화살이 내려오다 (선택적으로) 튀어오르는 tip 좌표"""
+    x0, y0 = rng.uniform(700, 1200), rng.uniform(50, 200)
+    vx, vy = rng.uniform(-4, 4), rng.uniform(5, 20)
+    bounce = rng.randrange(n) if rng.random() < 0.7 else None
+
+    points = []
+    x, y = x0, y0
+    for i in range(n):
+        points.append((round(x, 2), round(y, 2)))
+        x += vx
+        y += -vy / 2 if bounce is not None and i >= bounce else vy
+    return points
+
+
+class LegacyJudge:
+    """deque / dict 기반 find_hit_point (비교 기준, 판정 분기는 기존 코드 그대로)"""
+
+    def __init__(self, buffer_size, target):
+        self.tracking_buffer = deque(maxlen=buffer_size)
+        self.splash_buffer = deque(maxlen=10)
+        self.target = None if target is None else np.array(target, dtype=np.int32)
+
+    def _is_inside_target(self, point):
+        if self.target is None or point is None:
+            return False
+        return cv2.pointPolygonTest(self.target, point, False) >= 0
+
+    def find_hit_point(self):
+        if len(self.tracking_buffer) < 2:
+            if len(self.splash_buffer) >= 5:
+                first_bbox = self.splash_buffer[0]
+                return {
+                    "point": [
+                        float((first_bbox[0] + first_bbox[2]) / 2),
+                        float(first_bbox[3]),
+                    ],
+                    "inside": False,
+                    "type": "SPLASH_ONLY_MISS",
+                }
+            return None
+
+        y_coords = [data["tip"][1] for data in self.tracking_buffer]
+        height = max(y_coords) - min(y_coords)
+        if height < 35:
+            return None
+
+        hit_idx = legacy_trajectory_stats(y_coords)[1]
+        if hit_idx != -1:
+            hit_tip = self.tracking_buffer[hit_idx]["tip"]
+            raw_hit = [float(hit_tip[0]), float(hit_tip[1])]
+
+            if len(self.splash_buffer) >= 5:
+                first_bbox = self.splash_buffer[0]
+                return {
+                    "point": [
+                        float((first_bbox[0] + first_bbox[2]) / 2),
+                        float(first_bbox[3]),
+                    ],
+                    "inside": False,
+                    "type": "HIT_WITH_SPLASH_MISS",
+                }
+            if self.target is not None:
+                if raw_hit[1] > max(p[1] for p in self.target):
+                    return {
+                        "point": raw_hit,
+                        "inside": False,
+                        "type": "INFLECTION_TARGET_BELOW",
+                    }
+            if self.target is not None and self._is_inside_target(raw_hit):
+                return {"point": raw_hit, "inside": True, "type": "INFLECTION_HIT"}
+            if self.target is not None:
+                closest = legacy_closest_point(raw_hit, self.target)
+                if closest:
+                    closest_x, closest_y = closest
+                    M = cv2.moments(self.target)
+                    if M["m00"] != 0:
+                        cx, cy = M["m10"] / M["m00"], M["m01"] / M["m00"]
+                        dx, dy = cx - closest_x, cy - closest_y
+                        length = np.sqrt(dx**2 + dy**2)
+                        if length > 0:
+                            closest_x += dx / length * 35
+                            closest_y += dy / length * 35
+                    return {
+                        "point": [closest_x, closest_y],
+                        "inside": True,
+                        "type": "PROJECTED_TO_TARGET",
+                    }
+                return {"point": raw_hit, "inside": False, "type": "NO_CLOSET_POINT"}
+            return {"point": raw_hit, "inside": False, "type": "NO_TARGET_INFO"}
+
+        last_tip = self.tracking_buffer[-1]["tip"]
+        raw_hit = [float(last_tip[0]), float(last_tip[1])]
+        if self.target is not None and self._is_inside_target(raw_hit):
+            return {
+                "point": [raw_hit[0], float(max(p[1] for p in self.target) + 10)],
+                "inside": False,
+                "type": "MISS_INSIDE_TARGET",
+            }
+        if self.target is not None:
+            xs = [p[0] for p in self.target]
+            ys = [p[1] for p in self.target]
+            return {
+                "point": [
+                    min(max(raw_hit[0], min(xs) - 50), max(xs) + 50),
+                    min(max(raw_hit[1], min(ys) - 50), max(ys) + 50),
+                ],
+                "inside": False,
+                "type": "MISS_GENERAL",
+            }
+        return {"point": raw_hit, "inside": False, "type": "MISS_NO_TARGET"}
+
+
+def fill(service, points, splashes=()):
+    service.clear_buffer()
+    for i, (x, y) in enumerate(points):
+        service.tracking_buffer.append((x, y), (x - 10, y - 30), 0.9, float(i))
+    service.splash_buffer.extend(splashes)
+
+
+def make_splashes(rng):
+    count = rng.choice([0, 0, 0, 2, 5, 8])
+    x, y = rng.uniform(600, 1300), rng.uniform(300, 800)
+    return [[x, y, x + rng.uniform(10, 60), y + rng.uniform(10, 60)] for _ in range(count)]
+
+
+def check_parity(cases, buffer_size):
+    """같은 무작위 버퍼로 기존 구현과 판정 결과 (type / point / inside) 비교"""
+    rng = random.Random(0)
+    types = Counter()
+
+    for _ in range(cases):
+        target = make_polygon(rng) if rng.random() < 0.9 else None
+        service = ArrowService(buffer_size=buffer_size)
+        if target is not None:
+            service.set_target(target, FRAME_SIZE)
+        legacy = LegacyJudge(buffer_size, target)
+
+        count = rng.randint(0, buffer_size * 2)
+        points = make_trajectory(rng, count) if count else []
+        splashes = make_splashes(rng)
+        fill(service, points, splashes)
+        for x, y in points:
+            legacy.tracking_buffer.append(
+                {"tip": (x, y), "tail": (x - 10, y - 30), "conf": 0.9}
+            )
+        legacy.splash_buffer.extend(splashes)
+
+        expected = legacy.find_hit_point()
+        actual = service.find_hit_point()
+        if expected is None:
+            assert actual is None, (points, splashes, target, actual)
+            types[None] += 1
+            continue
+
+        assert actual is not None, (points, splashes, target, expected)
+        assert actual["type"] == expected["type"], (expected, actual)
+        assert actual["inside"] == expected["inside"], (expected, actual)
+        assert np.allclose(actual["point"], expected["point"]), (expected, actual)
+        types[expected["type"]] += 1
+
+    print(f"parity ok ({cases} buffers): {dict(types)}")
+
+
+def bench(buffer_size, repeat):
+    rng = random.Random(1)
+    points = make_trajectory(rng, buffer_size)
+    legacy_buffer = deque(
+        ({"tip": p, "tail": p, "conf": 0.9, "timestamp": 0.0} for p in points),
+        maxlen=buffer_size,
+    )
+
+    service = ArrowService(buffer_size=buffer_size)
+    fill(service, points)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        legacy_trajectory_stats([data["tip"][1] for data in legacy_buffer])
+    legacy = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        trajectory_stats(service.tracking_buffer.view()["tip_y"])
+    vectorized = (time.perf_counter() - start) / repeat
+
+    print(
+        f"n={buffer_size:<4} legacy {legacy * 1e6:8.2f}us  "
+        f"vectorized {vectorized * 1e6:8.2f}us"
+    )
+
+
+def bench_geometry(repeat):
+    contour = np.array(TARGET, dtype=np.int32)
+    geometry = TargetGeometry(TARGET, FRAME_SIZE)
+    point = [1000.5, 560.25]
+
+    cases = [
+        ("inside  legacy", lambda: cv2.pointPolygonTest(contour, point, False) >= 0),
+        ("inside  cached", lambda: geometry.contains(point)),
+        ("closest legacy", lambda: legacy_closest_point(point, contour)),
+        ("closest cached", lambda: geometry.closest_point(point)),
+        ("bottom  legacy", lambda: max(p[1] for p in contour)),
+        ("bottom  cached", lambda: geometry.bottom_y),
+    ]
+    for name, fn in cases:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        print(f"{name} {(time.perf_counter() - start) / repeat * 1e6:8.2f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    check_parity(args.cases, buffer_size=50)
+    check_geometry_parity(args.cases // 10)
+    for n in (10, 50, 200):
+        bench(n, args.repeat)
+    bench_geometry(args.repeat)
+
+
+if __name__ == "__main__":
+    main()
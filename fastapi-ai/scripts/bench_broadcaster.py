@@ -0,0 +1,72 @@
+"""시청자 수에 따른 프레임 준비 CPU 비교 (시청자별 합성 vs 카메라당 1회 합성)
+
+인코딩은 두 방식 모두 시청자마다 수행되므로 제외하고, 합성 + VideoFrame 생성 +
+인코더 입력(yuv420p) 변환까지 측정
+
+    python -m scripts.bench_broadcaster --viewers 1 2 5 10 --frames 60
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+from av import VideoFrame
+
+from services.arrow.service import ArrowService
+from services.person.service import PersonService
+from services.webrtc.broadcaster import compose_frame
+
+TARGET = [[860, 300], [1060, 300], [1060, 520], [860, 520]]
+
+
+def make_services():
+    arrow_service = ArrowService()
+    arrow_service.set_target(TARGET, (1920, 1080))
+    arrow_service.current_arrow = {"tip": [950, 420], "tail": [930, 380]}
+    arrow_service.current_splash = [900, 500, 940, 540]
+
+    person_service = PersonService()
+    person_service.update_detections({"bbox": [200, 300, 420, 900], "conf": 0.91})
+    return arrow_service, person_service
+
+
+def run(mode, viewers, frames, frame, arrow_service, person_service):
+    start = time.process_time()
+    for _ in range(frames):
+        if mode == "per_viewer":
+            for _ in range(viewers):
+                composed = compose_frame(frame, arrow_service, person_service)
+                av_frame = VideoFrame.from_ndarray(composed, format="bgr24")
+                av_frame.reformat(format="yuv420p")  # 인코더 내부 변환
+        else:
+            composed = compose_frame(frame, arrow_service, person_service)
+            i420 = cv2.cvtColor(composed, cv2.COLOR_BGR2YUV_I420)
+            for _ in range(viewers):
+                VideoFrame.from_ndarray(i420, format="yuv420p")
+    return (time.process_time() - start) / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--viewers", type=int, nargs="+", default=[1, 2, 5, 10])
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--width", type=int, default=1920)
+    args = parser.parse_args()
+
+    frame = np.random.default_rng(0).integers(
+        0, 255, (args.height, args.width, 3), dtype=np.uint8
+    )
+    arrow_service, person_service = make_services()
+
+    print(f"{'viewers':>8}{'per_viewer ms':>16}{'shared ms':>12}")
+    for viewers in args.viewers:
+        services = (arrow_service, person_service)
+        legacy = run("per_viewer", viewers, args.frames, frame, *services)
+        shared = run("shared", viewers, args.frames, frame, *services)
+        print(f"{viewers:>8}{legacy:>16.2f}{shared:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
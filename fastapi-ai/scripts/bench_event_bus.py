@@ -0,0 +1,134 @@
+"""판정 스레드 → WebSocket 적중 전달 비교
+(기존: 판정 스레드 전용 루프에서 run_until_complete(broadcast)
+vs services.events.bus: publish 후 서버 이벤트 루프가 전달)
+
+서버 이벤트 루프와 판정 스레드를 따로 띄우고, 판정 스레드가 --interval 마다 적중을 낸다.
+판정 스레드가 적중 하나에 묶여 있던 시간과 빠른 클라이언트까지 도착 지연을 잰다.
+
+    python -m scripts.bench_event_bus --clients 200 --hits 20
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+import routers.ws as ws_module
+from scripts.bench_ws_broadcast import (
+    CAM_ID,
+    TARGET,
+    legacy_broadcast,
+    make_sockets,
+)
+from services.arrow.registry import arrow_registry
+from services.events.bus import EventBus
+
+
+def judge_thread(mode, args, bus, clients, arrow_service, sent_at, blocked):
+    judge_loop = asyncio.new_event_loop() if mode == "legacy" else None
+    for i in range(args.hits):
+        event = {"type": "hit", "tip": [950 + i, 420], "inside": True}
+        start = time.perf_counter()
+        sent_at.append(start)
+        if mode == "legacy":
+            judge_loop.run_until_complete(
+                legacy_broadcast(clients, arrow_service, event)
+            )
+        else:
+            bus.publish(CAM_ID, event)
+        blocked.append(time.perf_counter() - start)
+        time.sleep(args.interval)
+    if judge_loop is not None:
+        judge_loop.close()
+
+
+async def run(mode, args):
+    arrow_service = arrow_registry.get(CAM_ID)
+    arrow_service.set_target(TARGET, (1920, 1080))
+    sockets = make_sockets(args)
+
+    bus = EventBus()
+    clients = None
+    if mode == "legacy":
+        clients = {ws: {"video_size": size} for ws, size in sockets}
+    else:
+        ws_module.connected_clients[CAM_ID] = {}
+        for ws, size in sockets:
+            client = ws_module.WsClient(ws, CAM_ID)
+            client.video_size = size
+            ws_module.connected_clients[CAM_ID][ws] = client
+        ws_module.attach_event_bus(bus)
+        bus.start(asyncio.get_running_loop())
+
+    sent_at, blocked = [], []
+    thread = threading.Thread(
+        target=judge_thread,
+        args=(mode, args, bus, clients, arrow_service, sent_at, blocked),
+    )
+    thread.start()
+    while thread.is_alive():
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(args.slow_sec + 0.5)
+
+    latencies = []
+    for ws, _ in sockets:
+        if ws.slow:
+            continue
+        for i, start in enumerate(sent_at):
+            got = ws.received[i][0] - start if len(ws.received) > i else np.inf
+            latencies.append(got)
+
+    if mode != "legacy":
+        bus.stop()
+        for client in list(ws_module.connected_clients[CAM_ID].values()):
+            ws_module.remove_client(client)
+        ws_module.connected_clients.pop(CAM_ID, None)
+
+    blocked = np.array(blocked) * 1000
+    latencies = np.array(latencies) * 1000
+    return {
+        "blocked_p50": np.percentile(blocked, 50),
+        "blocked_max": blocked.max(),
+        "p50": np.percentile(latencies, 50),
+        "p99": np.percentile(latencies, 99),
+        "bus": bus.get_stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--hits", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.2, help="적중 간격 (초)")
+    parser.add_argument("--fast-ms", type=float, default=5)
+    parser.add_argument("--slow-ratio", type=float, default=0.01)
+    parser.add_argument("--slow-sec", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} sockets, {args.hits} hits every {args.interval:g}s, "
+        f"{args.slow_ratio * 100:g}% slow ({args.slow_sec:g}s/send)"
+    )
+    print(
+        f"{'mode':8}{'judge blocked p50 ms':>22}{'max ms':>10}"
+        f"{'fast p50 ms':>13}{'fast p99 ms':>13}"
+    )
+    for mode in ("legacy", "bus"):
+        r = asyncio.run(run(mode, args))
+        print(
+            f"{mode:8}{r['blocked_p50']:22.2f}{r['blocked_max']:10.2f}"
+            f"{r['p50']:13.1f}{r['p99']:13.1f}"
+        )
+        if mode == "bus":
+            stats = r["bus"]
+            print(
+                f"bus: delivered {stats['delivered']}, dropped {stats['dropped']}, "
+                f"latency p50 {stats.get('latency_p50_ms', 0):.2f}ms "
+                f"p99 {stats.get('latency_p99_ms', 0):.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""이벤트 디코딩 처리량 벤치마크 (JSON vs msgpack 묶음 프레임)
+
+    python -m scripts.bench_event_codec --events 200000 --batch 1 4 16
+"""
+
+import argparse
+import time
+
+from utils.event_codec import WIRE_JSON, WIRE_MSGPACK, decode_frames, encode_events
+
+
+def make_events(n):
+    events = []
+    for i in range(n):
+        if i % 10 == 9:
+            events.append(
+                {
+                    "type": "splash",
+                    "splash_bbox": [640.0 + i % 7, 380.0, 700.0, 410.0 + i % 5],
+                    "timestamp": 1700000000.0 + i / 60,
+                }
+            )
+        else:
+            events.append(
+                {
+                    "type": "arrow",
+                    "tip": [812.5 + i % 13, 433.0 - i % 17],
+                    "tail": [790.0 + i % 11, 401.25],
+                    "bbox_conf": 0.82,
+                    "timestamp": 1700000000.0 + i / 60,
+                }
+            )
+    return events
+
+
+def bench(events, wire_format, batch):
+    messages = []
+    for i in range(0, len(events), batch):
+        messages.extend(encode_events(events[i : i + batch], wire_format))
+
+    nbytes = sum(len(f) for m in messages for f in m)
+
+    start = time.perf_counter()
+    count = 0
+    for frames in messages:
+        count += len(decode_frames(frames))
+    elapsed = time.perf_counter() - start
+
+    assert count == len(events)
+    return count / elapsed, nbytes / len(events)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=200000)
+    parser.add_argument("--batch", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    events = make_events(args.events)
+
+    print(f"{'format':<10}{'batch':>6}{'ev/s':>14}{'bytes/ev':>10}")
+    rate, size = bench(events, WIRE_JSON, 1)
+    print(f"{WIRE_JSON:<10}{1:>6}{rate:>14,.0f}{size:>10.1f}")
+    for batch in args.batch:
+        rate, size = bench(events, WIRE_MSGPACK, batch)
+        print(f"{WIRE_MSGPACK:<10}{batch:>6}{rate:>14,.0f}{size:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""프로세스 간 이벤트 허브 확인: 허브(프록시 스레드) + judge 게시자 1 개 + 웹 워커 프로세스 N 개
+
+각 워커는 실제 서버처럼 HubSubscriber → EventBus → handler 경로로 이벤트를 받고,
+게시 시각부터 handler 호출까지의 지연과 받은 개수를 돌려준다.
+
+    python -m scripts.bench_event_hub --workers 4 --events 2000
+"""
+
+import argparse
+import asyncio
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+
+from services.events.bus import EventBus
+from services.events.hub import EventHub, HubPublisher, HubSubscriber
+
+IN_ADDR = f"ipc:///tmp/smartbow_bench_hub_in_{os.getpid()}.ipc"
+OUT_ADDR = f"ipc:///tmp/smartbow_bench_hub_out_{os.getpid()}.ipc"
+
+
+def worker(index, ready, results):
+    async def main():
+        bus = EventBus(maxsize=10000)
+        latencies = []
+        finished = asyncio.Event()
+
+        def on_hit(cam_id, event):
+            latencies.append((time.time() - event["ts"]) * 1000)
+
+        bus.subscribe("hit", on_hit)
+        bus.subscribe("status", lambda cam_id, event: finished.set())
+        bus.start(asyncio.get_running_loop())
+
+        subscriber = HubSubscriber(bus, addr=OUT_ADDR, poll_timeout_ms=50)
+        subscriber.start()
+        ready.release()
+
+        await finished.wait()
+        subscriber.stop()
+        bus.stop()
+        results.put((index, latencies, bus.get_stats()["dropped"]))
+
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--cameras", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=1000, help="초당 게시 수")
+    args = parser.parse_args()
+
+    hub = EventHub(in_addr=IN_ADDR, out_addr=OUT_ADDR)
+    hub.start()
+
+    ready = mp.Semaphore(0)
+    results = mp.Queue()
+    procs = []
+    for i in range(args.workers):
+        proc = mp.Process(target=worker, args=(i, ready, results))
+        proc.start()
+        procs.append(proc)
+    for _ in procs:
+        ready.acquire()
+
+    publisher = HubPublisher(addr=IN_ADDR)
+    time.sleep(0.5)  # 구독이 허브를 거쳐 게시자까지 전달될 때까지
+
+    cam_ids = [f"cam{i}" for i in range(args.cameras)]
+    start = time.perf_counter()
+    for i in range(args.events):
+        event = {"type": "hit", "tip": [950, 420], "inside": True, "ts": time.time()}
+        publisher.publish(cam_ids[i % len(cam_ids)], event)
+        delay = start + (i + 1) / args.rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    time.sleep(0.2)
+    publisher.publish("control", {"type": "status", "state": "done"})
+
+    rows = [results.get(timeout=10) for _ in procs]
+    for proc in procs:
+        proc.join()
+    publisher.close()
+    hub.stop()
+
+    print(
+        f"{args.workers} workers, {args.events} events over {args.cameras} cameras "
+        f"at {args.rate:g}/s, published {publisher.get_stats()}"
+    )
+    print(f"{'worker':8}{'received':>10}{'dropped':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for index, latencies, dropped in sorted(rows):
+        lat = np.array(latencies) if latencies else np.array([np.nan])
+        print(
+            f"{index:<8}{len(latencies):10}{sum(dropped.values()):9}"
+            f"{np.percentile(lat, 50):9.2f}{np.percentile(lat, 99):9.2f}{lat.max():9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""ZMQ JPEG 프레임 구독 비교 (기존: 전체 포트 conflate 소켓 1개 + 전체 디코딩 / 전체 트랙 push
+vs FrameSubscriber: 카메라별 라우팅 / conflate + 필요할 때 한 번 디코딩)
+
+카메라 0 은 빠르게(--busy-fps), 나머지는 --fps 로 발행.
+구독: cam0 없음, cam1 픽셀 트랙 2개, cam2 JPEG 만 쓰는 구독자 1개, cam3 픽셀 트랙 1개
+
+    python -m scripts.bench_frame_subscriber --seconds 5
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from collections import Counter
+
+import cv2
+import msgpack
+import numpy as np
+import zmq
+import zmq.asyncio
+
+from services.webrtc.frame_subscriber import FrameSubscriber
+
+BASE_PORT = 28650
+
+
+class Track:
+    def __init__(self, cam_id, needs_pixels=True):
+        self.cam_id = cam_id
+        self.needs_pixels = needs_pixels
+        self.received = Counter()  # 받은 프레임의 cam_id 별 수
+        self.wrong = 0  # 다른 카메라 프레임을 받은 수
+
+    async def push(self, frame):
+        cam_id = getattr(frame, "cam_id", None)
+        self.received[cam_id] += 1
+        if cam_id is not None and cam_id != self.cam_id:
+            self.wrong += 1
+
+
+def publish(port, cam_id, fps, jpeg, stop):
+    ctx = zmq.Context.instance()
+    pub = ctx.socket(zmq.PUB)
+    pub.setsockopt(zmq.LINGER, 0)
+    pub.bind(f"tcp://*:{port}")
+    payload = msgpack.packb({"cam_id": cam_id, "jpeg": jpeg}, use_bin_type=True)
+
+    interval = 1.0 / fps
+    next_tick = time.time()
+    while not stop.is_set():
+        pub.send(payload)
+        next_tick += interval
+        stop.wait(max(0.0, next_tick - time.time()))
+    pub.close()
+
+
+async def legacy(tracks, ports, decodes, seconds):
+    """기존 camera_frame_sub 동작 재현 (push 받는 쪽에는 cam_id 정보가 없음)"""
+    ctx = zmq.asyncio.Context.instance()
+    sub = ctx.socket(zmq.SUB)
+    sub.setsockopt(zmq.LINGER, 0)
+    sub.setsockopt(zmq.RCVHWM, 2)
+    sub.setsockopt(zmq.CONFLATE, 1)
+    for port in ports:
+        sub.connect(f"tcp://localhost:{port}")
+    sub.setsockopt_string(zmq.SUBSCRIBE, "")
+
+    deadline = time.time() + seconds
+    try:
+        while time.time() < deadline:
+            try:
+                data = await asyncio.wait_for(sub.recv(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+            msg = msgpack.unpackb(data, raw=False)
+            frame = cv2.imdecode(np.frombuffer(msg["jpeg"], np.uint8), cv2.IMREAD_COLOR)
+            decodes[msg["cam_id"]] += 1
+            for track in tracks:
+                # 기존 코드는 cam_id 와 무관하게 모든 트랙에 push
+                track.received[msg["cam_id"]] += 1
+                if msg["cam_id"] != track.cam_id:
+                    track.wrong += 1
+                await track.push(frame)
+    finally:
+        sub.close()
+
+
+async def routed(tracks, ports, seconds):
+    subscriber = FrameSubscriber(ports)
+    for track in tracks:
+        subscriber.subscribe(track.cam_id, track)
+
+    task = asyncio.ensure_future(subscriber.run())
+    await asyncio.sleep(seconds)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    return subscriber.get_stats()
+
+
+def make_tracks():
+    return [
+        Track("cam1"),
+        Track("cam1"),
+        Track("cam2", needs_pixels=False),
+        Track("cam3"),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--fps", type=float, default=15)
+    parser.add_argument("--busy-fps", type=float, default=200)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--width", type=int, default=1280)
+    args = parser.parse_args()
+
+    image = np.random.default_rng(0).integers(
+        0, 255, (args.height // 8, args.width // 8, 3), dtype=np.uint8
+    )
+    image = cv2.resize(image, (args.width, args.height))
+    jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 80])[1].tobytes()
+
+    cams = ["cam0", "cam1", "cam2", "cam3"]
+    ports = [BASE_PORT + i for i in range(len(cams))]
+
+    for mode in ("legacy", "routed"):
+        stop = threading.Event()
+        publishers = [
+            threading.Thread(
+                target=publish,
+                args=(port, cam, args.busy_fps if cam == "cam0" else args.fps, jpeg, stop),
+                daemon=True,
+            )
+            for port, cam in zip(ports, cams)
+        ]
+        for t in publishers:
+            t.start()
+        time.sleep(0.3)
+
+        tracks = make_tracks()
+        cpu = time.process_time()
+        if mode == "legacy":
+            decodes = Counter()
+            asyncio.run(legacy(tracks, ports, decodes, args.seconds))
+        else:
+            stats = asyncio.run(routed(tracks, ports, args.seconds))
+            decodes = Counter(
+                {cam: s["decoded"] for cam, s in stats["cameras"].items()}
+            )
+        cpu = time.process_time() - cpu
+
+        stop.set()
+        for t in publishers:
+            t.join()
+
+        print(f"[{mode}] cpu {cpu:.2f}s, decodes/s {sum(decodes.values()) / args.seconds:.0f}")
+        for i, track in enumerate(tracks):
+            own = track.received[track.cam_id] / args.seconds
+            print(
+                f"  track{i} {track.cam_id} pixels={track.needs_pixels!s:<5} "
+                f"own fps {own:5.1f}, wrong camera frames {track.wrong}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""적중 판정 지연 벤치마크 (100ms 폴링 vs HitScheduler)
+
+idle 시각(last_event_time + idle_sec)부터 판정 호출까지의 지연과 CPU 사용량을 비교
+
+    python -m scripts.bench_hit_latency --cams 16 --shots 5
+"""
+
+import argparse
+import random
+import statistics
+import threading
+import time
+
+from services.arrow.scheduler import HitScheduler
+from services.arrow.service import ArrowService
+
+IDLE_SEC = 0.3
+
+
+def make_services(num_cams, scheduler=None):
+    return {
+        f"cam{i}": ArrowService(
+            idle_sec=IDLE_SEC, cooldown_sec=0.0, cam_id=f"cam{i}", scheduler=scheduler
+        )
+        for i in range(num_cams)
+    }
+
+
+def judge(service, delays):
+    if service.is_idle():
+        delays.append(time.time() - (service.last_event_time + service.idle_sec))
+        service.clear_buffer()
+
+
+def shoot(services, shots, stop):
+    """카메라마다 임의 시각에 화살 궤적 이벤트를 흘려보냄"""
+    rng = random.Random(0)
+    for _ in range(shots):
+        for service in services.values():
+            for i in range(10):
+                service.add_events(
+                    [
+                        {
+                            "type": "arrow",
+                            "tip": [500.0, 100.0 + i * 10],
+                            "tail": [490.0, 80.0 + i * 10],
+                            "bbox_conf": 0.9,
+                            "timestamp": time.time(),
+                        }
+                    ]
+                )
+            time.sleep(rng.uniform(0.0, 0.02))
+        time.sleep(IDLE_SEC + 0.5)
+    stop.set()
+
+
+def run_polling(num_cams, shots):
+    services = make_services(num_cams)
+    delays = []
+    stop = threading.Event()
+
+    def watcher():
+        while not stop.is_set():
+            for service in list(services.values()):
+                judge(service, delays)
+            time.sleep(0.1)
+
+    t = threading.Thread(target=watcher, daemon=True)
+    cpu0 = time.process_time()
+    t.start()
+    shoot(services, shots, stop)
+    t.join()
+    return delays, time.process_time() - cpu0
+
+
+def run_scheduler(num_cams, shots):
+    delays = []
+    services = {}
+
+    def handler(cam_id):
+        service = services[cam_id]
+        judge(service, delays)
+        return service.next_deadline()
+
+    scheduler = HitScheduler(handler)
+    services.update(make_services(num_cams, scheduler))
+    stop = threading.Event()
+
+    cpu0 = time.process_time()
+    scheduler.start()
+    shoot(services, shots, stop)
+    scheduler.stop()
+    return delays, time.process_time() - cpu0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cams", type=int, default=16)
+    parser.add_argument("--shots", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10}{'hits':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'cpu s':>8}")
+    for name, runner in (("polling", run_polling), ("scheduler", run_scheduler)):
+        delays, cpu = runner(args.cams, args.shots)
+        ms = sorted(d * 1000 for d in delays)
+        p95 = ms[int(len(ms) * 0.95) - 1] if ms else 0.0
+        print(
+            f"{name:<10}{len(ms):>6}{statistics.median(ms):>10.1f}"
+            f"{p95:>10.1f}{ms[-1]:>10.1f}{cpu:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
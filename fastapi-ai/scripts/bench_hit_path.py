@@ -0,0 +1,258 @@
+"""적중 판정 경로 벤치마크 모음
+
+합성 궤적(변곡 적중 / 과녁 아래 불관중 / 모래만 감지 / 과녁 투영 / 일반 불관중)으로
+ArrowService 의 add_event, add_splash_event, is_idle, find_hit_point,
+visualize_buffer 와 레지스트리 전체 스캔을 측정하고 결과를 JSON 으로 저장한다.
+
+    # 기준 결과 저장
+    python -m scripts.bench_hit_path --save bench/hit_path.json
+
+    # 변경 후 기준 대비 1.3배 이상 느려진 항목이 있으면 종료 코드 1
+    python -m scripts.bench_hit_path --compare bench/hit_path.json --threshold 1.3
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import services.arrow.visualizer as visualizer_module
+from services.arrow.service import ArrowService
+
+TARGET = [[860, 300], [1060, 300], [1060, 520], [860, 520]]
+FRAME_SIZE = (1920, 1080)
+BUFFER_SIZE = 50
+
+
+def descend(x, y0, y1, n, bounce=0):
+    """y0 에서 y1 까지 내려온 뒤 bounce 개 점만큼 튀어오르는 tip 좌표"""
+    points = [(x, y0 + (y1 - y0) * i / max(n - 1, 1)) for i in range(n)]
+    points += [(x, y1 - 5.0 * (i + 1)) for i in range(bounce)]
+    return points
+
+
+# 이름 -> (궤적 생성 함수(n), 모래 bbox 수, 기대 판정)
+SCENARIOS = {
+    "inflection_hit": (
+        lambda n: descend(960.0, 100.0, 420.0, n - 2, 2),
+        0,
+        "INFLECTION_HIT",
+    ),
+    "miss_below": (
+        lambda n: descend(960.0, 100.0, 700.0, n - 2, 2),
+        0,
+        "INFLECTION_TARGET_BELOW",
+    ),
+    "splash_only": (lambda n: descend(960.0, 100.0, 100.0, 1), 6, "SPLASH_ONLY_MISS"),
+    "projected": (
+        lambda n: descend(1100.0, 100.0, 420.0, n - 2, 2),
+        0,
+        "PROJECTED_TO_TARGET",
+    ),
+    "miss_general": (lambda n: descend(1300.0, 100.0, 900.0, n), 0, "MISS_GENERAL"),
+}
+
+
+def timeit(fn, number, repeat=5):
+    """repeat 회 중 가장 빠른 1회 평균 (us)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best * 1e6
+
+
+def make_service(points, num_splash, buffer_size=BUFFER_SIZE):
+    service = ArrowService(buffer_size=buffer_size, cooldown_sec=0.0)
+    service.set_target(TARGET, FRAME_SIZE)
+    for i, (x, y) in enumerate(points):
+        service.tracking_buffer.append((x, y), (x - 10, y - 30), 0.9, float(i))
+    for _ in range(num_splash):
+        service.splash_buffer.append([900.0, 500.0, 940.0, 540.0])
+    service.last_event_time = time.time() - 10
+    return service
+
+
+def snapshot(service):
+    """find_hit_point 가 비운 버퍼를 복원하는 함수 (데이터 복사 없음)"""
+    tb = service.tracking_buffer
+    start, length = tb._start, tb._len
+    splashes = list(service.splash_buffer)
+
+    def restore():
+        tb._start, tb._len = start, length
+        service.splash_buffer.clear()
+        service.splash_buffer.extend(splashes)
+
+    return restore
+
+
+def bench_find_hit_point(results, number):
+    for name, (make_points, num_splash, expected) in SCENARIOS.items():
+        for n in (4, 16, BUFFER_SIZE):
+            points = make_points(n)
+            service = make_service(points, num_splash)
+            restore = snapshot(service)
+
+            hit = service.find_hit_point()
+            assert hit is not None and hit["type"] == expected, (name, n, hit)
+
+            def run():
+                restore()
+                service.find_hit_point()
+
+            results[f"find_hit_point[{name},n={len(points)}]"] = timeit(run, number)
+
+
+def bench_add(results, number):
+    event = {
+        "type": "arrow",
+        "tip": [960.0, 420.0],
+        "tail": [950.0, 390.0],
+        "bbox_conf": 0.9,
+        "timestamp": 0.0,
+    }
+    splash = {"type": "splash", "splash_bbox": [900.0, 500.0, 940.0, 540.0]}
+
+    service = ArrowService(buffer_size=BUFFER_SIZE, cooldown_sec=0.0)
+    results["add_event"] = timeit(lambda: service.add_event(event), number)
+    results["add_splash_event"] = timeit(
+        lambda: service.add_splash_event(splash), number
+    )
+
+    batch = [event] * 8
+    results["add_events[batch=8]"] = timeit(
+        lambda: service.add_events(batch), number // 8
+    )
+
+
+def bench_idle(results, number, cams):
+    points = SCENARIOS["inflection_hit"][0](BUFFER_SIZE)
+    service = make_service(points, 0)
+    service.last_event_time = time.time()
+    results["is_idle"] = timeit(service.is_idle, number)
+
+    for num_cams in cams:
+        services = [make_service(points, 0) for _ in range(num_cams)]
+        for s in services:
+            s.last_event_time = time.time()
+
+        def scan():
+            for s in services:
+                s.is_idle()
+
+        def deadlines():
+            for s in services:
+                s.next_deadline()
+
+        loops = max(number // num_cams, 1)
+        results[f"registry_scan[is_idle,cams={num_cams}]"] = timeit(scan, loops)
+        results[f"registry_scan[next_deadline,cams={num_cams}]"] = timeit(
+            deadlines, loops
+        )
+
+
+def bench_visualize(results, number):
+    points = SCENARIOS["inflection_hit"][0](BUFFER_SIZE)
+    service = make_service(points, 0)
+    service.last_frame = np.random.default_rng(0).integers(
+        0, 255, (FRAME_SIZE[1], FRAME_SIZE[0], 3), dtype=np.uint8
+    )
+
+    # 시각화 결과가 실제 저장 경로에 쌓이지 않도록 임시 디렉터리 사용
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = visualizer_module.BASE_DIR
+        visualizer_module.BASE_DIR = tmp
+        try:
+            results["visualize_buffer[1080p,n=50]"] = timeit(
+                lambda: service.visualize_buffer(
+                    [960.0, 420.0], "INFLECTION_HIT", 320.0
+                ),
+                number,
+                repeat=3,
+            )
+            results["snapshot_hit[1080p,n=50]"] = timeit(
+                lambda: service.snapshot_hit([960.0, 420.0], "INFLECTION_HIT", 320.0),
+                number * 100,
+            )
+        finally:
+            visualizer_module.BASE_DIR = base_dir
+
+
+def git_revision():
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True
+        )
+        return out.stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = value / base if base > 0 else 1.0
+        mark = "  REGRESSION" if ratio > threshold else ""
+        print(f"{name:<52}{base:>10.2f}{value:>10.2f}{ratio:>8.2f}x{mark}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=2000, help="측정 반복 횟수")
+    parser.add_argument("--cams", type=int, nargs="+", default=[4, 16, 64, 256])
+    parser.add_argument("--save", help="결과 저장 경로 (json)")
+    parser.add_argument("--compare", help="비교할 기준 결과 (json)")
+    parser.add_argument("--threshold", type=float, default=1.3)
+    args = parser.parse_args()
+
+    results = {}
+    bench_add(results, args.number)
+    bench_idle(results, args.number, args.cams)
+    bench_find_hit_point(results, args.number)
+    bench_visualize(results, max(args.number // 200, 3))
+
+    for name, value in results.items():
+        print(f"{name:<52}{value:>10.2f}us")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "revision": git_revision(),
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "results_us": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results_us"]
+
+        print(f"\n{'name':<52}{'base':>10}{'now':>10}{'ratio':>9}")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)}개 항목이 {args.threshold}배 이상 느려짐")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""이벤트 수신 벤치마크 (카메라별 스레드 vs 단일 Poller)
+
+    python -m scripts.bench_ingest --cams 4 16 64 --rate 60 --duration 5
+"""
+
+import argparse
+import multiprocessing as mp
+import threading
+import time
+
+import zmq
+
+from subscriber import IngestEngine
+
+
+def _ipc_name(i):
+    return f"bench_ingest_{i}"
+
+
+def publisher(num_cams, rate, duration, ready):
+    ctx = zmq.Context()
+    sockets = []
+    for i in range(num_cams):
+        s = ctx.socket(zmq.PUB)
+        s.setsockopt(zmq.SNDHWM, 100000)
+        s.bind(f"ipc:///tmp/{_ipc_name(i)}.ipc")
+        sockets.append(s)
+
+    ready.set()
+    time.sleep(1.0)  # slow joiner
+
+    interval = 1.0 / rate
+    event = {
+        "type": "arrow",
+        "tip": [812.5, 433.0],
+        "tail": [790.0, 401.25],
+        "bbox_conf": 0.82,
+        "timestamp": 0.0,
+    }
+    end = time.time() + duration
+    next_tick = time.time()
+    while time.time() < end:
+        event["timestamp"] = time.time()
+        for s in sockets:
+            s.send_json(event)
+        next_tick += interval
+        delay = next_tick - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    for s in sockets:
+        s.close()
+    ctx.term()
+
+
+def run_legacy(num_cams, on_event, stop):
+    def run(i):
+        ctx = zmq.Context()
+        socket = ctx.socket(zmq.SUB)
+        socket.setsockopt(zmq.RCVTIMEO, 200)
+        socket.connect(f"ipc:///tmp/{_ipc_name(i)}.ipc")
+        socket.subscribe("")
+        while not stop.is_set():
+            try:
+                on_event(i, [socket.recv_json()])
+            except zmq.Again:
+                continue
+        socket.close()
+        ctx.term()
+
+    threads = [threading.Thread(target=run, args=(i,), daemon=True) for i in range(num_cams)]
+    for t in threads:
+        t.start()
+    return lambda: [t.join() for t in threads]
+
+
+def run_engine(num_cams, on_event, stop):
+    engine = IngestEngine()
+    for i in range(num_cams):
+        engine.subscribe(_ipc_name(i), i, on_event)
+    engine.start()
+    return engine.stop
+
+
+def bench(mode, num_cams, rate, duration):
+    counter = [0]
+    lock = threading.Lock()
+
+    def on_event(cam_id, events):
+        with lock:
+            counter[0] += len(events)
+
+    ready = mp.Event()
+    proc = mp.Process(target=publisher, args=(num_cams, rate, duration, ready))
+    proc.start()
+    ready.wait()
+
+    stop = threading.Event()
+    runner = run_legacy if mode == "thread" else run_engine
+    shutdown = runner(num_cams, on_event, stop)
+
+    time.sleep(1.0)
+    cpu0, wall0, n0 = time.process_time(), time.perf_counter(), counter[0]
+    proc.join()
+    cpu1, wall1, n1 = time.process_time(), time.perf_counter(), counter[0]
+
+    stop.set()
+    shutdown()
+
+    wall = wall1 - wall0
+    return {
+        "mode": mode,
+        "cams": num_cams,
+        "events": n1 - n0,
+        "events_per_sec": (n1 - n0) / wall,
+        "cpu_pct": 100.0 * (cpu1 - cpu0) / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cams", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--rate", type=float, default=60.0, help="카메라당 초당 이벤트")
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8}{'cams':>6}{'events':>10}{'ev/s':>12}{'cpu%':>8}")
+    for num_cams in args.cams:
+        for mode in ("thread", "poller"):
+            r = bench(mode, num_cams, args.rate, args.duration)
+            print(
+                f"{r['mode']:<8}{r['cams']:>6}{r['events']:>10}"
+                f"{r['events_per_sec']:>12.1f}{r['cpu_pct']:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""프레임 합성 위치에 따른 이벤트 루프 지연 비교 (루프 안 합성 vs compose_executor)
+
+카메라마다 공유 메모리에 30fps 로 프레임을 쓰는 생산자 스레드와 시청자 트랙을 띄우고,
+LoopLagMonitor 로 루프 지연을 측정
+
+    python -m scripts.bench_loop_lag --cameras 4 --viewers 2 --seconds 5
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, Future
+
+import numpy as np
+
+import services.frame.shm_registry as shm_registry
+import services.webrtc.broadcaster as broadcaster_module
+import services.webrtc.video_track as video_track_module
+from services.arrow.service import ArrowService
+from services.monitor.loop_lag import LoopLagMonitor
+from services.person.service import PersonService
+from utils.frame_shm import FrameBuffer
+
+TARGET = [[860, 300], [1060, 310], [1050, 520], [870, 515]]
+THREAD_EXECUTOR = broadcaster_module.compose_executor
+
+
+class InlineExecutor(Executor):
+    """submit 한 함수를 호출한 스레드(이벤트 루프)에서 바로 실행 (기존 방식 재현)"""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def produce(shm, stop, fps=30):
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 255, shm.shape, dtype=np.uint8) for _ in range(4)]
+    i = 0
+    while not stop.is_set():
+        shm.write(frames[i % len(frames)])
+        i += 1
+        stop.wait(1.0 / fps)
+
+
+async def view(track, stop):
+    while not stop.is_set():
+        await track.recv()
+
+
+async def run(mode, args):
+    executor = InlineExecutor() if mode == "inline" else THREAD_EXECUTOR
+    broadcaster_module.compose_executor = executor
+    video_track_module.compose_executor = executor
+    broadcaster_module._broadcasters.clear()
+    shm_registry._shm_map.clear()
+
+    stop = threading.Event()
+    buffers, producers = [], []
+    for i in range(args.cameras):
+        shape = (args.height, args.width, 3)
+        shm = FrameBuffer(f"shm_bench_lag_{i}", shape, create=True)
+        buffers.append(shm)
+        t = threading.Thread(target=produce, args=(shm, stop), daemon=True)
+        t.start()
+        producers.append(t)
+
+    arrow_service = ArrowService()
+    arrow_service.set_target(TARGET, (args.width, args.height))
+    arrow_service.current_arrow = {"tip": [950, 420], "tail": [930, 380]}
+    person_service = PersonService()
+
+    tracks = [
+        video_track_module.CameraVideoTrack(
+            f"bench_lag_{i}", arrow_service, person_service
+        )
+        for i in range(args.cameras)
+        for _ in range(args.viewers)
+    ]
+
+    monitor = LoopLagMonitor(interval=0.01, window=100000, warn_ms=float("inf"))
+    monitor.start()
+    viewers = [asyncio.ensure_future(view(track, stop)) for track in tracks]
+
+    await asyncio.sleep(args.seconds)
+    stats = monitor.get_stats()
+    composed = sum(b.composed for b in broadcaster_module._broadcasters.values())
+
+    stop.set()
+    await monitor.stop()
+    for track in tracks:
+        track.stop()
+    for task in viewers:
+        task.cancel()
+    await asyncio.gather(*viewers, return_exceptions=True)
+    for t in producers:
+        t.join()
+    for shm in buffers:
+        shm.close()
+        shm.unlink()
+
+    return stats, composed / args.seconds / args.cameras
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cameras", type=int, default=4)
+    parser.add_argument("--viewers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--width", type=int, default=1920)
+    args = parser.parse_args()
+
+    print(
+        f"{args.cameras} cameras x {args.viewers} viewers, "
+        f"{args.width}x{args.height}, {broadcaster_module.COMPOSE_WORKERS} workers"
+    )
+    print(f"{'mode':10}{'fps/cam':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for mode in ("inline", "executor"):
+        stats, fps = asyncio.run(run(mode, args))
+        print(
+            f"{mode:10}{fps:9.1f}{stats['p50_ms']:9.2f}"
+            f"{stats['p99_ms']:9.2f}{stats['max_ms']:9.2f}"
+        )
+        time.sleep(0.2)
+
+
+if __name__ == "__main__":
+    main()
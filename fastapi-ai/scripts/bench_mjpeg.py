@@ -0,0 +1,155 @@
+"""MJPEG 시청자 수에 따른 JPEG 인코딩 비용 비교 (시청자별 인코딩 vs JpegCache 공유)
+
+공유 메모리에 30fps 로 프레임을 쓰는 생산자 스레드 하나와 MJPEG 시청자 N 명을 띄워
+초당 인코딩 횟수 / 시청자별 fps / 프로세스 CPU 를 측정
+
+    python -m scripts.bench_mjpeg --viewers 1 10 50 --seconds 5
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+import cv2
+import numpy as np
+
+import services.frame.shm_registry as shm_registry
+import services.webrtc.broadcaster as broadcaster_module
+from services.arrow.service import ArrowService
+from services.person.service import PersonService
+from services.webrtc.jpeg_cache import JpegCache
+from utils.frame_shm import FrameBuffer
+
+TARGET = [[860, 300], [1060, 310], [1050, 520], [870, 515]]
+
+
+def produce(shm, stop, fps=30):
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (shm.shape[0] // 8, shm.shape[1] // 8, 3), np.uint8)
+    base = cv2.resize(base, (shm.shape[1], shm.shape[0]))
+    frames = [base + rng.integers(0, 3, shm.shape, dtype=np.uint8) for _ in range(4)]
+    i = 0
+    while not stop.is_set():
+        shm.write(frames[i % len(frames)])
+        i += 1
+        stop.wait(1.0 / fps)
+
+
+class PerViewerEncoder:
+    """기존 방식 재현: 시청자마다 합성 프레임을 직접 인코딩"""
+
+    scale = None
+
+    def __init__(self, broadcaster, quality, fps):
+        self.broadcaster = broadcaster
+        self.quality = quality
+        self.interval = 1.0 / fps
+        self.encoded = 0
+
+    def get_stats(self):
+        return {}
+
+    def _encode(self, image):
+        self.encoded += 1
+        params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+        return cv2.imencode(".jpg", image, params)[1].tobytes()
+
+    async def frames(self):
+        loop = asyncio.get_running_loop()
+        last_seq = 0
+        while True:
+            started = time.monotonic()
+            last_seq, image = await self.broadcaster.next_image(last_seq)
+            yield await loop.run_in_executor(
+                broadcaster_module.compose_executor, self._encode, image
+            )
+            delay = self.interval - (time.monotonic() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+
+async def view(frames, counts, i):
+    async for _ in frames:
+        counts[i] += 1
+
+
+async def run(mode, viewers, args):
+    broadcaster_module._broadcasters.clear()
+    shm_registry._shm_map.clear()
+
+    shm = FrameBuffer("shm_bench_mjpeg", (args.height, args.width, 3), create=True)
+    stop = threading.Event()
+    producer = threading.Thread(target=produce, args=(shm, stop), daemon=True)
+    producer.start()
+
+    arrow_service = ArrowService()
+    arrow_service.set_target(TARGET, (args.width, args.height))
+    person_service = PersonService()
+    broadcaster = broadcaster_module.get_broadcaster(
+        "bench_mjpeg", arrow_service, person_service
+    )
+    # 정지 장면 게이팅 없이 매 프레임 합성
+    broadcaster.activity.update = lambda frame=None: True
+
+    if mode == "per-viewer":
+        encoders = [
+            PerViewerEncoder(broadcaster, args.quality, args.fps)
+            for _ in range(viewers)
+        ]
+        for encoder in encoders:
+            broadcaster.subscribe(encoder)
+        streams = [encoder.frames() for encoder in encoders]
+    else:
+        cache = JpegCache(broadcaster, quality=args.quality, max_fps=args.fps)
+        streams = [cache.frames() for _ in range(viewers)]
+
+    counts = [0] * viewers
+    cpu = time.process_time()
+    tasks = [asyncio.ensure_future(view(s, counts, i)) for i, s in enumerate(streams)]
+    await asyncio.sleep(args.seconds)
+    cpu = time.process_time() - cpu
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if mode == "per-viewer":
+        encoded = sum(encoder.encoded for encoder in encoders)
+        for encoder in encoders:
+            broadcaster.unsubscribe(encoder)
+    else:
+        encoded = cache.encoded
+        broadcaster.unsubscribe(cache)
+
+    stop.set()
+    producer.join()
+    shm.close()
+    shm.unlink()
+
+    return encoded / args.seconds, min(counts) / args.seconds, cpu / args.seconds
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--viewers", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--fps", type=float, default=10)
+    parser.add_argument("--quality", type=int, default=80)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--width", type=int, default=1920)
+    args = parser.parse_args()
+
+    print(f"{args.width}x{args.height}, MJPEG {args.fps:g}fps, quality {args.quality}")
+    print(
+        f"{'mode':12}{'viewers':>8}{'encodes/s':>11}"
+        f"{'min fps':>9}{'cpu cores':>11}"
+    )
+    for viewers in args.viewers:
+        for mode in ("per-viewer", "cached"):
+            encodes, fps, cpu = asyncio.run(run(mode, viewers, args))
+            print(f"{mode:12}{viewers:8}{encodes:11.1f}{fps:9.1f}{cpu:11.2f}")
+            time.sleep(0.2)
+
+
+if __name__ == "__main__":
+    main()
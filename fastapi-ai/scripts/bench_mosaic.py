@@ -0,0 +1,135 @@
+"""개요 화면 비교: 카메라별 트랙 N 개 vs 모자이크 트랙 1 개 (서버 합성 + 인코딩 CPU)
+
+카메라마다 공유 메모리에 30fps 로 프레임을 쓰는 생산자 스레드를 띄우고, 시청자 한 명이
+- per-camera: 카메라마다 CameraVideoTrack (개요 타일 크기에 맞춘 배율, PeerAdapter 상한 재현)
+- mosaic: MosaicBroadcaster 트랙 하나
+를 받는다고 가정해 프레임을 aiortc 인코더로 인코딩
+
+    python -m scripts.bench_mosaic --cameras 8 --seconds 5
+"""
+
+import argparse
+import asyncio
+import math
+import threading
+import time
+
+import cv2
+import numpy as np
+from aiortc.codecs.vpx import Vp8Encoder
+
+import services.frame.shm_registry as shm_registry
+import services.webrtc.broadcaster as broadcaster_module
+import services.webrtc.mosaic as mosaic_module
+from services.arrow.service import ArrowService
+from services.person.service import PersonService
+from services.webrtc.adaptation import SCALE_LADDER
+from services.webrtc.video_track import BroadcastVideoTrack, CameraVideoTrack
+from utils.frame_shm import FrameBuffer
+
+
+def produce(shm, stop, fps=30):
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (shm.shape[0] // 8, shm.shape[1] // 8, 3), np.uint8)
+    base = cv2.resize(base, (shm.shape[1], shm.shape[0]))
+    frames = [base + rng.integers(0, 3, shm.shape, dtype=np.uint8) for _ in range(4)]
+    i = 0
+    while not stop.is_set():
+        shm.write(frames[i % len(frames)])
+        i += 1
+        stop.wait(1.0 / fps)
+
+
+async def view(track, encoder, stats):
+    loop = asyncio.get_running_loop()
+    while True:
+        frame = await track.recv()
+        payloads, _ = await loop.run_in_executor(None, encoder.encode, frame)
+        stats["frames"] += 1
+        stats["pixels"] += frame.width * frame.height
+        stats["bytes"] += sum(len(p) for p in payloads)
+
+
+async def run(mode, args):
+    broadcaster_module._broadcasters.clear()
+    mosaic_module._mosaics.clear()
+    shm_registry._shm_map.clear()
+
+    stop = threading.Event()
+    cam_ids = [f"bench_mosaic_{i}" for i in range(args.cameras)]
+    buffers, producers = [], []
+    for cam_id in cam_ids:
+        shm = FrameBuffer(f"shm_{cam_id}", (args.height, args.width, 3), create=True)
+        buffers.append(shm)
+        t = threading.Thread(target=produce, args=(shm, stop), daemon=True)
+        t.start()
+        producers.append(t)
+
+    if mode == "per-camera":
+        # 개요 화면 타일 폭에 맞춰 PeerAdapter 가 고를 배율
+        tile_w = args.mosaic_width / math.ceil(math.sqrt(args.cameras))
+        scale = min((s for s in SCALE_LADDER if s * args.width >= tile_w), default=1.0)
+        tracks = []
+        for cam_id in cam_ids:
+            track = CameraVideoTrack(cam_id, ArrowService(), PersonService())
+            track.broadcaster.activity.update = lambda frame=None: True
+            track.set_quality(scale, args.fps)
+            tracks.append(track)
+    else:
+        mosaic = mosaic_module.MosaicBroadcaster(
+            cam_ids, fps_limit=args.fps, width=args.mosaic_width
+        )
+        tracks = [BroadcastVideoTrack("mosaic", mosaic)]
+
+    stats = {"frames": 0, "pixels": 0, "bytes": 0}
+    cpu = time.process_time()
+    viewers = [asyncio.ensure_future(view(t, Vp8Encoder(), stats)) for t in tracks]
+    await asyncio.sleep(args.seconds)
+    cpu = time.process_time() - cpu
+
+    for track in tracks:
+        track.stop()
+    for task in viewers:
+        task.cancel()
+    await asyncio.gather(*viewers, return_exceptions=True)
+    stop.set()
+    for t in producers:
+        t.join()
+    for shm in buffers:
+        shm.close()
+        shm.unlink()
+
+    return len(tracks), cpu / args.seconds, stats
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cameras", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--fps", type=float, default=15)
+    parser.add_argument("--mosaic-width", type=int, default=1920)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--width", type=int, default=1920)
+    args = parser.parse_args()
+
+    print(f"{args.cameras} cameras {args.width}x{args.height}, {args.fps:g}fps, VP8")
+    print(
+        f"{'mode':12}{'tracks':>7}{'cpu cores':>11}{'cam fps':>9}"
+        f"{'cpu ms/cam-frame':>18}{'Mpx/s':>8}{'kbps':>8}"
+    )
+    for mode in ("per-camera", "mosaic"):
+        tracks, cpu, stats = asyncio.run(run(mode, args))
+        # 카메라 하나가 화면에서 갱신되는 빈도 (모자이크는 프레임마다 전체 카메라 갱신)
+        cam_fps = stats["frames"] / args.seconds
+        cam_fps = cam_fps / args.cameras if mode == "per-camera" else cam_fps
+        print(
+            f"{mode:12}{tracks:7}{cpu:11.2f}{cam_fps:9.1f}"
+            f"{cpu / max(cam_fps * args.cameras, 1e-9) * 1000:18.2f}"
+            f"{stats['pixels'] / args.seconds / 1e6:8.1f}"
+            f"{stats['bytes'] * 8 / args.seconds / 1000:8.0f}"
+        )
+        time.sleep(0.2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""과녁 외곽선 프레임당 비용 비교
+
+- per_frame: 기존 방식 (매 프레임 np.array(target).reshape + polylines)
+- cached:    TargetOverlay (좌표 배열을 과녁 변경 시 한 번만 준비)
+- mask_blend: 미리 그린 알파 레이어를 과녁 ROI 에 합성 (참고용)
+
+과녁만 그리는 비용과 전체 합성(compose_frame) 비용을 따로 측정
+
+    python -m scripts.bench_overlay --frames 1000
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from services.arrow.service import ArrowService
+from services.person.service import PersonService
+from services.webrtc.broadcaster import compose_frame
+from services.webrtc.overlay import TARGET_COLOR, TARGET_THICKNESS, TargetOverlay
+
+TARGET = [[860, 300], [1060, 310], [1050, 520], [870, 515]]
+
+
+def draw_per_frame(frame, target):
+    pts = np.array(target, dtype=np.int32).reshape((-1, 1, 2))
+    cv2.polylines(frame, [pts], True, TARGET_COLOR, TARGET_THICKNESS, cv2.LINE_AA)
+
+
+class MaskBlend:
+    """외곽선을 알파 레이어로 미리 그려 두고 ROI 에만 합성"""
+
+    def __init__(self, geometry, frame_shape):
+        h, w = frame_shape[:2]
+        pad = TARGET_THICKNESS + 2
+        min_x, min_y, max_x, max_y = geometry.bbox
+        self.x0, self.y0 = max(min_x - pad, 0), max(min_y - pad, 0)
+        self.x1, self.y1 = min(max_x + pad + 1, w), min(max_y + pad + 1, h)
+
+        alpha = np.zeros((self.y1 - self.y0, self.x1 - self.x0), dtype=np.uint8)
+        local = (geometry.points - (self.x0, self.y0)).reshape(-1, 1, 2)
+        cv2.polylines(alpha, [local], True, 255, TARGET_THICKNESS, cv2.LINE_AA)
+
+        alpha3 = cv2.merge([alpha, alpha, alpha])
+        self.inv_alpha = 255 - alpha3
+        color = np.empty_like(alpha3)
+        color[:] = TARGET_COLOR
+        self.color = cv2.multiply(color, alpha3, scale=1 / 255)
+
+    def apply(self, frame):
+        roi = frame[self.y0 : self.y1, self.x0 : self.x1]
+        cv2.add(cv2.multiply(roi, self.inv_alpha, scale=1 / 255), self.color, dst=roi)
+
+
+def timeit(fn, frames, repeat=5):
+    """repeat 회 중 가장 빠른 회차의 프레임당 ms"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(frames):
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best / frames * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--height", type=int, default=1080)
+    parser.add_argument("--width", type=int, default=1920)
+    args = parser.parse_args()
+
+    frame = np.random.default_rng(0).integers(
+        0, 255, (args.height, args.width, 3), dtype=np.uint8
+    )
+
+    arrow_service = ArrowService()
+    arrow_service.set_target(TARGET, (args.width, args.height))
+    arrow_service.current_arrow = {"tip": [950, 420], "tail": [930, 380]}
+    arrow_service.current_splash = [900, 500, 940, 540]
+    person_service = PersonService()
+    person_service.update_detections({"bbox": [200, 300, 420, 900], "conf": 0.91})
+
+    target = arrow_service.target.tolist()  # 기존 코드처럼 매번 배열로 변환
+    overlay = TargetOverlay(arrow_service.geometry, frame.shape)
+    mask = MaskBlend(arrow_service.geometry, frame.shape)
+
+    canvas = frame.copy()
+    target_ms = {
+        "per_frame": timeit(lambda: draw_per_frame(canvas, target), args.frames),
+        "cached": timeit(lambda: overlay.apply(canvas), args.frames),
+        "mask_blend": timeit(lambda: mask.apply(canvas), args.frames),
+    }
+
+    services = (arrow_service, person_service)
+    compose_ms = {
+        "per_frame": timeit(lambda: compose_frame(frame, *services), args.frames),
+        "cached": timeit(lambda: compose_frame(frame, *services, overlay), args.frames),
+    }
+
+    print(f"{'':14}{'target only ms':>16}{'compose_frame ms':>18}")
+    for name, ms in target_ms.items():
+        compose = f"{compose_ms[name]:18.3f}" if name in compose_ms else f"{'-':>18}"
+        print(f"{name:14}{ms:16.4f}{compose}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""사람 추적기 비용 / ID 유지 확인 (PersonService.update_detections, 레인 N 개 x 30Hz)
+
+레인마다 선수 몇 명이 조금씩 움직이고 (감지 흔들림 포함), 일부 프레임은 감지를 놓치며
+가끔 오검출이 섞인 감지 결과를 만든다. 매칭은 Hungarian(scipy) / greedy 둘 다 측정.
+ID 전환: 실제 같은 사람에게 붙은 트랙 id 가 바뀐 횟수
+
+    python -m scripts.bench_person_tracker --lanes 16 --seconds 10
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import services.person.tracker as tracker_module
+from services.person.service import PersonService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_frames(args, rng):
+    """레인별 프레임 목록: [(감지 목록, 실제 사람 idx 목록)]"""
+    steps = int(args.seconds * args.fps)
+    lanes = []
+    for _ in range(args.lanes):
+        people = rng.integers(1, args.max_people + 1)
+        # 사람끼리 겹치지 않게 가로로 나란히
+        x = 150 + np.arange(people) * 380 + rng.uniform(0, 60, people)
+        y = rng.uniform(250, 350, people)
+        frames = []
+        for _ in range(steps):
+            x = x + rng.normal(0, 2.0, people)
+            y = y + rng.normal(0, 1.0, people)
+            dets, truth = [], []
+            for i in range(people):
+                if rng.random() < args.miss:
+                    continue
+                jitter = rng.normal(0, 4.0, 4)
+                bbox = [x[i], y[i], x[i] + 220, y[i] + 600] + jitter
+                dets.append({"bbox": bbox.tolist(), "conf": float(rng.uniform(0.6, 0.95))})
+                truth.append(i)
+            if rng.random() < args.false_positive:
+                fx, fy = rng.uniform(0, 1700), rng.uniform(0, 500)
+                dets.append({"bbox": [fx, fy, fx + 120, fy + 300], "conf": 0.4})
+                truth.append(None)
+            frames.append((dets, truth))
+        lanes.append(frames)
+    return lanes
+
+
+def run(lanes, args):
+    clock = FakeClock()
+    services = [PersonService(clock=clock) for _ in lanes]
+    assigned = [{} for _ in lanes]  # 실제 사람 idx -> 마지막 트랙 id
+    switches = 0
+    elapsed = 0.0
+
+    for step in range(len(lanes[0])):
+        clock.now = step / args.fps
+        for lane, (service, frames) in enumerate(zip(services, lanes)):
+            dets, truth = frames[step]
+            start = time.perf_counter()
+            service.update_detections(dets)
+            elapsed += time.perf_counter() - start
+
+            # 감지 순서대로 트랙 bbox 와 맞춰 실제 사람 → 트랙 id 확인
+            tracks = service.get_tracks()
+            for det, person in zip(dets, truth):
+                if person is None:
+                    continue
+                bbox = np.array(det["bbox"])
+                track = next(
+                    (t for t in tracks if np.allclose(t["bbox"], bbox)), None
+                )
+                if track is None:
+                    continue
+                previous = assigned[lane].get(person)
+                if previous is not None and previous != track["track_id"]:
+                    switches += 1
+                assigned[lane][person] = track["track_id"]
+
+    updates = len(lanes) * len(lanes[0])
+    created = sum(s.get_stats()["created"] for s in services)
+    people = sum(len(a) for a in assigned)
+    return {
+        "us": elapsed / updates * 1e6,
+        "load": elapsed / args.seconds * 100,
+        "switches": switches,
+        "created": created,
+        "people": people,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lanes", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--max-people", type=int, default=4)
+    parser.add_argument("--miss", type=float, default=0.1, help="감지 누락 비율")
+    parser.add_argument("--false-positive", type=float, default=0.05)
+    args = parser.parse_args()
+
+    lanes = make_frames(args, np.random.default_rng(0))
+    print(
+        f"{args.lanes} lanes x {args.fps:g}Hz, {args.seconds:g}s, "
+        f"1~{args.max_people} people/lane, miss {args.miss:g}, fp {args.false_positive:g}"
+    )
+    print(
+        f"{'matcher':10}{'us/update':>11}{'core %':>8}{'id switches':>13}"
+        f"{'tracks':>8}{'people':>8}"
+    )
+    hungarian = tracker_module.linear_sum_assignment
+    for name, matcher in (("hungarian", hungarian), ("greedy", None)):
+        if name == "hungarian" and matcher is None:
+            print(f"{name:10} (scipy 없음)")
+            continue
+        tracker_module.linear_sum_assignment = matcher
+        r = run(lanes, args)
+        print(
+            f"{name:10}{r['us']:11.1f}{r['load']:8.2f}{r['switches']:13}"
+            f"{r['created']:8}{r['people']:8}"
+        )
+    tracker_module.linear_sum_assignment = hungarian
+
+
+if __name__ == "__main__":
+    main()
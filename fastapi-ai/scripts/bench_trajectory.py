@@ -0,0 +1,156 @@
+"""화살 궤적 WebSocket 스트리밍 비교
+(json: 클라이언트마다 좌표 변환 + 절대 좌표 JSON vs routers.ws: video_size 별 변환 +
+msgpack 차이 프레임 + 클라이언트별 전송 간격 제한)
+
+수신 스레드 대신 --event-fps 로 current_arrow / current_splash 를 갱신하는 작업을 돌린다.
+화살이 날아가는 구간과 아무것도 없는 구간을 번갈아 재생.
+
+    python -m scripts.bench_trajectory --clients 200 --seconds 5
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import orjson
+
+import routers.ws as ws_module
+from scripts.bench_ws_broadcast import TARGET, VIDEO_SIZES
+from services.arrow.registry import arrow_registry
+from services.arrow.trajectory import TRAJECTORY_MAX_FPS
+
+CAM_ID = "bench_trajectory"
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+
+    async def send_text(self, text):
+        self.frames += 1
+        self.bytes += len(text.encode())
+
+    async def send_bytes(self, data):
+        self.frames += 1
+        self.bytes += len(data)
+
+    async def close(self, code=1000):
+        pass
+
+
+async def play_flights(arrow_service, args):
+    """1 초 비행 (화면을 가로지르는 화살, 끝에 모래 튀김) + 1 초 공백 반복"""
+    start = time.monotonic()
+    while True:
+        t = (time.monotonic() - start) % 2.0
+        if t < 1.0:
+            x = 200 + t * 1500
+            y = 700 - 600 * t + 400 * t * t
+            arrow_service.current_arrow = {"tip": [x, y], "tail": [x - 90, y + 20]}
+            arrow_service.current_splash = (
+                [x - 30, y - 10, x + 30, y + 20] if t > 0.8 else None
+            )
+        else:
+            arrow_service.current_arrow = None
+            arrow_service.current_splash = None
+        await asyncio.sleep(1.0 / args.event_fps)
+
+
+def legacy_tick(arrow_service, clients, now, fps):
+    """비교용: 클라이언트마다 변환 / 절대 좌표 JSON, 간격만 제한"""
+    for client in clients:
+        if now - client.sent_at < 1.0 / fps:
+            continue
+        client.sent_at = now
+        arrow = arrow_service.current_arrow
+        splash = arrow_service.current_splash
+        payload = {"type": "trajectory", "arrow": None, "splash": None}
+        if arrow:
+            payload["arrow"] = [
+                *arrow_service.to_render_coords(*arrow["tip"], client.video_size),
+                *arrow_service.to_render_coords(*arrow["tail"], client.video_size),
+            ]
+        if splash:
+            x1, y1, x2, y2 = splash
+            payload["splash"] = [
+                *arrow_service.to_render_coords(x1, y1, client.video_size),
+                *arrow_service.to_render_coords(x2, y2, client.video_size),
+            ]
+        ws_module.send_to(client, orjson.dumps(payload).decode())
+
+
+async def run(mode, args):
+    arrow_service = arrow_registry.get(CAM_ID)
+    arrow_service.set_target(TARGET, (1920, 1080))
+
+    rng = random.Random(0)
+    ws_module.connected_clients[CAM_ID] = {}
+    sockets = []
+    for _ in range(args.clients):
+        ws = FakeWebSocket()
+        client = ws_module.WsClient(ws, CAM_ID, maxsize=1024)
+        client.video_size = rng.choice(VIDEO_SIZES)
+        client.sent_at = float("-inf")
+        ws_module.connected_clients[CAM_ID][ws] = client
+        sockets.append(ws)
+        if mode == "delta":
+            ws_module.subscribe_trajectory(client, {"fps": args.fps})
+
+    player = asyncio.ensure_future(play_flights(arrow_service, args))
+    cpu = time.process_time()
+    if mode == "json":
+        end = time.monotonic() + args.seconds
+        clients = list(ws_module.connected_clients[CAM_ID].values())
+        while time.monotonic() < end:
+            legacy_tick(arrow_service, clients, time.monotonic(), args.fps)
+            await asyncio.sleep(1.0 / TRAJECTORY_MAX_FPS)
+    else:
+        await asyncio.sleep(args.seconds)
+    cpu = time.process_time() - cpu
+
+    player.cancel()
+    for client in list(ws_module.connected_clients[CAM_ID].values()):
+        client.trajectory = None
+        ws_module.remove_client(client)
+    ws_module.connected_clients.pop(CAM_ID, None)
+    await asyncio.sleep(0.1)
+
+    frames = sum(ws.frames for ws in sockets)
+    total = sum(ws.bytes for ws in sockets)
+    return {
+        "msgs": frames / args.clients / args.seconds,
+        "bytes": total / args.clients / args.seconds,
+        "avg": total / max(frames, 1),
+        "cpu": cpu / args.seconds * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--fps", type=float, default=15, help="클라이언트별 전송 상한")
+    parser.add_argument("--event-fps", type=float, default=30, help="추론 이벤트 빈도")
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} clients, {len(VIDEO_SIZES)} video sizes, "
+        f"{args.fps:g} fps/client, events {args.event_fps:g} fps"
+    )
+    print(
+        f"{'mode':7}{'msgs/s/client':>15}{'B/s/client':>12}{'B/msg':>8}"
+        f"{'cpu ms/s':>10}"
+    )
+    for mode in ("json", "delta"):
+        r = asyncio.run(run(mode, args))
+        print(
+            f"{mode:7}{r['msgs']:15.1f}{r['bytes']:12.0f}{r['avg']:8.1f}"
+            f"{r['cpu']:10.1f}"
+        )
+    print(f"ws stats: {dict(ws_module.ws_stats)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""화살 적중 WebSocket 브로드캐스트 비교 (기존: 클라이언트마다 순서대로 send_json
+vs routers.ws: video_size 그룹별 변환 / 직렬화 한 번 + 클라이언트별 송신 큐)
+
+실제 네트워크 대신 전송 지연을 흉내 내는 가짜 WebSocket 을 쓴다.
+대부분은 빠른 클라이언트, --slow-ratio 만큼은 전송이 --slow-sec 걸리는 느린 클라이언트.
+
+    python -m scripts.bench_ws_broadcast --clients 1000 --hits 3
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+import routers.ws as ws_module
+from services.arrow.registry import arrow_registry
+
+CAM_ID = "bench_ws"
+TARGET = [[860, 300], [1060, 310], [1050, 520], [870, 515]]
+VIDEO_SIZES = [(390, 219), (412, 232), (768, 432), (1280, 720), (1920, 1080), (360, 202)]
+
+
+class FakeWebSocket:
+    def __init__(self, latency, slow):
+        self.latency = latency
+        self.slow = slow
+        self.received = []  # (수신 시각, text)
+
+    async def send_text(self, text):
+        await asyncio.sleep(self.latency)
+        self.received.append((time.perf_counter(), text))
+
+    async def send_json(self, data):
+        # starlette WebSocket.send_json 과 같은 직렬화
+        text = json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+        await self.send_text(text)
+
+    async def close(self, code=1000):
+        pass
+
+
+async def legacy_broadcast(clients, arrow_service, event):
+    """기존 (클라이언트마다 순서대로 send_json) 브로드캐스트 동작 재현"""
+    raw_x, raw_y = event["tip"]
+    for ws, info in list(clients.items()):
+        video_size = info.get("video_size")
+        if video_size is None:
+            continue
+        render_tip = arrow_service.to_render_coords(raw_x, raw_y, video_size)
+        payload = {"type": "hit", "tip": render_tip, "inside": event["inside"]}
+        try:
+            await ws.send_json(payload)
+        except Exception:
+            pass
+
+
+def make_sockets(args):
+    rng = random.Random(0)
+    sockets = []
+    for _ in range(args.clients):
+        slow = rng.random() < args.slow_ratio
+        latency = args.slow_sec if slow else rng.uniform(0, args.fast_ms / 1000)
+        sockets.append((FakeWebSocket(latency, slow), rng.choice(VIDEO_SIZES)))
+    return sockets
+
+
+async def run(mode, args):
+    arrow_service = arrow_registry.get(CAM_ID)
+    arrow_service.set_target(TARGET, (1920, 1080))
+    sockets = make_sockets(args)
+
+    if mode == "legacy":
+        clients = {ws: {"video_size": size} for ws, size in sockets}
+    else:
+        ws_module.connected_clients[CAM_ID] = {}
+        for ws, size in sockets:
+            client = ws_module.WsClient(ws, CAM_ID)
+            client.video_size = size
+            ws_module.connected_clients[CAM_ID][ws] = client
+
+    latencies = []  # 빠른 클라이언트가 적중을 받기까지 걸린 시간 (초)
+    # 클라이언트별 송신 작업까지 포함한 프로세스 CPU (대기 중에는 CPU 를 쓰지 않음)
+    cpu = time.process_time()
+    for i in range(args.hits):
+        event = {"type": "hit", "tip": [950 + i, 420], "inside": True}
+        start = time.perf_counter()
+        if mode == "legacy":
+            task = asyncio.ensure_future(legacy_broadcast(clients, arrow_service, event))
+        else:
+            ws_module.fan_out_hit(CAM_ID, event)
+
+        await asyncio.sleep(args.interval)
+        if mode == "legacy":
+            await task
+
+        # 빠른 클라이언트는 적중마다 메시지 하나씩 받음
+        for ws, _ in sockets:
+            if not ws.slow:
+                got = ws.received[i][0] - start if len(ws.received) > i else np.inf
+                latencies.append(got)
+
+    cpu = time.process_time() - cpu
+
+    if mode != "legacy":
+        for client in list(ws_module.connected_clients[CAM_ID].values()):
+            ws_module.remove_client(client)
+        ws_module.connected_clients.pop(CAM_ID, None)
+
+    latencies = np.array(latencies) * 1000
+    return {
+        "in_time": (latencies <= args.deadline * 1000).mean() * 100,
+        "p50": np.percentile(latencies, 50),
+        "p99": np.percentile(latencies, 99),
+        "cpu": cpu / args.hits * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--hits", type=int, default=3)
+    parser.add_argument("--interval", type=float, default=0.5, help="적중 간격 (초)")
+    parser.add_argument("--fast-ms", type=float, default=5)
+    parser.add_argument("--slow-ratio", type=float, default=0.01)
+    parser.add_argument("--slow-sec", type=float, default=3.0)
+    parser.add_argument("--deadline", type=float, default=0.1, help="적시 도착 기준 (초)")
+    args = parser.parse_args()
+
+    print(
+        f"{args.clients} sockets, {len(VIDEO_SIZES)} video sizes, "
+        f"{args.slow_ratio * 100:g}% slow ({args.slow_sec:g}s/send)"
+    )
+    print(
+        f"{'mode':10}{'fast in time %':>16}{'p50 ms':>10}{'p99 ms':>10}"
+        f"{'cpu ms/hit':>12}"
+    )
+    for mode in ("legacy", "grouped"):
+        r = asyncio.run(run(mode, args))
+        print(
+            f"{mode:10}{r['in_time']:16.1f}{r['p50']:10.1f}{r['p99']:10.1f}"
+            f"{r['cpu']:12.2f}"
+        )
+    print(f"ws stats: {dict(ws_module.ws_stats)}")
+
+
+if __name__ == "__main__":
+    main()
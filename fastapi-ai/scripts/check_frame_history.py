@@ -0,0 +1,112 @@
+"""적중 이미지용 프레임 히스토리 크기 확인
+
+가상 시계로 화살 이벤트(--event-fps)와 프레임 샘플(FRAME_HISTORY_FPS)을 흘리고,
+판정 시각(마지막 이벤트 + idle_sec)에 버퍼의 가장 오래된 점에서 적중이 난 경우에도
+_hit_frame 이 last_frame 대신 히스토리 프레임을 찾는지 본다.
+비교로 idle_sec 만으로 잡은 크기(버퍼 길이를 빼먹은 경우)도 함께 출력.
+
+    python -m scripts.check_frame_history
+"""
+
+import argparse
+
+import numpy as np
+
+from services.arrow.service import ArrowService
+from services.frame.history import (
+    FRAME_HISTORY_FPS,
+    FRAME_HISTORY_TOLERANCE_SEC,
+    FrameHistory,
+    frame_history,
+    history_size,
+)
+
+CAM_ID = "check_frame_history"
+SHAPE = (4, 4, 3)
+
+
+def run(size, args):
+    """size 슬롯 링으로 가장 오래된 점 적중을 재생 → (찾은 프레임 시각 또는 None, 요청 시각)"""
+    now = [0.0]
+    service = ArrowService(
+        buffer_size=args.buffer_size,
+        idle_sec=args.idle_sec,
+        cam_id=CAM_ID,
+        clock=lambda: now[0],
+    )
+    service.last_frame = None  # 폴백이면 None 이 나오도록
+    history = FrameHistory(CAM_ID, SHAPE, size)
+    frame_history.histories[CAM_ID] = history
+
+    start = 100.0
+    last_event = start + (args.buffer_size - 1) / args.event_fps
+    judge_at = last_event + args.idle_sec + args.judge_delay
+
+    events = [
+        {
+            "type": "arrow",
+            "tip": [100.0 + i * 10, 500.0 - i],
+            "tail": [90.0 + i * 10, 510.0 - i],
+            "timestamp": start + i / args.event_fps,
+        }
+        for i in range(args.buffer_size)
+    ]
+    frame_ts = np.arange(start, judge_at, 1.0 / FRAME_HISTORY_FPS)
+
+    # 이벤트 / 샘플을 시간 순서대로
+    i = 0
+    for ts in frame_ts:
+        while i < len(events) and events[i]["timestamp"] <= ts:
+            now[0] = events[i]["timestamp"]
+            service.add_events([events[i]])
+            i += 1
+        history.capture(np.zeros(SHAPE, np.uint8), ts)
+    for event in events[i:]:
+        now[0] = event["timestamp"]
+        service.add_events([event])
+
+    try:
+        track = service.tracking_buffer.view()
+        oldest = track[0]
+        hit_point = (oldest["tip_x"], oldest["tip_y"])
+        requested = float(oldest["timestamp"])
+        frame = service._hit_frame(track, hit_point)
+        if frame is None:
+            return None, requested
+        found = history.nearest(requested)
+        return (found[1] if found else None), requested
+    finally:
+        frame_history.histories.pop(CAM_ID, None)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--buffer-size", type=int, default=50)
+    parser.add_argument("--idle-sec", type=float, default=2.0)
+    parser.add_argument("--event-fps", type=float, default=30)
+    parser.add_argument("--judge-delay", type=float, default=0.2, help="스케줄러 지연")
+    args = parser.parse_args()
+
+    service = ArrowService(buffer_size=args.buffer_size, idle_sec=args.idle_sec)
+    window = service.hit_window_sec(args.event_fps)
+    sized = history_size(window, FRAME_HISTORY_FPS)
+    idle_only = history_size(args.idle_sec, FRAME_HISTORY_FPS)
+
+    print(
+        f"buffer {args.buffer_size} @ {args.event_fps:g}fps, idle {args.idle_sec:g}s, "
+        f"sample {FRAME_HISTORY_FPS:g}fps, tolerance {FRAME_HISTORY_TOLERANCE_SEC:g}s"
+    )
+    results = {}
+    for label, size in (("idle only", idle_only), ("hit window", sized)):
+        found, requested = run(size, args)
+        results[label] = found
+        gap = "-" if found is None else f"{abs(found - requested) * 1000:.0f}ms"
+        print(f"{label:11} {size:3} slots  history frame: {found is not None}  gap: {gap}")
+
+    assert results["hit window"] is not None, "가장 오래된 점의 적중 프레임을 찾지 못함"
+    assert abs(results["hit window"] - requested) <= 0.5 / FRAME_HISTORY_FPS + 1e-9
+    print("ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""기록된 이벤트 세그먼트를 새 ArrowService 로 재생해 적중 판정을 재현
+
+    # 가능한 빠르게 재생하고 판정 결과 저장
+    python -m scripts.replay_events records/2026-10-18 --save before.jsonl
+
+    # 판정 로직 변경 후 같은 기록을 재생해 이전 결과와 비교
+    python -m scripts.replay_events records/2026-10-18 --baseline before.jsonl
+
+    # 실제 시간의 10배속으로 재생
+    python -m scripts.replay_events records/2026-10-18/cam1.sbrec --speed 10
+"""
+
+import argparse
+import glob
+import json
+import os
+import time
+from collections import Counter
+
+from services.arrow.service import ArrowService
+from services.person.service import PersonService
+from services.recorder.recorder import SEGMENT_EXT, read_segment
+
+
+class VirtualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def load_records(paths):
+    segments = []
+    for path in paths:
+        if os.path.isdir(path):
+            pattern = os.path.join(path, "**", f"*{SEGMENT_EXT}")
+            segments.extend(sorted(glob.glob(pattern, recursive=True)))
+        else:
+            segments.append(path)
+
+    records = []
+    for segment in segments:
+        cam_id = os.path.basename(segment)[: -len(SEGMENT_EXT)]
+        for ts, kind, events in read_segment(segment):
+            records.append((ts, cam_id, kind, events))
+
+    records.sort(key=lambda r: r[0])
+    return records
+
+
+class Replayer:
+    def __init__(self):
+        self.clock = VirtualClock()
+        self.services = {}
+        self.person_services = {}
+        self.decisions = []
+
+    def service(self, cam_id):
+        if cam_id not in self.services:
+            self.services[cam_id] = ArrowService(cam_id=cam_id, clock=self.clock)
+        return self.services[cam_id]
+
+    def person_service(self, cam_id):
+        if cam_id not in self.person_services:
+            self.person_services[cam_id] = PersonService(clock=self.clock)
+        return self.person_services[cam_id]
+
+    def run_due(self, until):
+        """until 이전에 만기되는 판정을 시간 순서대로 실행 (HitScheduler 와 동일한 시점)
+
+        매번 모든 카메라의 만기 시각을 다시 보며, 판정 후에도 만기 시각이 그대로인
+        카메라만 이번 호출에서 제외한다 (다른 카메라의 만기 판정은 계속 진행).
+        """
+        stalled = set()
+        while True:
+            due = []
+            for cam_id, service in self.services.items():
+                if cam_id in stalled:
+                    continue
+                deadline = service.next_deadline()
+                if deadline is not None and deadline <= until:
+                    due.append((deadline, cam_id))
+            if not due:
+                return
+
+            deadline, cam_id = min(due)
+            # is_idle 은 경계값을 포함하지 않으므로 만기 직후 시각으로 판정
+            self.clock.now = max(self.clock.now, deadline + 1e-6)
+
+            hit = self.services[cam_id].judge()
+            if hit is not None:
+                self.decisions.append(
+                    {
+                        "cam_id": cam_id,
+                        "ts": round(self.clock.now, 3),
+                        "type": hit["type"],
+                        "inside": hit["inside"],
+                        "point": [round(float(v), 2) for v in hit["point"]],
+                    }
+                )
+
+            if self.services[cam_id].next_deadline() == deadline:
+                stalled.add(cam_id)  # 상태가 바뀌지 않는 경우 무한 반복 방지
+
+    def feed(self, ts, cam_id, kind, events):
+        self.run_due(ts)
+        self.clock.now = max(self.clock.now, ts)
+
+        if kind == "arrow":
+            self.service(cam_id).add_events(events)
+        elif kind == "person":
+            self.person_service(cam_id).update_batch(events)
+        elif kind == "target":
+            target = events[-1]
+            self.service(cam_id).set_target(target["target"], target["frame_size"])
+
+    def finish(self):
+        self.run_due(float("inf"))
+
+
+def compare(decisions, baseline):
+    key = lambda d: (d["cam_id"], d["ts"])  # noqa: E731
+    before = {key(d): d for d in baseline}
+    after = {key(d): d for d in decisions}
+
+    added = [after[k] for k in after.keys() - before.keys()]
+    removed = [before[k] for k in before.keys() - after.keys()]
+    changed = [
+        (before[k], after[k])
+        for k in after.keys() & before.keys()
+        if (before[k]["type"], before[k]["inside"], before[k]["point"])
+        != (after[k]["type"], after[k]["inside"], after[k]["point"])
+    ]
+    return added, removed, changed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="+", help="세그먼트 파일 또는 디렉터리")
+    parser.add_argument("--speed", type=float, default=0.0, help="재생 배속 (0: 최대 속도)")
+    parser.add_argument("--save", help="판정 결과 저장 경로 (jsonl)")
+    parser.add_argument("--baseline", help="비교할 이전 판정 결과 (jsonl)")
+    args = parser.parse_args()
+
+    records = load_records(args.paths)
+    if not records:
+        print("재생할 기록 없음")
+        return
+
+    replayer = Replayer()
+    num_events = 0
+    start = time.perf_counter()
+    prev_ts = records[0][0]
+
+    for ts, cam_id, kind, events in records:
+        if args.speed > 0:
+            time.sleep(max(0.0, ts - prev_ts) / args.speed)
+            prev_ts = ts
+        replayer.feed(ts, cam_id, kind, events)
+        num_events += len(events)
+    replayer.finish()
+
+    elapsed = time.perf_counter() - start
+    span = records[-1][0] - records[0][0]
+    print(
+        f"records={len(records)} events={num_events} "
+        f"elapsed={elapsed:.2f}s ({num_events / elapsed:,.0f} ev/s, "
+        f"x{span / elapsed:,.0f} realtime)"
+    )
+    print(f"hits={len(replayer.decisions)}")
+    for hit_type, count in Counter(d["type"] for d in replayer.decisions).most_common():
+        print(f"  {hit_type:<24}{count:>6}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            for d in replayer.decisions:
+                f.write(json.dumps(d) + "\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = [json.loads(line) for line in f if line.strip()]
+
+        added, removed, changed = compare(replayer.decisions, baseline)
+        print(f"diff: +{len(added)} -{len(removed)} ~{len(changed)}")
+        for d in added:
+            print(f"  + {d}")
+        for d in removed:
+            print(f"  - {d}")
+        for before, after in changed:
+            print(f"  ~ {before}\n    → {after}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""기록된 이벤트를 재생해 활동 기반 송신 게이팅(ActivityDetector)의 CPU / 대역폭 절감 추정
+
+1. 화살 / 사람 이벤트 기록을 가상 시계로 재생하며 tick 마다 카메라별 활동 여부 판정
+2. 정지 장면 기준 프레임당 합성 + 인코딩 CPU 와 fps 별 인코딩 비트레이트 측정
+3. 항상 full fps 로 보낼 때와 비활동 구간을 idle fps 로 보낼 때 비교
+
+기록에는 영상이 없으므로 프레임 차분(움직임) 조건은 반영하지 않는다.
+사람 / 화살 이벤트 없이 움직임만 있는 구간은 실제로는 활동으로 잡히므로 절감량은 상한이다.
+
+    python -m scripts.report_motion_gating records/2026-10-18 --viewers 2
+"""
+
+import argparse
+import fractions
+import importlib
+import time
+
+import numpy as np
+from av import VideoFrame
+
+from scripts.replay_events import Replayer, load_records
+from services.arrow.service import ArrowService
+from services.person.service import PersonService
+from services.webrtc.activity import ACTIVE_HOLD_SEC, IDLE_FPS, ActivityDetector
+from services.webrtc.broadcaster import compose_frame
+
+ENCODERS = {
+    "vp8": ("aiortc.codecs.vpx", "Vp8Encoder"),
+    "h264": ("aiortc.codecs.h264", "H264Encoder"),
+}
+
+
+def simulate(records, tick, hold_sec):
+    """카메라별 (활동 시간, 전체 시간) 초"""
+    replayer = Replayer()
+    detectors = {}
+    active = {}
+
+    start, end = records[0][0], records[-1][0]
+    now = start
+    i = 0
+    while now <= end:
+        while i < len(records) and records[i][0] <= now:
+            ts, cam_id, kind, events = records[i]
+            replayer.feed(ts, cam_id, kind, events)
+            if cam_id not in detectors:
+                detectors[cam_id] = ActivityDetector(
+                    replayer.service(cam_id),
+                    replayer.person_service(cam_id),
+                    hold_sec=hold_sec,
+                    clock=replayer.clock,
+                )
+                active[cam_id] = 0.0
+            i += 1
+
+        replayer.run_due(now)
+        replayer.clock.now = max(replayer.clock.now, now)
+        for cam_id, detector in detectors.items():
+            if detector.update():
+                active[cam_id] += tick
+        now += tick
+
+    span = end - start
+    return {cam_id: (min(active[cam_id], span), span) for cam_id in detectors}
+
+
+def measure_encoding(codec, width, height, fps_list, seconds):
+    """정지 장면(센서 노이즈만)에서 fps 별 (bps, 프레임당 합성 ms, 프레임당 인코딩 ms)"""
+    module, name = ENCODERS[codec]
+    encoder_cls = getattr(importlib.import_module(module), name)
+
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (height // 8, width // 8, 3), dtype=np.uint8)
+    base = np.ascontiguousarray(base.repeat(8, axis=0).repeat(8, axis=1))
+    frames = [base + rng.integers(0, 3, base.shape, dtype=np.uint8) for _ in range(8)]
+
+    arrow_service, person_service = ArrowService(), PersonService()
+    time_base = fractions.Fraction(1, 90000)
+
+    results = {}
+    for fps in fps_list:
+        encoder = encoder_cls()
+        count = max(int(seconds * fps), 2)
+        total = 0
+        compose_cpu = encode_cpu = 0.0
+        for i in range(count):
+            start = time.process_time()
+            frame = frames[i % len(frames)]
+            composed = compose_frame(frame, arrow_service, person_service)
+            compose_cpu += time.process_time() - start
+
+            start = time.process_time()
+            video_frame = VideoFrame.from_ndarray(composed, format="bgr24")
+            video_frame.pts, video_frame.time_base = int(i * 90000 / fps), time_base
+            payloads, _ = encoder.encode(video_frame)
+            encode_cpu += time.process_time() - start
+            total += sum(len(p) for p in payloads)
+
+        results[fps] = (
+            total * 8 / (count / fps),
+            compose_cpu / count * 1000,
+            encode_cpu / count * 1000,
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("paths", nargs="+", help="세그먼트 파일 또는 디렉터리")
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--idle-fps", type=float, default=IDLE_FPS)
+    parser.add_argument("--hold", type=float, default=ACTIVE_HOLD_SEC)
+    parser.add_argument("--tick", type=float, default=0.1, help="활동 판정 간격 (초)")
+    parser.add_argument("--viewers", type=int, default=1, help="카메라당 시청자 수")
+    parser.add_argument("--codec", choices=sorted(ENCODERS), default="vp8")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--sample-sec", type=float, default=6, help="인코딩 측정 길이")
+    args = parser.parse_args()
+
+    records = load_records(args.paths)
+    if not records:
+        print("재생할 기록 없음")
+        return
+
+    activity = simulate(records, args.tick, args.hold)
+    measured = measure_encoding(
+        args.codec, args.width, args.height, (args.fps, args.idle_fps), args.sample_sec
+    )
+    full_bps, full_compose, full_encode = measured[args.fps]
+    idle_bps, idle_compose, idle_encode = measured[args.idle_fps]
+
+    # 합성은 카메라당 한 번, 인코딩은 시청자마다
+    full_frame_cpu = (full_compose + full_encode * args.viewers) / 1000
+    idle_frame_cpu = (idle_compose + idle_encode * args.viewers) / 1000
+
+    print(
+        f"{args.codec} {args.width}x{args.height}, viewers/cam={args.viewers}, "
+        f"compose {full_compose:.1f}ms + encode {full_encode:.1f}ms/frame, "
+        f"full {args.fps:g}fps {full_bps / 1000:.0f}kbps, "
+        f"idle {args.idle_fps:g}fps {idle_bps / 1000:.0f}kbps"
+    )
+    print(
+        f"{'camera':<12}{'span h':>8}{'active %':>10}"
+        f"{'cpu s saved':>13}{'cpu %':>8}{'GB saved':>10}{'bw %':>7}"
+    )
+
+    totals = [0.0, 0.0, 0.0, 0.0]  # cpu before / after, bytes before / after
+    for cam_id, (active, span) in sorted(activity.items()):
+        idle = span - active
+
+        cpu_before = span * args.fps * full_frame_cpu
+        cpu_after = active * args.fps * full_frame_cpu
+        cpu_after += idle * args.idle_fps * idle_frame_cpu
+
+        bytes_before = span * full_bps / 8 * args.viewers
+        bytes_after = (active * full_bps + idle * idle_bps) / 8 * args.viewers
+
+        for k, v in enumerate((cpu_before, cpu_after, bytes_before, bytes_after)):
+            totals[k] += v
+
+        if not span:
+            continue
+        print(
+            f"{cam_id:<12}{span / 3600:8.2f}{active / span * 100:10.1f}"
+            f"{cpu_before - cpu_after:13.0f}"
+            f"{(1 - cpu_after / cpu_before) * 100:8.1f}"
+            f"{(bytes_before - bytes_after) / 1e9:10.2f}"
+            f"{(1 - bytes_after / bytes_before) * 100:7.1f}"
+        )
+
+    cpu_before, cpu_after, bytes_before, bytes_after = totals
+    if cpu_before and bytes_before:
+        print(
+            f"{'total':<12}{'':18}{cpu_before - cpu_after:13.0f}"
+            f"{(1 - cpu_after / cpu_before) * 100:8.1f}"
+            f"{(bytes_before - bytes_after) / 1e9:10.2f}"
+            f"{(1 - bytes_after / bytes_before) * 100:7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
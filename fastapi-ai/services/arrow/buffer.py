@@ -0,0 +1,69 @@
+import threading
+
+import numpy as np
+
+TRACK_DTYPE = np.dtype(
+    [
+        ("tip_x", np.float64),
+        ("tip_y", np.float64),
+        ("tail_x", np.float64),
+        ("tail_y", np.float64),
+        ("conf", np.float64),  # 값이 없으면 NaN
+        ("timestamp", np.float64),
+    ]
+)
+
+
+class TrackingBuffer:
+    """화살 추적 데이터용 고정 크기 링 버퍼 (이벤트당 할당 없음)
+
+    수신 스레드가 append 하는 동안 판정 / 스케줄러 스레드가 view() 를 읽으므로
+    append / clear / view 는 잠금으로 묶고, view() 는 복사본을 돌려준다
+    (이전 deque 는 append 가 GIL 아래 원자적이라 같은 보장이 있었음).
+    """
+
+    def __init__(self, maxlen):
+        self.maxlen = maxlen
+        self._data = np.zeros(maxlen, dtype=TRACK_DTYPE)
+        self._start = 0
+        self._len = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._len
+
+    def __bool__(self):
+        return self._len > 0
+
+    def append(self, tip, tail, conf, timestamp):
+        row = (
+            tip[0],
+            tip[1],
+            tail[0],
+            tail[1],
+            np.nan if conf is None else conf,
+            timestamp,
+        )
+        with self._lock:
+            if self._len < self.maxlen:
+                self._data[(self._start + self._len) % self.maxlen] = row
+                self._len += 1
+            else:
+                # 가득 차면 가장 오래된 데이터를 덮어씀 (deque(maxlen) 과 동일)
+                self._data[self._start] = row
+                self._start = (self._start + 1) % self.maxlen
+
+    def clear(self):
+        with self._lock:
+            self._start = 0
+            self._len = 0
+
+    def view(self):
+        """오래된 순서로 정렬된 배열 복사본 (이후 append / clear 의 영향을 받지 않음)"""
+        with self._lock:
+            end = self._start + self._len
+            if end <= self.maxlen:
+                return self._data[self._start : end].copy()
+            return np.concatenate(
+                (self._data[self._start :], self._data[: end - self.maxlen])
+            )
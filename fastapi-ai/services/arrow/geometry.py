@@ -0,0 +1,122 @@
+import cv2
+import numpy as np
+
+# 래스터 마스크 값
+MASK_OUTSIDE = 0
+MASK_INSIDE = 1
+MASK_EDGE = 2  # 경계 부근: 픽셀 반올림 오차가 있을 수 있어 정확한 판정으로 대체
+
+EDGE_BAND_PX = 5
+RENDER_CACHE_SIZE = 64
+
+
+class TargetGeometry:
+    """set_target 시 한 번 계산해 두는 과녁 폴리곤 정보 (생성 후 변경하지 않음)"""
+
+    def __init__(self, target, frame_size):
+        self.points = np.array(target, dtype=np.int32).reshape(-1, 2)
+        self.frame_size = tuple(frame_size)
+
+        start = self.points.astype(np.float64)
+        vec = np.roll(start, -1, axis=0) - start
+        sq_len = (vec**2).sum(axis=1)
+        valid = sq_len > 0
+        # 길이 0 인 변을 제외한 (x1, y1, dx, dy, 1/|d|^2) 목록
+        # 과녁은 꼭짓점 몇 개짜리 폴리곤이라 numpy 호출보다 튜플 순회가 빠름
+        self.edges = [
+            tuple(row)
+            for row in np.column_stack(
+                (start[valid], vec[valid], 1.0 / sq_len[valid])
+            ).tolist()
+        ]
+
+        xs, ys = self.points[:, 0], self.points[:, 1]
+        self.bbox = (int(xs.min()), int(ys.min()), int(xs.max()), int(ys.max()))
+        self.bottom_y = int(ys.max())
+
+        M = cv2.moments(self.points)
+        if M["m00"] != 0:
+            self.centroid = (M["m10"] / M["m00"], M["m01"] / M["m00"])
+        else:
+            self.centroid = None
+
+        # bbox 영역만큼의 inside 마스크 (원점: bbox 좌상단)
+        min_x, min_y, max_x, max_y = self.bbox
+        self.mask = np.zeros((max_y - min_y + 1, max_x - min_x + 1), dtype=np.uint8)
+        local = (self.points - (min_x, min_y)).reshape(-1, 1, 2)
+        cv2.fillPoly(self.mask, [local], MASK_INSIDE)
+        cv2.polylines(self.mask, [local], True, MASK_EDGE, EDGE_BAND_PX)
+
+        self._render_cache = {}  # video_size -> (scale, pad_x, pad_y, polygon)
+
+        self.points.setflags(write=False)
+        self.mask.setflags(write=False)
+
+    def contains(self, point):
+        """cv2.pointPolygonTest(..., False) >= 0 과 같은 결과 (경계 포함)"""
+        if point is None:
+            return False
+
+        x, y = float(point[0]), float(point[1])
+        min_x, min_y, max_x, max_y = self.bbox
+        if x < min_x or x > max_x or y < min_y or y > max_y:
+            return False
+
+        value = self.mask[int(round(y)) - min_y, int(round(x)) - min_x]
+        if value == MASK_EDGE:
+            return cv2.pointPolygonTest(self.points, (x, y), False) >= 0
+        return value == MASK_INSIDE
+
+    def closest_point(self, point):
+        """폴리곤 경계 위에서 point 와 가장 가까운 점 (유효한 변이 없으면 None)"""
+        px, py = float(point[0]), float(point[1])
+        min_dist = float("inf")
+        closest_point = None
+
+        for x1, y1, dx, dy, inv_sq_len in self.edges:
+            t = ((px - x1) * dx + (py - y1) * dy) * inv_sq_len
+            t = 0.0 if t < 0.0 else 1.0 if t > 1.0 else t
+
+            cx, cy = x1 + t * dx, y1 + t * dy
+            dist = (px - cx) ** 2 + (py - cy) ** 2
+            if dist < min_dist:
+                min_dist = dist
+                closest_point = (cx, cy)
+
+        return closest_point
+
+    def clamp_to_bbox(self, point, margin):
+        min_x, min_y, max_x, max_y = self.bbox
+        return [
+            min(max(point[0], min_x - margin), max_x + margin),
+            min(max(point[1], min_y - margin), max_y + margin),
+        ]
+
+    def _render_transform(self, video_size):
+        key = tuple(video_size)
+        cached = self._render_cache.get(key)
+        if cached is not None:
+            return cached
+
+        render_w, render_h = key
+        frame_w, frame_h = self.frame_size
+        scale = min(render_w / frame_w, render_h / frame_h)
+        pad_x = (render_w - frame_w * scale) / 2
+        pad_y = (render_h - frame_h * scale) / 2
+
+        polygon = [
+            [float(x * scale + pad_x), float(y * scale + pad_y)]
+            for x, y in self.points.tolist()
+        ]
+        cached = (scale, pad_x, pad_y, polygon)
+        if len(self._render_cache) >= RENDER_CACHE_SIZE:
+            self._render_cache.clear()
+        self._render_cache[key] = cached
+        return cached
+
+    def to_render_coords(self, x, y, video_size):
+        scale, pad_x, pad_y, _ = self._render_transform(video_size)
+        return [float(x * scale + pad_x), float(y * scale + pad_y)]
+
+    def polygon_to_render(self, video_size):
+        return [list(p) for p in self._render_transform(video_size)[3]]
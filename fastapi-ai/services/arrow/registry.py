@@ -4,12 +4,20 @@ from .service import ArrowService
 class ArrowRegistry:
     def __init__(self):
         self.services = {}
+        self.scheduler = None
 
     def get(self, cam_id: str):
         if cam_id not in self.services:
-            self.services[cam_id] = ArrowService()
+            self.services[cam_id] = ArrowService(
+                cam_id=cam_id, scheduler=self.scheduler
+            )
         return self.services[cam_id]
 
+    def attach_scheduler(self, scheduler):
+        self.scheduler = scheduler
+        for service in self.services.values():
+            service.scheduler = scheduler
+
     def remove(self, cam_id: str):
         if cam_id in self.services:
             del self.services[cam_id]
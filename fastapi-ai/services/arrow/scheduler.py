@@ -0,0 +1,102 @@
+import heapq
+import logging
+import threading
+import time
+
+logger = logging.getLogger("smartbow.arrow")
+
+
+class HitScheduler:
+    """카메라별 판정 시각(deadline)에 맞춰 handler 를 호출하는 타이머 힙
+
+    handler(cam_id) 는 다음 판정 시각을 반환하며 (None 이면 대기 해제),
+    이벤트 수신 시 arm() 으로 재등록된다.
+    """
+
+    def __init__(self, handler, clock=time.time):
+        self.handler = handler
+        self.clock = clock
+
+        self._heap = []  # (deadline, cam_id)
+        self._deadlines = {}  # cam_id -> 가장 이른 예약 시각
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = None
+
+    def arm(self, cam_id, deadline):
+        if deadline is None:
+            return
+
+        with self._cond:
+            current = self._deadlines.get(cam_id)
+            # 이미 더 이른 예약이 있으면 그 시점에 handler 가 다음 시각을 다시 계산
+            if current is not None and current <= deadline:
+                return
+
+            self._deadlines[cam_id] = deadline
+            heapq.heappush(self._heap, (deadline, cam_id))
+            if self._heap[0][0] == deadline:
+                self._cond.notify()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=2.0):
+        with self._cond:
+            self._stop = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _next_due(self):
+        """만기된 cam_id 를 꺼낼 때까지 대기 (중지 시 None)"""
+        with self._cond:
+            while not self._stop:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+
+                deadline, cam_id = self._heap[0]
+                if self._deadlines.get(cam_id) != deadline:
+                    heapq.heappop(self._heap)  # 더 이른 시각으로 교체된 예약
+                    continue
+
+                delay = deadline - self.clock()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+
+                heapq.heappop(self._heap)
+                del self._deadlines[cam_id]
+                return cam_id
+        return None
+
+    def _run(self):
+        logger.info("화살 적중 판정 스케줄러 시작")
+
+        while True:
+            cam_id = self._next_due()
+            if cam_id is None:
+                break
+
+            try:
+                next_deadline = self.handler(cam_id)
+            except Exception as e:
+                logger.error(
+                    f"화살 적중 처리 중 오류 발생 - 카메라: {cam_id}, 오류: {e}",
+                    exc_info=True,
+                )
+                continue
+
+            if next_deadline is not None:
+                # 경계값(==)에서 반복 호출되지 않도록 최소 간격 보장
+                self.arm(cam_id, max(next_deadline, self.clock() + 0.001))
+
+        logger.info("화살 적중 판정 스케줄러 종료")
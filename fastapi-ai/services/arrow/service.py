@@ -1,19 +1,77 @@
-import datetime
 import logging
+import math
 import os
 import time
 from collections import deque
 
-import cv2
 import numpy as np
-from config import BASE_DIR
+
+from services.frame.history import FRAME_HISTORY_CLOCK_OFFSET, frame_history
+
+from .buffer import TrackingBuffer
+from .geometry import TargetGeometry
+from .visualizer import HitSnapshot, save_hit_image
 
 logger = logging.getLogger("smartbow.arrow")
 
+OVERLAY_TIMEOUT_SEC = 0.5  # 마지막 이벤트 후 화면의 화살/모래 표시 유지 시간
+# 추론 서버가 보내는 화살 이벤트 빈도 (버퍼가 담는 시간 길이 추정용)
+ARROW_EVENT_FPS = float(os.getenv("SMARTBOW_ARROW_EVENT_FPS", "30"))
+
+
+def trajectory_stats(tip_y):
+    """tip y 좌표 배열에서 (높이 변화량, 첫 변곡점 인덱스) 계산
+
+    변곡점: y 가 처음으로 감소하는 지점 (없으면 -1)
+    """
+    height = float(tip_y.max() - tip_y.min())
+    rising = tip_y[1:] < tip_y[:-1]
+    if not rising.size:
+        return height, -1
+    hit_idx = int(rising.argmax())
+    return height, hit_idx if rising[hit_idx] else -1
+
+
+def _is_coords(value, size):
+    """숫자 size 개짜리 리스트 / 튜플인지"""
+    return (
+        isinstance(value, (list, tuple))
+        and len(value) == size
+        and all(isinstance(v, (int, float)) for v in value)
+    )
+
+
+def _invalid_reason(event):
+    """묶음 처리에서 건너뛸 이벤트면 그 이유 (정상이면 None)"""
+    if not isinstance(event, dict):
+        return "dict 아님"
+    event_type = event.get("type")
+    if event_type == "arrow":
+        if not _is_coords(event.get("tip"), 2) or not _is_coords(event.get("tail"), 2):
+            return "tip / tail 좌표 없음"
+        if not isinstance(event.get("timestamp"), (int, float)):
+            return "timestamp 없음"
+    elif event_type == "splash":
+        if not _is_coords(event.get("splash_bbox"), 4):
+            return "splash_bbox 없음"
+    return None
+
 
 class ArrowService:
-    def __init__(self, buffer_size=50, idle_sec=2.0, cooldown_sec=8.0):
-        self.tracking_buffer = deque(maxlen=buffer_size)  # 화살 데이터
+    def __init__(
+        self,
+        buffer_size=50,
+        idle_sec=2.0,
+        cooldown_sec=8.0,
+        cam_id=None,
+        scheduler=None,
+        clock=time.time,
+    ):
+        self.cam_id = cam_id
+        self.scheduler = scheduler  # HitScheduler: 판정 시각 예약용
+        self.clock = clock  # 기록 재생 시 가상 시계로 교체
+
+        self.tracking_buffer = TrackingBuffer(buffer_size)  # 화살 데이터
         self.splash_buffer = deque(maxlen=10)  # 모래 튀기는 데이터
 
         self.idle_sec = idle_sec
@@ -23,44 +81,50 @@ class ArrowService:
 
         self.target = None
         self.frame_size = None
+        self.geometry = None  # TargetGeometry
         self.last_frame = None  # 화살 위치 디버그용 추후 서비스 안정화되면 제거
 
         self.current_arrow = None
         self.current_splash = None
+        self.invalid_events = 0  # add_events 에서 건너뛴 잘못된 이벤트
 
     def set_target(self, target, frame_size):
-        self.target = np.array(target, dtype=np.int32)
-        self.frame_size = tuple(frame_size)
+        geometry = TargetGeometry(target, frame_size)
+
+        current = self.geometry
+        if (
+            current is not None
+            and current.frame_size == geometry.frame_size
+            and np.array_equal(current.points, geometry.points)
+        ):
+            # 같은 과녁이면 기존 geometry 유지 (렌더 캐시 / 오버레이 레이어 재사용)
+            return
+
+        self.geometry = geometry
+        self.target = geometry.points
+        self.frame_size = geometry.frame_size
         logger.info(f"[ArrowService] target set | frame_size={self.frame_size}")
 
     def to_render_coords(self, x, y, video_size):
-        if video_size is None or self.frame_size is None:
+        geometry = self.geometry
+        if video_size is None or geometry is None:
             return None
 
-        render_w, render_h = video_size
-        frame_w, frame_h = self.frame_size
-        scale = min(render_w / frame_w, render_h / frame_h)
-        pad_x = (render_w - frame_w * scale) / 2
-        pad_y = (render_h - frame_h * scale) / 2
-
-        return [float(x * scale + pad_x), float(y * scale + pad_y)]
+        return geometry.to_render_coords(x, y, video_size)
 
     def polygon_to_render(self, video_size):
-        if self.target is None or self.frame_size is None:
+        geometry = self.geometry
+        if geometry is None:
             return None
+        if video_size is None:
+            return []
 
-        render_poly = []
-        for x, y in self.target:
-            p = self.to_render_coords(x, y, video_size)
-            if p:
-                render_poly.append(p)
-
-        return render_poly
+        return geometry.polygon_to_render(video_size)
 
     def _is_inside_target(self, point):
-        if self.target is None or point is None:
+        if self.geometry is None or point is None:
             return False
-        return cv2.pointPolygonTest(self.target, point, False) >= 0
+        return self.geometry.contains(point)
 
     def check_buffer_validity(self):
         return len(self.tracking_buffer) >= 2
@@ -77,7 +141,7 @@ class ArrowService:
             return
 
         if self.last_hit_time > 0:
-            if time.time() - self.last_hit_time < self.cooldown_sec:
+            if self.clock() - self.last_hit_time < self.cooldown_sec:
                 logger.debug("판정중 버퍼 추가 스킵")
                 return
 
@@ -87,151 +151,201 @@ class ArrowService:
 
         self.current_arrow = {"tip": tip, "tail": tail}
 
-        self.tracking_buffer.append(
-            {
-                "tip": tip,
-                "tail": tail,
-                "conf": conf,
-                "timestamp": event["timestamp"],
-            }
-        )
+        self.tracking_buffer.append(tip, tail, conf, event["timestamp"])
+
+        self.last_event_time = self.clock()
+        self._schedule()
+
+    def add_events(self, events):
+        """수신 스레드가 한번에 비운 이벤트 묶음을 처리 (시간 조회는 1회)"""
+        now = self.clock()
+
+        if self.last_hit_time > 0 and now - self.last_hit_time < self.cooldown_sec:
+            logger.debug("판정중 버퍼 추가 스킵")
+            return
+
+        updated = False
+        for event in events:
+            # 잘못된 이벤트 하나 때문에 묶음의 나머지를 잃지 않도록 그 이벤트만 건너뜀
+            reason = _invalid_reason(event)
+            if reason is not None:
+                self.invalid_events += 1
+                logger.warning(
+                    f"잘못된 이벤트 무시 - 카메라: {self.cam_id}, 사유: {reason}, "
+                    f"이벤트: {str(event)[:200]}"
+                )
+                continue
+            event_type = event.get("type")
+
+            if event_type == "arrow":
+                tip = event.get("tip")
+                tail = event.get("tail")
+                self.current_arrow = {"tip": tip, "tail": tail}
+                self.tracking_buffer.append(
+                    tip, tail, event.get("bbox_conf"), event["timestamp"]
+                )
+                updated = True
 
-        self.last_event_time = time.time()
+            elif event_type == "splash":
+                self.current_splash = event["splash_bbox"]
+                self.splash_buffer.append(event["splash_bbox"])
+                updated = True
+
+        if updated:
+            self.last_event_time = now
+            self._schedule()
 
     def add_splash_event(self, event):
         if event["type"] != "splash":
             return
 
         if self.last_hit_time > 0:
-            if time.time() - self.last_hit_time < self.cooldown_sec:
+            if self.clock() - self.last_hit_time < self.cooldown_sec:
                 logger.debug("판정중 버퍼 추가 스킵")
                 return
         self.current_splash = event["splash_bbox"]
 
         self.splash_buffer.append(event["splash_bbox"])
-        self.last_event_time = time.time()
-
-    def visualize_buffer(self, hit_point, reason, height):
-        if self.last_frame is None:
-            return
-
+        self.last_event_time = self.clock()
+        self._schedule()
+
+    def hit_window_sec(self, event_fps=ARROW_EVENT_FPS):
+        """판정이 버퍼 속 가장 오래된 점보다 최대 몇 초 늦게 도는지
+
+        판정은 마지막 이벤트 idle_sec 뒤에 돌고, 적중 지점은 그보다 버퍼 길이만큼 앞일 수 있다
+        """
+        return self.idle_sec + self.tracking_buffer.maxlen / event_fps
+
+    def _hit_frame(self, track, hit_point):
+        """적중 지점과 가장 가까운 궤적 점의 시각에 가장 가까운 샘플 프레임
+
+        히스토리가 없거나 그 시각 근처 프레임이 없으면 last_frame
+        """
+        history = frame_history.get(self.cam_id)
+        if history is not None and len(track) > 0:
+            dist = (track["tip_x"] - hit_point[0]) ** 2 + (
+                track["tip_y"] - hit_point[1]
+            ) ** 2
+            ts = float(track["timestamp"][dist.argmin()]) + FRAME_HISTORY_CLOCK_OFFSET
+            found = history.nearest(ts)
+            if found is not None:
+                return found[0]
+            logger.info(f"적중 이미지에 last_frame 사용 - 카메라: {self.cam_id}")
+
+        return self.last_frame
+
+    def snapshot_hit(self, hit_point, reason, height):
+        """시각화용 프레임 / 궤적 복사본 (버퍼를 비우기 전에, 프레임 복사가 있으므로 적중 게시 뒤에 호출)"""
         if not self.tracking_buffer and not self.splash_buffer:
-            return
+            return None
+
+        if not hit_point:
+            return None
 
-        vis_frame = self.last_frame.copy()
-        num_points = len(self.tracking_buffer)
-        if num_points > 0:
-            overlay = vis_frame.copy()
-            cv2.rectangle(overlay, (10, 10), (450, 60), (0, 0, 0), -1)
-            cv2.addWeighted(overlay, 0.6, vis_frame, 0.4, 0, vis_frame)
-            cv2.putText(
-                vis_frame,
-                f"HIT: {reason} | H: {height:.2f} | Pts: {num_points}",
-                (20, 45),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                (255, 255, 255),
-                2,
+        track = self.tracking_buffer.view()
+        frame = self._hit_frame(track, hit_point)
+        if frame is None:
+            # 이 워커에 프레임 히스토리도 WebRTC 시청자(last_frame)도 없음
+            logger.warning(
+                f"적중 이미지 생략: 프레임 없음 - 카메라: {self.cam_id} "
+                "(SMARTBOW_FRAME_HISTORY=1 로 히스토리 사용)"
             )
+            return None
 
-            for i, data in enumerate(self.tracking_buffer):
-                tip = (int(data["tip"][0]), int(data["tip"][1]))
-                tail = (int(data["tail"][0]), int(data["tail"][1]))
-
-                conf = data.get("conf", "?")
-
-                # 1. 그라데이션 색상 (진한 파랑 -> 진한 빨강)
-                alpha = (i + 1) / num_points
-                color = (int(255 * (1 - alpha)), 0, int(255 * alpha))
-
-                # 2. 화살 궤적 선 (얇게 하여 겹쳐도 보이게 함)
-                cv2.line(vis_frame, tail, tip, color, 1, cv2.LINE_AA)
-                cv2.circle(vis_frame, tip, 2, color, -1)
-
-                # 3. [핵심] 텍스트 분산 배치 (박힌 지점에서 번호가 펴지도록)
-                # 인덱스 번호에 따라 텍스트를 나선형 또는 계단형으로 배치
-                angle = (i / num_points) * 2 * np.pi  # 360도 분산
-                radius = 30 + (i * 2)  # 뒤로 갈수록 멀어지게 하여 겹침 방지
-
-                tx = int(tip[0] + radius * np.cos(angle))
-                ty = int(tip[1] + radius * np.sin(angle))
-
-                # 팁에서 번호까지 얇은 지시선 연결
-                cv2.line(vis_frame, tip, (tx, ty), (200, 200, 200), 1, cv2.LINE_4)
-
-                # label = f"{i}:{case}"
-                label = f"{i} conf:{conf}"
-                cv2.putText(
-                    vis_frame,
-                    label,
-                    (tx, ty),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.4,
-                    color,
-                    1,
-                    cv2.LINE_AA,
-                )
+        return HitSnapshot(
+            cam_id=self.cam_id,
+            frame=frame,
+            track=track,
+            hit_point=hit_point,
+            reason=reason,
+            height=height,
+            captured_at=time.time(),
+        )
 
-        # 4. 최종 적중 지점 강조
-        if hit_point:
-            hx, hy = int(hit_point[0]), int(hit_point[1])
-            cv2.drawMarker(
-                vis_frame, (hx, hy), (0, 255, 0), cv2.MARKER_TILTED_CROSS, 20, 2
-            )
+    def visualize_buffer(self, hit_point, reason, height):
+        snapshot = self.snapshot_hit(hit_point, reason, height)
+        if snapshot is not None:
+            save_hit_image(snapshot)
 
-            now = datetime.datetime.now()
-            save_dir = os.path.join(BASE_DIR, now.strftime("%Y-%m-%d"))
-            os.makedirs(save_dir, exist_ok=True)
-            cv2.imwrite(
-                os.path.join(save_dir, f"{now.strftime('%H-%M-%S')}.jpg"), vis_frame
-            )
+    def next_deadline(self):
+        """다음으로 is_idle() 결과나 화면 표시가 바뀔 수 있는 시각 (대기할 필요 없으면 None)
+
+        화살 / 모래 표시가 남아 있으면 버퍼가 비어 있어도 (판정 후) 표시 만료 시각을 유지
+        """
+        if self.last_event_time is None:
+            return None
+
+        overlay_deadline = None
+        if self.current_arrow is not None or self.current_splash is not None:
+            overlay_deadline = self.last_event_time + OVERLAY_TIMEOUT_SEC
 
-    def is_idle(self):
         if not self.tracking_buffer and not self.splash_buffer:
-            return False
+            return overlay_deadline
 
+        deadline = max(
+            self.last_event_time + self.idle_sec,
+            self.last_hit_time + self.cooldown_sec,
+        )
+        if overlay_deadline is not None:
+            deadline = min(deadline, overlay_deadline)
+        return deadline
+
+    def _schedule(self):
+        if self.scheduler is not None:
+            self.scheduler.arm(self.cam_id, self.next_deadline())
+
+    def expire_overlay(self, now=None):
+        """마지막 이벤트 후 OVERLAY_TIMEOUT_SEC 가 지났으면 화살 / 모래 표시 제거"""
         if self.last_event_time is None:
-            return False
-        now = time.time()
-        if now - self.last_event_time > 0.5:
+            return
+        if now is None:
+            now = self.clock()
+        if now - self.last_event_time >= OVERLAY_TIMEOUT_SEC:
             self.current_arrow = None
             self.current_splash = None
+
+    def is_idle(self):
+        if self.last_event_time is None:
+            return False
+        now = self.clock()
+        self.expire_overlay(now)
+
+        if not self.tracking_buffer and not self.splash_buffer:
+            return False
         if now - self.last_hit_time < self.cooldown_sec:
             return False
 
         return now - self.last_event_time > self.idle_sec
 
-    def clear_buffer(self):
-        self.tracking_buffer.clear()
-        self.splash_buffer.clear()
-
-    def _closest_point_on_polygon(self, point, polygon):
-        px, py = point
-        min_dist = float("inf")
-        closest_point = None
+    def judge(self, on_hit=None):
+        """idle 상태이면 적중 판정 후 버퍼를 비움
 
-        for i in range(len(polygon)):
-            p1, p2 = polygon[i], polygon[(i + 1) % len(polygon)]
-            x1, y1 = float(p1[0]), float(p1[1])
-            x2, y2 = float(p2[0]), float(p2[1])
-
-            dx, dy = x2 - x1, y2 - y1
-
-            if dx == 0 and dy == 0:
-                continue
+        on_hit(hit) 은 버퍼를 비우기 전에 호출 (시각화 등 버퍼가 필요한 작업용)
+        """
+        if not self.is_idle():
+            return None
 
-            t = max(0, min(1, ((px - x1) * dx + (py - y1) * dy) / (dx * dx + dy * dy)))
+        hit = self.find_hit_point()
+        if hit is not None:
+            self.last_hit_time = self.clock()
+            if on_hit is not None:
+                on_hit(hit)
 
-            closest_x, closest_y = x1 + t * dx, y1 + t * dy
+        self.clear_buffer()
+        return hit
 
-            # 거리 계산
-            dist = np.sqrt((px - closest_x) ** 2 + (py - closest_y) ** 2)
+    def apply_hit(self, hit_time):
+        """다른 워커(judge)가 판정한 적중 반영 (judge() 와 같이 쿨다운 시작 + 버퍼 비움)
 
-            if dist < min_dist:
-                min_dist = dist
-                closest_point = (closest_x, closest_y)
+        화살 / 모래 표시는 judge 워커와 같이 만료 시각에 정리된다
+        """
+        self.last_hit_time = hit_time
+        self.clear_buffer()
+        self._schedule()
 
-        return closest_point
+    def clear_buffer(self):
+        self.tracking_buffer.clear()
+        self.splash_buffer.clear()
 
     def find_hit_point(self):
         if not self.check_buffer_validity():
@@ -253,24 +367,15 @@ class ArrowService:
             self.clear_buffer()
             return None
 
-        y_coords = [data["tip"][1] for data in self.tracking_buffer]
-
-        y_min, y_max = min(y_coords), max(y_coords)
-        height = y_max - y_min
+        geometry = self.geometry
+        track = self.tracking_buffer.view()
+        height, hit_idx = trajectory_stats(track["tip_y"])
         if height < 35:
             self.clear_buffer()
             return None
 
-        hit_idx = -1
-
-        for i in range(len(y_coords) - 1):
-            if y_coords[i] - y_coords[i + 1] > 0:
-                hit_idx = i
-                break
-
         if hit_idx != -1:
-            hit_tip = self.tracking_buffer[hit_idx]["tip"]
-            raw_hit = [float(hit_tip[0]), float(hit_tip[1])]
+            raw_hit = [float(track["tip_x"][hit_idx]), float(track["tip_y"][hit_idx])]
 
             if len(self.splash_buffer) >= 5:
                 first_bbox = self.splash_buffer[0]
@@ -284,9 +389,8 @@ class ArrowService:
                 }
 
             # 변곡점 존재하는데, 과녁 아래 부분에서 발견된경우는 불관중
-            if self.target is not None:
-                target_bottom_y = max(p[1] for p in self.target)
-                if raw_hit[1] > target_bottom_y:
+            if geometry is not None:
+                if raw_hit[1] > geometry.bottom_y:
                     return {
                         "point": raw_hit,
                         "inside": False,
@@ -294,7 +398,7 @@ class ArrowService:
                         "h": height,
                     }
             # 일반적인 적중 판정
-            if self.target is not None and self._is_inside_target(raw_hit):
+            if geometry is not None and geometry.contains(raw_hit):
                 return {
                     "point": raw_hit,
                     "inside": True,
@@ -302,15 +406,14 @@ class ArrowService:
                     "h": height,
                 }
             # 판정 데이터 약해서 역추적해서 과녁가까운 곳으로 임의의 점 찍기
-            if self.target is not None:
-                closest_points = self._closest_point_on_polygon(raw_hit, self.target)
+            if geometry is not None:
+                closest_points = geometry.closest_point(raw_hit)
                 if closest_points:
                     closest_x, closest_y = closest_points
-                    M = cv2.moments(self.target)
-                    if M["m00"] != 0:
-                        cx, cy = M["m10"] / M["m00"], M["m01"] / M["m00"]
+                    if geometry.centroid is not None:
+                        cx, cy = geometry.centroid
                         dx, dy = cx - closest_x, cy - closest_y
-                        length = np.sqrt(dx**2 + dy**2)
+                        length = math.hypot(dx, dy)
 
                         if length > 0:
                             dx, dy = dx / length, dy / length
@@ -339,34 +442,19 @@ class ArrowService:
                 }
 
         else:  # 불관중
-            last_tip = self.tracking_buffer[-1]["tip"]
-            raw_hit = [float(last_tip[0]), float(last_tip[1])]
+            raw_hit = [float(track["tip_x"][-1]), float(track["tip_y"][-1])]
             # 불관중인데 검출 부족으로 과녁 내부에 찍힌경우
-            if self.target is not None and self._is_inside_target(raw_hit):
-                target_bottom_y = max(p[1] for p in self.target)
-                raw_hit = [raw_hit[0], float(target_bottom_y + 10)]
+            if geometry is not None and geometry.contains(raw_hit):
+                raw_hit = [raw_hit[0], float(geometry.bottom_y + 10)]
                 return {
                     "point": raw_hit,
                     "inside": False,
                     "type": "MISS_INSIDE_TARGET",
                     "h": height,
                 }
-            if self.target is not None:
-                xs = [p[0] for p in self.target]
-                ys = [p[1] for p in self.target]
-
-                min_x, max_x = min(xs), max(xs)
-                min_y, max_y = min(ys), max(ys)
-
+            if geometry is not None:
                 MARGIN = 50
-                min_x -= MARGIN
-                max_x += MARGIN
-                min_y -= MARGIN
-                max_y += MARGIN
-
-                clamped_x = min(max(raw_hit[0], min_x), max_x)
-                clamped_y = min(max(raw_hit[1], min_y), max_y)
-                clamped_hit = [clamped_x, clamped_y]
+                clamped_hit = geometry.clamp_to_bbox(raw_hit, MARGIN)
                 return {
                     "point": clamped_hit,
                     "inside": False,
@@ -0,0 +1,97 @@
+"""비행 중인 화살 / 모래 튀김 위치를 WebSocket 바이너리(msgpack) 프레임으로 보내기 위한 인코딩
+
+프레임은 map 하나이며 좌표는 클라이언트 video_size 기준 정수 픽셀:
+- a: 화살 [tip_x, tip_y, tail_x, tail_y]
+- s: 모래 튀김 [x1, y1, x2, y2]
+- k: 1 이면 키프레임 (a / s 를 모두 절대 좌표로 보냄, 클라이언트 상태 초기화)
+
+키프레임이 아닌 프레임에는 바뀐 항목만 담는다.
+- 항목 없음: 그대로
+- nil: 사라짐
+- 배열: 직전 값이 있으면 좌표별 차이, 없었으면 절대 좌표
+
+WebSocket 은 순서 / 전달을 보장하고 밀리면 연결을 끊으므로 (routers.ws) 차이 누적이
+어긋나지 않는다. 구독 시작 / video_size 변경 시에만 키프레임을 보낸다.
+"""
+
+import os
+
+import msgpack
+
+TRAJECTORY_MAX_FPS = float(os.getenv("SMARTBOW_TRAJECTORY_MAX_FPS", "30"))
+TRAJECTORY_DEFAULT_FPS = float(os.getenv("SMARTBOW_TRAJECTORY_DEFAULT_FPS", "15"))
+
+_UNKNOWN = object()  # 클라이언트 상태를 모름 (다음 프레임은 키프레임)
+
+
+def render_trajectory(arrow_service, video_size):
+    """현재 화살 / 모래 튀김을 video_size 좌표 정수 튜플로 (없으면 None)"""
+    geometry = arrow_service.geometry
+    if geometry is None or video_size is None:
+        return None, None
+
+    arrow = None
+    curr = arrow_service.current_arrow
+    if curr and curr.get("tip") is not None and curr.get("tail") is not None:
+        tip = geometry.to_render_coords(*curr["tip"], video_size)
+        tail = geometry.to_render_coords(*curr["tail"], video_size)
+        arrow = tuple(round(v) for v in (*tip, *tail))
+
+    splash = None
+    bbox = arrow_service.current_splash
+    if bbox:
+        x1, y1, x2, y2 = bbox
+        p1 = geometry.to_render_coords(x1, y1, video_size)
+        p2 = geometry.to_render_coords(x2, y2, video_size)
+        splash = tuple(round(v) for v in (*p1, *p2))
+
+    return arrow, splash
+
+
+def encode_trajectory(last, state):
+    """last → state 로 가는 프레임 (바뀐 게 없으면 None)"""
+    if last is _UNKNOWN:
+        arrow, splash = state
+        return msgpack.packb({"k": 1, "a": arrow, "s": splash})
+
+    msg = {}
+    for key, prev, cur in zip("as", last, state):
+        if cur == prev:
+            continue
+        if cur is None or prev is None:
+            msg[key] = cur
+        else:
+            msg[key] = [c - p for c, p in zip(cur, prev)]
+
+    if not msg:
+        return None
+    return msgpack.packb(msg)
+
+
+class TrajectoryStream:
+    """클라이언트 하나의 궤적 구독 상태 (마지막으로 보낸 값 / 전송 간격 제한)"""
+
+    def __init__(self, fps=TRAJECTORY_DEFAULT_FPS):
+        self.fps = min(max(float(fps), 1.0), TRAJECTORY_MAX_FPS)
+        self.interval = 1.0 / self.fps
+        self.last = _UNKNOWN
+        self.sent_at = float("-inf")
+
+        self.frames = 0
+        self.bytes = 0
+
+    def reset(self):
+        """video_size 가 바뀌면 좌표 기준이 달라지므로 다음 프레임은 키프레임"""
+        self.last = _UNKNOWN
+
+    def due(self, now):
+        return now - self.sent_at >= self.interval
+
+    def pending(self, state):
+        return self.last is _UNKNOWN or self.last != state
+
+    def mark_sent(self, state, size, now):
+        self.last = state
+        self.sent_at = now
+        self.frames += 1
+        self.bytes += size
@@ -0,0 +1,202 @@
+import datetime
+import logging
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+from config import BASE_DIR
+
+logger = logging.getLogger("smartbow.arrow")
+
+# 기본값은 기존 cv2.imwrite 기본 화질(95)과 같게, 용량을 줄이려면 배포에서 낮춘다
+HIT_JPEG_QUALITY = int(os.getenv("SMARTBOW_HIT_JPEG_QUALITY", "95"))
+HIT_VIS_WORKERS = int(os.getenv("SMARTBOW_HIT_VIS_WORKERS", "1"))
+HIT_VIS_QUEUE = int(os.getenv("SMARTBOW_HIT_VIS_QUEUE", "8"))
+HIT_VIS_DROP = os.getenv("SMARTBOW_HIT_VIS_DROP", "oldest")  # oldest | newest
+
+
+class HitSnapshot:
+    """판정 시점의 프레임 / 궤적 복사본 (버퍼를 비운 뒤에도 렌더링 가능)"""
+
+    def __init__(self, cam_id, frame, track, hit_point, reason, height, captured_at):
+        self.cam_id = cam_id
+        self.frame = frame
+        self.track = track
+        self.hit_point = hit_point
+        self.reason = reason
+        self.height = height
+        self.captured_at = captured_at
+
+
+def render_hit(snapshot):
+    vis_frame = snapshot.frame.copy()
+    track = snapshot.track
+    num_points = len(track)
+
+    if num_points > 0:
+        # 상단 반투명 배경은 해당 영역만 합성
+        roi = vis_frame[10:61, 10:451]
+        cv2.addWeighted(np.zeros_like(roi), 0.6, roi, 0.4, 0, roi)
+        cv2.putText(
+            vis_frame,
+            f"HIT: {snapshot.reason} | H: {snapshot.height:.2f} | Pts: {num_points}",
+            (20, 45),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.8,
+            (255, 255, 255),
+            2,
+        )
+
+        for i, data in enumerate(track):
+            tip = (int(data["tip_x"]), int(data["tip_y"]))
+            tail = (int(data["tail_x"]), int(data["tail_y"]))
+
+            conf = "?" if np.isnan(data["conf"]) else float(data["conf"])
+
+            # 1. 그라데이션 색상 (진한 파랑 -> 진한 빨강)
+            alpha = (i + 1) / num_points
+            color = (int(255 * (1 - alpha)), 0, int(255 * alpha))
+
+            # 2. 화살 궤적 선 (얇게 하여 겹쳐도 보이게 함)
+            cv2.line(vis_frame, tail, tip, color, 1, cv2.LINE_AA)
+            cv2.circle(vis_frame, tip, 2, color, -1)
+
+            # 3. [핵심] 텍스트 분산 배치 (박힌 지점에서 번호가 펴지도록)
+            # 인덱스 번호에 따라 텍스트를 나선형 또는 계단형으로 배치
+            angle = (i / num_points) * 2 * np.pi  # 360도 분산
+            radius = 30 + (i * 2)  # 뒤로 갈수록 멀어지게 하여 겹침 방지
+
+            tx = int(tip[0] + radius * np.cos(angle))
+            ty = int(tip[1] + radius * np.sin(angle))
+
+            # 팁에서 번호까지 얇은 지시선 연결
+            cv2.line(vis_frame, tip, (tx, ty), (200, 200, 200), 1, cv2.LINE_4)
+
+            label = f"{i} conf:{conf}"
+            cv2.putText(
+                vis_frame,
+                label,
+                (tx, ty),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.4,
+                color,
+                1,
+                cv2.LINE_AA,
+            )
+
+    # 4. 최종 적중 지점 강조
+    hx, hy = int(snapshot.hit_point[0]), int(snapshot.hit_point[1])
+    cv2.drawMarker(vis_frame, (hx, hy), (0, 255, 0), cv2.MARKER_TILTED_CROSS, 20, 2)
+    return vis_frame
+
+
+def save_hit_image(snapshot, quality=HIT_JPEG_QUALITY):
+    vis_frame = render_hit(snapshot)
+
+    now = datetime.datetime.fromtimestamp(snapshot.captured_at)
+    save_dir = os.path.join(BASE_DIR, now.strftime("%Y-%m-%d"))
+    os.makedirs(save_dir, exist_ok=True)
+
+    name = now.strftime("%H-%M-%S")
+    if snapshot.cam_id is not None:
+        name = f"{name}_{snapshot.cam_id}"
+
+    ok, jpg = cv2.imencode(".jpg", vis_frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not ok:
+        raise RuntimeError("JPEG 인코딩 실패")
+
+    path = os.path.join(save_dir, f"{name}.jpg")
+    with open(path, "wb") as f:
+        f.write(jpg.tobytes())
+    return path
+
+
+class HitVisualizer:
+    """적중 시각화 / JPEG 저장을 판정 스레드 밖에서 처리하는 제한 크기 워커 풀"""
+
+    def __init__(
+        self,
+        workers=HIT_VIS_WORKERS,
+        max_queue=HIT_VIS_QUEUE,
+        drop_policy=HIT_VIS_DROP,
+        quality=HIT_JPEG_QUALITY,
+    ):
+        self.workers = workers
+        self.drop_policy = drop_policy
+        self.quality = quality
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._threads = []
+
+        self.submitted = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+    def submit(self, snapshot):
+        if snapshot is None:
+            return
+
+        self.submitted += 1
+        while True:
+            try:
+                self._queue.put_nowait(snapshot)
+                return
+            except queue.Full:
+                self.dropped += 1
+                if self.drop_policy != "oldest":
+                    return
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get_stats(self):
+        return {
+            "queued": self._queue.qsize(),
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed,
+            "quality": self.quality,
+        }
+
+    def start(self):
+        if self._threads:
+            return
+
+        for _ in range(self.workers):
+            t = threading.Thread(target=self._run, daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout=2.0):
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    def _run(self):
+        while True:
+            snapshot = self._queue.get()
+            if snapshot is None:
+                break
+
+            start = time.perf_counter()
+            try:
+                path = save_hit_image(snapshot, self.quality)
+                self.written += 1
+                logger.debug(
+                    f"적중 시각화 저장 - 카메라: {snapshot.cam_id}, {path} "
+                    f"({(time.perf_counter() - start) * 1000:.1f}ms)"
+                )
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"버퍼 시각화 실패 - 카메라: {snapshot.cam_id}, 오류: {e}")
+
+
+hit_visualizer = HitVisualizer()
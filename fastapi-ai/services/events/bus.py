@@ -0,0 +1,135 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter, defaultdict, deque
+
+import numpy as np
+
+logger = logging.getLogger("smartbow.events")
+
+EVENT_BUS_QUEUE = int(os.getenv("SMARTBOW_EVENT_BUS_QUEUE", "64"))  # topic 당 대기 이벤트
+EVENT_BUS_WINDOW = int(os.getenv("SMARTBOW_EVENT_BUS_WINDOW", "1000"))  # 지연 샘플 수
+
+
+class EventBus:
+    """스레드 → 서버 이벤트 루프 pub/sub
+
+    publish() 는 어느 스레드에서든 바로 반환한다. 이벤트는 topic(cam_id)별 bounded 큐에
+    쌓이고 (가득 차면 가장 오래된 것을 버림), topic 마다 한 번만
+    call_soon_threadsafe 로 루프에 전달 작업을 예약한다.
+    루프에서는 이벤트 type 별 handler(topic, event) 를 호출하며, handler 는 블로킹 없이
+    바로 반환해야 한다 (WebSocket 전송은 클라이언트별 큐에 넣기만 함).
+    """
+
+    def __init__(
+        self, maxsize=EVENT_BUS_QUEUE, window=EVENT_BUS_WINDOW, clock=time.perf_counter
+    ):
+        self.maxsize = maxsize
+        self.clock = clock
+
+        self._loop = None
+        self._lock = threading.Lock()
+        self._queues = {}  # topic -> deque[(게시 시각, event)]
+        self._scheduled = set()  # 전달 작업이 예약된 topic
+        self._handlers = defaultdict(list)  # event type -> [handler]
+
+        self._latency = deque(maxlen=window)  # 게시 → handler 호출 (ms)
+        self.max_latency_ms = 0.0
+        self.published = Counter()  # event type 별
+        self.delivered = Counter()
+        self.dropped = Counter()  # topic 별 (큐가 가득 차 버린 이벤트)
+        self.failed = Counter()  # event type 별 handler 오류
+
+    def subscribe(self, event_type, handler):
+        self._handlers[event_type].append(handler)
+
+    def start(self, loop):
+        """서버 이벤트 루프 연결 (연결 전에 게시된 이벤트도 이때 전달)"""
+        with self._lock:
+            self._loop = loop
+            pending = [
+                topic
+                for topic, queue in self._queues.items()
+                if queue and topic not in self._scheduled
+            ]
+            self._scheduled.update(pending)
+        for topic in pending:
+            loop.call_soon_threadsafe(self._drain, topic)
+
+    def stop(self):
+        with self._lock:
+            self._loop = None
+            self._scheduled.clear()
+
+    def publish(self, topic, event):
+        """이벤트 게시 (블로킹 없음, 어느 스레드에서든 호출 가능)"""
+        item = (self.clock(), event)
+        with self._lock:
+            queue = self._queues.get(topic)
+            if queue is None:
+                queue = self._queues[topic] = deque(maxlen=self.maxsize)
+            if len(queue) == self.maxsize:
+                self.dropped[topic] += 1
+            queue.append(item)
+            self.published[event.get("type")] += 1
+
+            loop = self._loop
+            schedule = loop is not None and topic not in self._scheduled
+            if schedule:
+                self._scheduled.add(topic)
+
+        if schedule:
+            try:
+                loop.call_soon_threadsafe(self._drain, topic)
+            except RuntimeError:
+                # 종료 중 루프가 닫힘
+                with self._lock:
+                    self._scheduled.discard(topic)
+
+    def _drain(self, topic):
+        with self._lock:
+            queue = self._queues.get(topic)
+            items = list(queue) if queue else []
+            if queue:
+                queue.clear()
+            self._scheduled.discard(topic)
+
+        for published_at, event in items:
+            latency_ms = (self.clock() - published_at) * 1000
+            self._latency.append(latency_ms)
+            if latency_ms > self.max_latency_ms:
+                self.max_latency_ms = latency_ms
+
+            event_type = event.get("type")
+            for handler in self._handlers.get(event_type, ()):
+                try:
+                    handler(topic, event)
+                except Exception as e:
+                    self.failed[event_type] += 1
+                    logger.error(
+                        f"이벤트 처리 실패 - topic: {topic}, "
+                        f"종류: {event_type}, 오류: {e}",
+                        exc_info=True,
+                    )
+            self.delivered[event_type] += 1
+
+    def get_stats(self):
+        with self._lock:
+            pending = {t: len(q) for t, q in self._queues.items() if q}
+        stats = {
+            "attached": self._loop is not None,
+            "published": dict(self.published),
+            "delivered": dict(self.delivered),
+            "dropped": dict(self.dropped),
+            "failed": dict(self.failed),
+            "pending": pending,
+            "max_latency_ms": self.max_latency_ms,
+        }
+        if self._latency:
+            p50, p99 = np.percentile(self._latency, [50, 99])
+            stats.update(latency_p50_ms=float(p50), latency_p99_ms=float(p99))
+        return stats
+
+
+event_bus = EventBus()
@@ -0,0 +1,311 @@
+"""여러 uvicorn 워커용 프로세스 간 이벤트 허브 (ZMQ XSUB/XPUB 프록시)
+
+판정(HitScheduler)은 judge 잠금을 잡은 워커 하나만 돌리고, 적중 / 과녁 / 상태 이벤트는
+허브를 거쳐 모든 워커로 퍼진다. 각 워커는 받은 이벤트를 자기 EventBus 에 게시하므로
+WebSocket 전송 경로는 단일 프로세스일 때와 같다.
+
+    publisher(judge 워커) ─PUB→ [XSUB | 허브 | XPUB] ─SUB→ 워커마다 EventBus
+
+SMARTBOW_EVENT_HUB
+- off: 단일 프로세스 (허브 없이 로컬 EventBus 로 바로 게시)
+- embedded: judge 워커가 허브(프록시 스레드)도 띄움
+- external: 별도 프로세스로 띄운 허브 사용
+
+적중 이미지는 judge 워커만 만든다. last_frame 은 그 워커에 WebRTC 시청자가 있을 때만
+채워지므로, 허브가 켜져 있으면 judge 워커는 SMARTBOW_FRAME_HISTORY 와 상관없이 프레임
+히스토리를 켠다 (메모리는 judge 워커 하나에만 잡힘).
+
+    python -m services.events.hub
+"""
+
+import fcntl
+import logging
+import os
+import signal
+import threading
+from collections import Counter
+
+import orjson
+import zmq
+
+logger = logging.getLogger("smartbow.events")
+
+EVENT_HUB = os.getenv("SMARTBOW_EVENT_HUB", "off")
+EVENT_HUB_IN = os.getenv("SMARTBOW_EVENT_HUB_IN", "ipc:///tmp/smartbow_events_in.ipc")
+EVENT_HUB_OUT = os.getenv(
+    "SMARTBOW_EVENT_HUB_OUT", "ipc:///tmp/smartbow_events_out.ipc"
+)
+EVENT_HUB_HWM = int(os.getenv("SMARTBOW_EVENT_HUB_HWM", "10000"))
+JUDGE_LOCK_PATH = os.getenv("SMARTBOW_JUDGE_LOCK", "/tmp/smartbow_judge.lock")
+HUB_MODES = ("off", "embedded", "external")
+
+
+class EventHub:
+    """XSUB(게시자 접속) ↔ XPUB(구독자 접속) 프록시
+
+    구독 메시지는 XPUB → XSUB 로 거슬러 올라가므로 게시자는 구독자가 있는 topic 만 보낸다.
+    """
+
+    def __init__(self, in_addr=EVENT_HUB_IN, out_addr=EVENT_HUB_OUT, hwm=EVENT_HUB_HWM):
+        self.in_addr = in_addr
+        self.out_addr = out_addr
+        self.hwm = hwm
+        self.ctx = zmq.Context.instance()
+        self._control_addr = f"inproc://smartbow-event-hub-{id(self)}"
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return self._thread
+
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self._thread
+
+    def _run(self, ready):
+        frontend = self.ctx.socket(zmq.XSUB)
+        backend = self.ctx.socket(zmq.XPUB)
+        control = self.ctx.socket(zmq.PAIR)
+        try:
+            for socket in (frontend, backend, control):
+                socket.setsockopt(zmq.LINGER, 0)
+            frontend.setsockopt(zmq.RCVHWM, self.hwm)
+            backend.setsockopt(zmq.SNDHWM, self.hwm)
+            frontend.bind(self.in_addr)
+            backend.bind(self.out_addr)
+            control.bind(self._control_addr)
+            logger.info(f"이벤트 허브 시작 - 입력: {self.in_addr}, 출력: {self.out_addr}")
+            ready.set()
+            zmq.proxy_steerable(frontend, backend, None, control)
+        except Exception as e:
+            logger.error(f"이벤트 허브 오류: {e}", exc_info=True)
+        finally:
+            ready.set()
+            frontend.close()
+            backend.close()
+            control.close()
+
+    def stop(self, timeout=2.0):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+
+        control = self.ctx.socket(zmq.PAIR)
+        control.setsockopt(zmq.LINGER, 0)
+        control.connect(self._control_addr)
+        control.send(b"TERMINATE")
+        control.close()
+        thread.join(timeout)
+
+
+class HubPublisher:
+    """허브로 이벤트 게시 (어느 스레드에서든 호출 가능, 블로킹 없음)
+
+    PUB 소켓은 스레드 간 공유가 안 되므로 잠금으로 감싼다.
+    허브가 아직 없거나 HWM 을 넘으면 ZMQ 가 버리므로 전송은 기다리지 않는다.
+    """
+
+    def __init__(self, addr=EVENT_HUB_IN, hwm=EVENT_HUB_HWM):
+        self.ctx = zmq.Context.instance()
+        self.socket = self.ctx.socket(zmq.PUB)
+        self.socket.setsockopt(zmq.LINGER, 0)
+        self.socket.setsockopt(zmq.SNDHWM, hwm)
+        self.socket.connect(addr)
+        self._lock = threading.Lock()
+
+        self.published = Counter()  # event type 별
+        self.failed = 0
+
+    def publish(self, topic, event):
+        payload = orjson.dumps(event)
+        with self._lock:
+            try:
+                self.socket.send_multipart([topic.encode(), payload], zmq.NOBLOCK)
+            except zmq.ZMQError as e:
+                self.failed += 1
+                logger.debug(f"허브 게시 실패 - topic: {topic}, 오류: {e}")
+                return
+            self.published[event.get("type")] += 1
+
+    def close(self):
+        with self._lock:
+            self.socket.close()
+
+    def get_stats(self):
+        return {"published": dict(self.published), "failed": self.failed}
+
+
+class HubSubscriber:
+    """허브에서 받은 이벤트를 로컬 EventBus 에 게시하는 수신 스레드"""
+
+    def __init__(self, bus, addr=EVENT_HUB_OUT, hwm=EVENT_HUB_HWM, poll_timeout_ms=500):
+        self.bus = bus
+        self.addr = addr
+        self.hwm = hwm
+        self.poll_timeout_ms = poll_timeout_ms
+        self.ctx = zmq.Context.instance()
+
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.received = Counter()  # event type 별
+        self.invalid = 0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def _run(self):
+        socket = self.ctx.socket(zmq.SUB)
+        socket.setsockopt(zmq.LINGER, 0)
+        socket.setsockopt(zmq.RCVHWM, self.hwm)
+        socket.connect(self.addr)
+        socket.subscribe("")
+        try:
+            while not self._stop.is_set():
+                if not socket.poll(self.poll_timeout_ms):
+                    continue
+                while True:
+                    try:
+                        topic, payload = socket.recv_multipart(zmq.NOBLOCK)
+                        event = orjson.loads(payload)
+                    except zmq.Again:
+                        break
+                    except ValueError:
+                        self.invalid += 1
+                        continue
+                    self.received[event.get("type")] += 1
+                    self.bus.publish(topic.decode(), event)
+        except Exception as e:
+            logger.error(f"허브 수신 오류: {e}", exc_info=True)
+        finally:
+            socket.close()
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def get_stats(self):
+        return {"received": dict(self.received), "invalid": self.invalid}
+
+
+class EventHubClient:
+    """워커 하나의 허브 연결 (judge 역할 / 게시 경로 / 수신 스레드)
+
+    허브가 꺼져 있으면 judge 역할은 항상 이 프로세스이고 publish() 는 로컬 EventBus 로 간다.
+    허브가 켜져 있으면 judge 워커도 허브로만 게시하고, 자기 이벤트를 허브에서 다시 받아
+    다른 워커와 같은 경로로 전달한다.
+    """
+
+    def __init__(self, mode=EVENT_HUB, lock_path=JUDGE_LOCK_PATH):
+        if mode not in HUB_MODES:
+            raise ValueError(f"SMARTBOW_EVENT_HUB 는 {HUB_MODES} 중 하나: {mode}")
+        self.mode = mode
+        self.lock_path = lock_path
+        self.is_judge = False
+
+        self.bus = None
+        self.hub = None
+        self.publisher = None
+        self.subscriber = None
+        self._lock_file = None
+
+    @property
+    def enabled(self):
+        return self.mode != "off"
+
+    def claim_judge(self):
+        """judge 잠금 획득 시도 (프로세스가 살아 있는 동안 유지, 죽으면 OS 가 해제)"""
+        if not self.enabled:
+            self.is_judge = True
+            return True
+
+        lock_file = open(self.lock_path, "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            self.is_judge = False
+            return False
+
+        self._lock_file = lock_file
+        self.is_judge = True
+        return True
+
+    def start(self, bus):
+        self.bus = bus
+        if not self.enabled:
+            return
+
+        if self.is_judge:
+            if self.mode == "embedded":
+                self.hub = EventHub()
+                self.hub.start()
+            self.publisher = HubPublisher()
+
+        self.subscriber = HubSubscriber(bus)
+        self.subscriber.start()
+        logger.info(
+            f"이벤트 허브 연결 - 모드: {self.mode}, "
+            f"역할: {'judge' if self.is_judge else 'web'}, pid: {os.getpid()}"
+        )
+
+    def publish(self, topic, event):
+        publisher = self.publisher
+        if publisher is not None:
+            publisher.publish(topic, event)
+        elif self.bus is not None:
+            self.bus.publish(topic, event)
+
+    def stop(self):
+        if self.subscriber is not None:
+            self.subscriber.stop()
+            self.subscriber = None
+        if self.publisher is not None:
+            self.publisher.close()
+            self.publisher = None
+        if self.hub is not None:
+            self.hub.stop()
+            self.hub = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def get_stats(self):
+        stats = {"mode": self.mode, "judge": self.is_judge, "pid": os.getpid()}
+        if self.publisher is not None:
+            stats["publisher"] = self.publisher.get_stats()
+        if self.subscriber is not None:
+            stats["subscriber"] = self.subscriber.get_stats()
+        return stats
+
+
+event_hub = EventHubClient()
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s"
+    )
+    hub = EventHub()
+    hub.start()
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    while not stop.wait(0.5):
+        pass
+    hub.stop()
+
+
+if __name__ == "__main__":
+    main()
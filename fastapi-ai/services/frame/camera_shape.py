@@ -11,3 +11,8 @@ def get_camera_shape(cam_id: str):
             return tuple(config["shape"])
 
     raise KeyError(f"frame_shape not found for cam_id={cam_id}")
+
+
+def get_arrow_camera_ids():
+    """설정된 화살 카메라 id 목록 (설정 순서)"""
+    return [config["id"] for config in ARROW_INFER_CONFIG.values()]
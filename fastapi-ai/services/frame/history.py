@@ -0,0 +1,185 @@
+import logging
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+from services.frame.shm_registry import get_frame_buffer
+
+logger = logging.getLogger("smartbow.frame")
+
+# 1080p 한 장이 ~6MB 라 기본은 꺼 둠 (꺼져 있으면 적중 이미지는 last_frame 사용)
+# 이벤트 허브를 쓰는 judge 워커는 이 값과 상관없이 켬 (services.events.hub)
+FRAME_HISTORY_ENABLED = os.getenv("SMARTBOW_FRAME_HISTORY", "0") == "1"
+FRAME_HISTORY_FPS = float(os.getenv("SMARTBOW_FRAME_HISTORY_FPS", "10"))
+# 0 이면 판정 대기 구간(set_window) + 여유 만큼만 슬롯을 잡음
+FRAME_HISTORY_SIZE = int(os.getenv("SMARTBOW_FRAME_HISTORY_SIZE", "0"))
+FRAME_HISTORY_MARGIN_SEC = float(os.getenv("SMARTBOW_FRAME_HISTORY_MARGIN_SEC", "1.0"))
+# 요청 시각과 가장 가까운 프레임이 이보다 멀면 쓰지 않음 (기본: 샘플 간격 2 배)
+FRAME_HISTORY_TOLERANCE_SEC = float(
+    os.getenv("SMARTBOW_FRAME_HISTORY_TOLERANCE_SEC", str(2.0 / FRAME_HISTORY_FPS))
+)
+# 추론 이벤트 timestamp + 이 값 = 생산자가 공유 메모리에 기록한 촬영 시각
+# (추론 쪽이 촬영 시각을 그대로 넘기면 0, 수신 / 추론 시각을 넘기면 그 지연만큼 음수)
+FRAME_HISTORY_CLOCK_OFFSET = float(os.getenv("SMARTBOW_FRAME_HISTORY_CLOCK_OFFSET", "0"))
+
+
+def history_size(window_sec, fps=FRAME_HISTORY_FPS, margin_sec=FRAME_HISTORY_MARGIN_SEC):
+    """window_sec 전 프레임까지 링에 남아 있도록 하는 슬롯 수"""
+    return math.ceil((window_sec + margin_sec) * fps) + 1
+
+
+class FrameHistory:
+    """카메라별 최근 N 프레임 링 (미리 할당한 슬롯에 복사, 프레임당 할당 없음)"""
+
+    def __init__(self, cam_id, shape, size, dtype=np.uint8):
+        self.cam_id = cam_id
+        self.shape = tuple(shape)
+        self.size = size
+
+        self.frames = np.zeros((size,) + self.shape, dtype=dtype)
+        self.timestamps = np.full(size, -np.inf)
+        self.count = 0
+        self.misses = 0  # tolerance 를 넘어 None 을 돌려준 횟수
+        self._lock = threading.Lock()
+
+    def capture(self, frame, ts, check=None):
+        """프레임을 다음 슬롯에 복사 (check() 가 False 면 기록하지 않고 False)"""
+        with self._lock:
+            idx = self.count % self.size
+            self.timestamps[idx] = -np.inf
+            np.copyto(self.frames[idx], frame)
+            if check is not None and not check():
+                return False
+            self.timestamps[idx] = ts
+            self.count += 1
+            return True
+
+    def nearest(self, ts, tolerance=FRAME_HISTORY_TOLERANCE_SEC):
+        """ts 에 가장 가까운 프레임의 (복사본, 촬영 시각)
+
+        기록이 없거나 가장 가까운 프레임도 tolerance 초보다 멀면 None
+        (링이 이미 그 시각을 지나쳤거나 ts 가 다른 시계 기준인 경우)
+        """
+        with self._lock:
+            if self.count == 0:
+                return None
+            gaps = np.abs(self.timestamps - ts)
+            idx = int(np.argmin(gaps))
+            gap = float(gaps[idx])
+            if gap > tolerance:
+                self.misses += 1
+                oldest = float(self.timestamps[np.isfinite(self.timestamps)].min())
+                newest = float(self.timestamps.max())
+            else:
+                return self.frames[idx].copy(), float(self.timestamps[idx])
+
+        logger.warning(
+            f"프레임 히스토리에 요청 시각 근처 프레임 없음 - 카메라: {self.cam_id}, "
+            f"요청: {ts:.3f}, 차이: {gap:.3f}s, 기록 구간: {oldest:.3f}~{newest:.3f}"
+        )
+        return None
+
+    def window(self, start_ts, end_ts):
+        """[start_ts, end_ts] 구간 프레임을 시간 순서대로 (클립 추출용)"""
+        with self._lock:
+            mask = (self.timestamps >= start_ts) & (self.timestamps <= end_ts)
+            idxs = np.flatnonzero(mask)
+            idxs = idxs[np.argsort(self.timestamps[idxs])]
+            return [(float(self.timestamps[i]), self.frames[i].copy()) for i in idxs]
+
+
+class FrameHistorySampler:
+    """공유 메모리 FrameBuffer 를 주기적으로 읽어 카메라별 FrameHistory 에 기록
+
+    WebRTC 시청자가 없어도 동작한다. fps 간격으로 샘플링하므로 nearest() 로 찾은 프레임은
+    요청 시각과 최대 반 간격 (10fps 면 ~50ms) 어긋날 수 있다.
+    """
+
+    def __init__(self, fps=FRAME_HISTORY_FPS, size=FRAME_HISTORY_SIZE):
+        self.fps = fps
+        self.interval = 1.0 / fps
+        self.size = size or history_size(0.0, fps)
+        self._explicit_size = bool(size)
+
+        self.histories = {}  # cam_id -> FrameHistory
+        self._cameras = set()
+        self._last_seq = {}  # cam_id -> 마지막으로 기록한 공유 메모리 프레임 번호
+        self._stop = threading.Event()
+        self._thread = None
+
+    def set_window(self, window_sec):
+        """판정이 적중 시각보다 최대 window_sec 늦게 돌 때 필요한 만큼만 슬롯을 잡음
+        (SMARTBOW_FRAME_HISTORY_SIZE 를 지정했으면 그 값 유지, 링 생성 전에 호출)"""
+        if not self._explicit_size:
+            self.size = history_size(window_sec, self.fps)
+
+    def add_camera(self, cam_id):
+        self._cameras.add(cam_id)
+
+    def get(self, cam_id):
+        return self.histories.get(cam_id)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _sample(self, cam_id):
+        try:
+            shm = get_frame_buffer(cam_id)
+        except FileNotFoundError:
+            return  # 프레임 생산자가 아직 공유 메모리를 만들지 않음
+
+        latest = shm.read_latest(self._last_seq.get(cam_id, 0))
+        if latest is None:
+            return  # 새 프레임 없음
+        seq, ts, frame = latest
+
+        history = self.histories.get(cam_id)
+        if history is None:
+            history = FrameHistory(cam_id, shm.shape, self.size, shm.dtype)
+            self.histories[cam_id] = history
+            logger.info(
+                f"프레임 히스토리 생성 - 카메라: {cam_id}, {self.size}프레임 "
+                f"({history.frames.nbytes / 1024 / 1024:.0f}MB)"
+            )
+
+        # 촬영 시각은 생산자가 헤더에 기록한 값 사용
+        if history.capture(frame, ts, check=lambda: shm.validate(seq)):
+            self._last_seq[cam_id] = seq
+        else:
+            shm.torn += 1
+
+    def _run(self):
+        logger.info("프레임 히스토리 수집 스레드 시작")
+
+        next_tick = time.time()
+        while not self._stop.is_set():
+            for cam_id in list(self._cameras):
+                try:
+                    self._sample(cam_id)
+                except Exception as e:
+                    logger.error(f"프레임 히스토리 수집 실패 - 카메라: {cam_id}, 오류: {e}")
+
+            next_tick += self.interval
+            delay = next_tick - time.time()
+            if delay > 0:
+                self._stop.wait(delay)
+            else:
+                next_tick = time.time()  # 밀린 주기는 건너뜀
+
+
+frame_history = FrameHistorySampler()
@@ -3,7 +3,11 @@ from utils.frame_shm import FrameBuffer
 _shm_map = {}
 
 
-def get_frame_buffer(cam_id: str, shape):
+def get_frame_buffer(cam_id: str, shape=None):
+    """카메라 프레임 버퍼 (shape / dtype 은 공유 메모리 헤더에서 읽음)
+
+    shape 를 넘기면 헤더와 다를 때 ValueError.
+    """
     if cam_id not in _shm_map:
         _shm_map[cam_id] = FrameBuffer(name=f"shm_{cam_id}", shape=shape, create=False)
 
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger("smartbow.monitor")
+
+LOOP_LAG_INTERVAL = float(os.getenv("SMARTBOW_LOOP_LAG_INTERVAL", "0.1"))
+LOOP_LAG_WINDOW = int(os.getenv("SMARTBOW_LOOP_LAG_WINDOW", "600"))  # 최근 샘플 수
+LOOP_LAG_WARN_MS = float(os.getenv("SMARTBOW_LOOP_LAG_WARN_MS", "100"))
+
+
+class LoopLagMonitor:
+    """이벤트 루프 지연 측정: interval 만큼 잠들었다 깨어난 시각이 늦은 만큼이 지연
+
+    루프를 막는 작업(프레임 합성 등)이 있으면 지연이 그대로 드러난다.
+    """
+
+    def __init__(
+        self,
+        interval=LOOP_LAG_INTERVAL,
+        window=LOOP_LAG_WINDOW,
+        warn_ms=LOOP_LAG_WARN_MS,
+        clock=time.perf_counter,
+    ):
+        self.interval = interval
+        self.warn_ms = warn_ms
+        self.clock = clock
+
+        self._samples = deque(maxlen=window)  # ms
+        self._task = None
+
+        self.count = 0
+        self.max_ms = 0.0
+        self.stalls = 0  # warn_ms 를 넘긴 횟수
+
+    def observe(self, lag_ms):
+        self._samples.append(lag_ms)
+        self.count += 1
+        if lag_ms > self.max_ms:
+            self.max_ms = lag_ms
+        if lag_ms > self.warn_ms:
+            self.stalls += 1
+            logger.warning(f"이벤트 루프 지연 {lag_ms:.1f}ms")
+
+    def get_stats(self):
+        stats = {
+            "interval_ms": self.interval * 1000,
+            "samples": self.count,
+            "max_ms": self.max_ms,
+            "stalls": self.stalls,
+            "warn_ms": self.warn_ms,
+        }
+        if self._samples:
+            p50, p99 = np.percentile(self._samples, [50, 99])
+            stats.update(
+                last_ms=self._samples[-1],
+                p50_ms=float(p50),
+                p99_ms=float(p99),
+                window_max_ms=max(self._samples),
+            )
+        return stats
+
+    def start(self):
+        """실행 중인 이벤트 루프 안에서 호출"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return self._task
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            start = self.clock()
+            await asyncio.sleep(self.interval)
+            lag = self.clock() - start - self.interval
+            self.observe(max(lag, 0.0) * 1000)
+
+
+loop_lag_monitor = LoopLagMonitor()
@@ -1,23 +1,87 @@
 import time
 
+import numpy as np
+
+from services.person.tracker import PersonTracker
+
+
+def _people(person):
+    """감지 결과(dict / dict 목록 / None) → bbox 가 있는 감지 dict 목록"""
+    if person is None:
+        return []
+    if isinstance(person, dict):
+        person = [person]
+    return [p for p in person if isinstance(p, dict) and p.get("bbox") is not None]
+
+
+def _detections(people):
+    """감지 dict 목록 → (boxes (K, 4), confs (K,))"""
+    boxes = np.array([p["bbox"] for p in people], dtype=np.float64).reshape(-1, 4)
+    confs = np.array([p.get("conf", 0.0) for p in people], dtype=np.float64)
+    return boxes, confs
+
 
 class PersonService:
-    def __init__(self, timeout=1.5):
-        self.person = None
-        self.last_timestamp = None
+    """카메라(레인) 하나의 사람 감지 상태
+
+    감지 결과는 PersonTracker 로 프레임 간 같은 사람을 이어 트랙 id 를 유지한다.
+    화면에는 마지막 감지 결과의 트랙만 보이고, 잠깐 놓친 사람도 timeout 안에 다시
+    감지되면 같은 트랙 id 로 이어진다. 감지 이벤트가 timeout 동안 없으면 모두 사라진다.
+    """
+
+    def __init__(self, timeout=1.5, clock=time.time):
         self.timeout = timeout
+        self.clock = clock  # 재생 시 가상 시계 주입
+        self.tracker = PersonTracker(max_age=timeout)
+        self.person = None  # 마지막 감지 중 신뢰도가 가장 높은 감지 dict (원본 그대로)
+        self.last_timestamp = None
 
     def update_detections(self, person):
-        self.person = person
-        self.last_timestamp = time.time()
+        """person: 감지 dict ({"bbox", "conf"}), 여러 명이면 목록, 없으면 None
+
+        bbox 가 없거나 빈 감지는 dict / 목록 어느 쪽이든 무시
+        """
+        people = _people(person)
+        boxes, confs = _detections(people)
+        self.person = people[int(confs.argmax())] if people else None
+        self.last_timestamp = self.clock()
+        self.tracker.update(boxes, confs, self.last_timestamp)
+
+    def update_batch(self, events):
+        # 같은 카메라의 밀린 이벤트는 최신 감지 결과만 반영
+        for event in reversed(events):
+            if "persons" in event:
+                self.update_detections(event["persons"])
+                return
+            if "person" in event:
+                self.update_detections(event["person"])
+                return
+
+    def get_tracks(self, latest=True):
+        """트랙 목록 (track_id / bbox / conf / age / hits, 최근에 본 순)
+
+        latest 가 False 면 이번 감지에서 놓쳤지만 아직 살아 있는 트랙도 포함
+        """
+        if self.last_timestamp is None:
+            return []
+        return self.tracker.tracks(self.clock(), latest=latest)
 
     def get_detection(self):
+        """마지막 감지 중 신뢰도가 가장 높은 감지 dict (받은 그대로, timeout 이 지나면 None)
+
+        트랙 id 가 필요하면 get_tracks()
+        """
         if self.person is None or self.last_timestamp is None:
             return None
 
-        if time.time() - self.last_timestamp > self.timeout:
+        if self.clock() - self.last_timestamp > self.timeout:
             self.person = None
-
             return None
 
         return self.person
+
+    def get_track_history(self, track_id):
+        return self.tracker.track_history(track_id)
+
+    def get_stats(self):
+        return self.tracker.get_stats()
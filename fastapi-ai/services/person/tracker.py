@@ -0,0 +1,248 @@
+import os
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # scipy 가 없으면 greedy 매칭
+    linear_sum_assignment = None
+
+PERSON_MAX_TRACKS = int(os.getenv("SMARTBOW_PERSON_MAX_TRACKS", "8"))
+PERSON_TRACK_HISTORY = int(os.getenv("SMARTBOW_PERSON_TRACK_HISTORY", "32"))
+PERSON_IOU_MIN = float(os.getenv("SMARTBOW_PERSON_IOU_MIN", "0.3"))
+# IoU 가 낮아도 중심 거리가 bbox 대각선의 이 비율 안이면 같은 사람으로 (빠른 움직임 / 감지 흔들림)
+PERSON_CENTER_GATE = float(os.getenv("SMARTBOW_PERSON_CENTER_GATE", "0.5"))
+# 중심 거리로 이을 때 넓이 비 상한 (크기가 크게 다른 오검출이 트랙을 가로채지 않게)
+PERSON_AREA_RATIO = float(os.getenv("SMARTBOW_PERSON_AREA_RATIO", "2.0"))
+
+NO_MATCH = 1e6
+
+
+def _areas(boxes):
+    return (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+
+
+def iou_matrix(a, b, area_a=None, area_b=None):
+    """(N, 4) x (M, 4) bbox [x1, y1, x2, y2] → (N, M) IoU"""
+    if area_a is None:
+        area_a = _areas(a)
+    if area_b is None:
+        area_b = _areas(b)
+
+    w = np.minimum(a[:, None, 2], b[None, :, 2]) - np.maximum(a[:, None, 0], b[None, :, 0])
+    h = np.minimum(a[:, None, 3], b[None, :, 3]) - np.maximum(a[:, None, 1], b[None, :, 1])
+    inter = np.maximum(w, 0.0) * np.maximum(h, 0.0)
+    union = area_a[:, None] + area_b[None, :] - inter
+    return inter / np.maximum(union, 1e-9)
+
+
+def match_cost(
+    tracks,
+    detections,
+    iou_min=PERSON_IOU_MIN,
+    gate=PERSON_CENTER_GATE,
+    area_ratio=PERSON_AREA_RATIO,
+):
+    """트랙 x 감지 비용 행렬
+
+    IoU 가 iou_min 이상이면 1 - IoU, 아니면 중심 거리 / 트랙 대각선이 gate 안이고
+    넓이 비가 area_ratio 안일 때 1 + 그 비율 (IoU 매칭을 우선), 둘 다 아니면 NO_MATCH
+    """
+    area_t = _areas(tracks)
+    area_d = _areas(detections)
+    iou = iou_matrix(tracks, detections, area_t, area_d)
+
+    # 중심 좌표 x2 끼리의 차이 = 중심 거리 x2, 대각선도 x2 해서 비율은 그대로
+    dx = (tracks[:, None, 0] + tracks[:, None, 2]) - (
+        detections[None, :, 0] + detections[None, :, 2]
+    )
+    dy = (tracks[:, None, 1] + tracks[:, None, 3]) - (
+        detections[None, :, 1] + detections[None, :, 3]
+    )
+    diag = np.hypot(tracks[:, 2] - tracks[:, 0], tracks[:, 3] - tracks[:, 1])
+    dist = np.hypot(dx, dy) / np.maximum(diag * 2.0, 1e-9)[:, None]
+
+    ratio = np.maximum(area_t, 1e-9)[:, None] / np.maximum(area_d, 1e-9)[None, :]
+    far = (dist > gate) | (ratio > area_ratio) | (ratio * area_ratio < 1.0)
+
+    cost = np.where(iou >= iou_min, 1.0 - iou, 1.0 + dist)
+    cost[(iou < iou_min) & far] = NO_MATCH
+    return cost
+
+
+def assign(cost):
+    """비용 행렬에서 (트랙 idx, 감지 idx) 쌍 (NO_MATCH 는 제외)
+
+    scipy 가 있으면 Hungarian, 없으면 비용이 낮은 쌍부터 greedy
+    (한 레인에 사람이 몇 명뿐이라 두 결과가 다른 경우는 드묾)
+    """
+    if cost.size == 0:
+        return []
+
+    if linear_sum_assignment is not None:
+        rows, cols = linear_sum_assignment(cost)
+    else:
+        order = np.argsort(cost, axis=None)
+        rows, cols = np.unravel_index(order, cost.shape)
+        used_r, used_c = set(), set()
+        pairs = []
+        for r, c in zip(rows.tolist(), cols.tolist()):
+            if cost[r, c] >= NO_MATCH:
+                break
+            if r in used_r or c in used_c:
+                continue
+            used_r.add(r)
+            used_c.add(c)
+            pairs.append((r, c))
+        return pairs
+
+    return [
+        (r, c) for r, c in zip(rows.tolist(), cols.tolist()) if cost[r, c] < NO_MATCH
+    ]
+
+
+class PersonTracker:
+    """여러 사람 IoU / 중심 거리 추적기 (고정 슬롯 배열, 업데이트당 할당 최소)
+
+    슬롯마다 트랙 id / 마지막 bbox / 신뢰도 / 시각과 최근 history 개 bbox 링을 가진다.
+    max_age 동안 다시 감지되지 않은 트랙은 비우고, 슬롯이 모자라면 가장 오래 안 보인
+    트랙을 밀어낸다. 트랙 id 는 1 부터 계속 증가 (재사용하지 않음).
+    tracks() 의 트랙마다 id 가 유지되므로 선수 식별 같은 후속 작업은 프레임이 아니라
+    트랙 단위로 한 번만 하면 된다.
+    """
+
+    def __init__(
+        self, max_age, max_tracks=PERSON_MAX_TRACKS, history=PERSON_TRACK_HISTORY
+    ):
+        self.max_age = max_age
+        self.max_tracks = max_tracks
+        self.history_size = history
+
+        self.ids = np.zeros(max_tracks, dtype=np.int64)  # 0: 빈 슬롯
+        self.boxes = np.zeros((max_tracks, 4), dtype=np.float64)
+        self.conf = np.zeros(max_tracks, dtype=np.float64)
+        self.first_seen = np.zeros(max_tracks, dtype=np.float64)
+        self.last_seen = np.zeros(max_tracks, dtype=np.float64)
+        self.hits = np.zeros(max_tracks, dtype=np.int64)
+
+        self.history = np.zeros((max_tracks, history, 4), dtype=np.float32)
+        self.history_ts = np.zeros((max_tracks, history), dtype=np.float64)
+
+        self.next_id = 1
+        self.updated_at = None  # 마지막 update 시각
+        self.updates = 0
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+        self.dropped = 0
+        self.fast_matches = 0  # IoU 만으로 매칭이 끝난 update
+
+    def _record(self, slot, box, conf, ts):
+        pos = self.hits[slot] % self.history_size
+        self.history[slot, pos] = box
+        self.history_ts[slot, pos] = ts
+        self.boxes[slot] = box
+        self.conf[slot] = conf
+        self.last_seen[slot] = ts
+        self.hits[slot] += 1
+
+    def _expire(self, now):
+        stale = (self.ids > 0) & (now - self.last_seen > self.max_age)
+        if stale.any():
+            self.expired += int(stale.sum())
+            self.ids[stale] = 0
+
+    def _new_track(self, box, conf, ts):
+        free = np.flatnonzero(self.ids == 0)
+        if free.size:
+            slot = free[0]
+        else:
+            slot = int(np.argmin(self.last_seen))
+            if self.last_seen[slot] >= ts:
+                # 이번 프레임에 갱신된 트랙뿐이면 넘치는 감지는 버림
+                self.dropped += 1
+                return
+            self.evicted += 1
+
+        self.ids[slot] = self.next_id
+        self.next_id += 1
+        self.first_seen[slot] = ts
+        self.hits[slot] = 0
+        self.created += 1
+        self._record(slot, box, conf, ts)
+
+    def update(self, boxes, confs, ts):
+        """한 프레임 감지 결과 반영 (boxes: (K, 4), confs: (K,))"""
+        self.updates += 1
+        self.updated_at = ts
+        self._expire(ts)
+
+        active = np.flatnonzero(self.ids > 0)
+        if not len(boxes):
+            return
+
+        matched_dets = set()
+        if active.size:
+            for r, c in self._match(self.boxes[active], boxes):
+                self._record(active[r], boxes[c], confs[c], ts)
+                matched_dets.add(c)
+
+        for c in range(len(boxes)):
+            if c not in matched_dets:
+                self._new_track(boxes[c], confs[c], ts)
+
+    def _match(self, tracks, boxes):
+        """대부분의 프레임은 IoU 만으로 감지마다 트랙이 하나씩 정해지므로 그대로 쓰고,
+        겹치거나 IoU 로 이어지지 않는 감지가 있을 때만 전체 비용 행렬로 매칭"""
+        good = iou_matrix(tracks, boxes) >= PERSON_IOU_MIN
+        per_det = good.sum(axis=0)
+        if (per_det == 1).all() and (good.sum(axis=1) <= 1).all():
+            self.fast_matches += 1
+            rows, cols = np.nonzero(good)
+            return zip(rows.tolist(), cols.tolist())
+        return assign(match_cost(tracks, boxes))
+
+    def tracks(self, now, latest=False):
+        """살아 있는 트랙 목록 (최근에 본 순)
+
+        latest 면 마지막 update 에서 감지된 트랙만 (화면 표시용, 잠깐 놓친 트랙은 제외)
+        """
+        mask = (self.ids > 0) & (now - self.last_seen <= self.max_age)
+        if latest:
+            mask &= self.last_seen == self.updated_at
+        live = np.flatnonzero(mask)
+        live = live[np.argsort(-self.last_seen[live], kind="stable")]
+        return [
+            {
+                "track_id": int(self.ids[slot]),
+                "bbox": self.boxes[slot].tolist(),
+                "conf": float(self.conf[slot]),
+                "age": float(now - self.first_seen[slot]),
+                "hits": int(self.hits[slot]),
+            }
+            for slot in live
+        ]
+
+    def track_history(self, track_id):
+        """트랙의 최근 (시각, bbox) 배열, 오래된 순 (없으면 None)"""
+        slots = np.flatnonzero(self.ids == track_id)
+        if not slots.size:
+            return None
+
+        slot = slots[0]
+        count = int(min(self.hits[slot], self.history_size))
+        start = int(self.hits[slot]) - count
+        idx = np.arange(start, start + count) % self.history_size
+        return self.history_ts[slot, idx].copy(), self.history[slot, idx].copy()
+
+    def get_stats(self):
+        return {
+            "tracks": int((self.ids > 0).sum()),
+            "updates": self.updates,
+            "created": self.created,
+            "expired": self.expired,
+            "evicted": self.evicted,
+            "dropped": self.dropped,
+            "fast_matches": self.fast_matches,
+            "matcher": "hungarian" if linear_sum_assignment is not None else "greedy",
+        }
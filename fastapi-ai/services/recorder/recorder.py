@@ -0,0 +1,141 @@
+import datetime
+import logging
+import os
+import queue
+import threading
+import time
+
+import msgpack
+from config import BASE_DIR
+
+logger = logging.getLogger("smartbow.recorder")
+
+RECORD_DIR = os.getenv("SMARTBOW_RECORD_DIR", os.path.join(BASE_DIR, "records"))
+RECORD_ENABLED = os.getenv("SMARTBOW_RECORD_EVENTS", "0") == "1"
+SEGMENT_EXT = ".sbrec"
+
+# 세그먼트 파일: msgpack 레코드를 이어 붙인 append-only 스트림
+#   [수신 시각, 종류("arrow" | "person" | "target"), 이벤트 목록]
+# 수신 스레드가 한번에 넘긴 묶음 단위로 기록하므로 재생 시 add_events 호출 단위가 같다.
+
+
+def segment_path(record_dir, day, cam_id):
+    return os.path.join(record_dir, day, f"{cam_id}{SEGMENT_EXT}")
+
+
+def read_segment(path):
+    """세그먼트 파일의 레코드를 (ts, kind, events) 로 순회 (잘린 마지막 레코드는 무시)"""
+    with open(path, "rb") as f:
+        unpacker = msgpack.Unpacker(f, raw=False)
+        try:
+            for ts, kind, events in unpacker:
+                yield ts, kind, events
+        except (msgpack.UnpackException, ValueError) as e:
+            logger.warning(f"세그먼트 읽기 중단 - {path}: {e}")
+
+
+class EventRecorder:
+    """수신 이벤트를 카메라별 / 일자별 세그먼트 파일에 기록하는 백그라운드 writer"""
+
+    def __init__(self, record_dir=RECORD_DIR, max_queue=10000, flush_sec=1.0):
+        self.record_dir = record_dir
+        self.flush_sec = flush_sec
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._files = {}  # (day, cam_id) -> file
+        self._packer = msgpack.Packer(use_bin_type=True)
+        self._thread = None
+
+        self.records = 0
+        self.dropped = 0
+
+    def record(self, cam_id, kind, events, ts=None):
+        """수신 경로에서 호출: 큐에 넣기만 하고 가득 차면 버림"""
+        if self._thread is None:
+            return
+
+        if ts is None:
+            ts = time.time()
+
+        try:
+            self._queue.put_nowait((ts, cam_id, kind, events))
+        except queue.Full:
+            self.dropped += 1
+
+    def get_stats(self):
+        return {
+            "enabled": self._thread is not None,
+            "records": self.records,
+            "dropped": self.dropped,
+            "queued": self._queue.qsize(),
+        }
+
+    def start(self):
+        if self._thread is not None:
+            return self._thread
+
+        os.makedirs(self.record_dir, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        logger.info(f"이벤트 기록 시작 - 경로: {self.record_dir}")
+        return self._thread
+
+    def stop(self, timeout=2.0):
+        thread, self._thread = self._thread, None
+        if thread is None:
+            return
+
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def _get_file(self, ts, cam_id):
+        day = datetime.datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+        key = (day, cam_id)
+
+        f = self._files.get(key)
+        if f is None:
+            # 날짜가 바뀐 카메라의 이전 세그먼트 정리
+            for old_key in [k for k in self._files if k[1] == cam_id]:
+                self._files.pop(old_key).close()
+
+            path = segment_path(self.record_dir, day, cam_id)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            f = open(path, "ab")
+            self._files[key] = f
+        return f
+
+    def _run(self):
+        last_flush = time.time()
+
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_sec)
+                except queue.Empty:
+                    item = ()
+
+                if item is None:
+                    break
+
+                if item:
+                    ts, cam_id, kind, events = item
+                    try:
+                        f = self._get_file(ts, cam_id)
+                        f.write(self._packer.pack([ts, kind, events]))
+                        self.records += 1
+                    except Exception as e:
+                        logger.error(f"이벤트 기록 실패 - 카메라: {cam_id}, 오류: {e}")
+
+                now = time.time()
+                if now - last_flush >= self.flush_sec:
+                    for f in self._files.values():
+                        f.flush()
+                    last_flush = now
+        finally:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+            logger.info(f"이벤트 기록 종료 (기록 {self.records}건, 버림 {self.dropped}건)")
+
+
+event_recorder = EventRecorder()
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger("smartbow.webrtc")
+
+# 카메라당 공유하는 축소 해상도 단계 (원본 대비 배율)
+SCALE_LADDER = (1.0, 0.75, 0.5, 0.25)
+
+# 품질 단계 (배율, fps): 나빠지면 한 단계씩 내리고, 좋은 상태가 이어지면 한 단계씩 올림
+QUALITY_STEPS = (
+    (1.0, 30),
+    (1.0, 20),
+    (0.75, 20),
+    (0.5, 15),
+    (0.5, 10),
+    (0.25, 10),
+)
+
+ADAPT_INTERVAL = float(os.getenv("SMARTBOW_WEBRTC_ADAPT_INTERVAL", "2.0"))
+# 프론트엔드가 보내는 video_size 는 CSS 픽셀이므로 기기 픽셀 비율만큼 여유를 둠
+VIDEO_SIZE_DPR = float(os.getenv("SMARTBOW_WEBRTC_VIDEO_SIZE_DPR", "2.0"))
+
+LOSS_BAD = 0.05  # 수신측 RTCP 손실률
+LOSS_GOOD = 0.01
+RTT_BAD = 0.4  # 초
+RTT_GOOD = 0.2
+DELIVERY_BAD = 0.75  # 실제 송신 fps / 목표 fps (인코더 / 송신 루프가 밀림)
+DELIVERY_GOOD = 0.9
+UPGRADE_AFTER = 3  # 좋은 상태가 연속 몇 번이면 한 단계 올릴지
+
+
+def cap_scale(frame_size, video_size, dpr=VIDEO_SIZE_DPR):
+    """표시 크기(video_size)를 덮는 가장 작은 SCALE_LADDER 배율 (video_size 없으면 1.0)"""
+    if not video_size:
+        return 1.0
+
+    frame_w, frame_h = frame_size
+    display_w, display_h = video_size
+    needed = max(display_w * dpr / frame_w, display_h * dpr / frame_h)
+    for scale in reversed(SCALE_LADDER):
+        if scale >= needed:
+            return scale
+    return SCALE_LADDER[0]
+
+
+def next_step(step, sample, good_streak):
+    """측정값으로 다음 품질 단계 결정 → (step, good_streak)
+
+    sample: {"loss": 0~1 또는 None, "rtt": 초 또는 None, "delivery": 0~1 또는 None}
+    """
+    loss, rtt, delivery = sample.get("loss"), sample.get("rtt"), sample.get("delivery")
+
+    bad = (
+        (loss is not None and loss > LOSS_BAD)
+        or (rtt is not None and rtt > RTT_BAD)
+        or (delivery is not None and delivery < DELIVERY_BAD)
+    )
+    if bad:
+        return min(step + 1, len(QUALITY_STEPS) - 1), 0
+
+    good = (
+        (loss is None or loss < LOSS_GOOD)
+        and (rtt is None or rtt < RTT_GOOD)
+        and (delivery is None or delivery >= DELIVERY_GOOD)
+    )
+    if not good:
+        return step, 0
+
+    good_streak += 1
+    if good_streak >= UPGRADE_AFTER and step > 0:
+        return step - 1, 0
+    return step, good_streak
+
+
+class PeerAdapter:
+    """PeerConnection 하나의 RTCP / 송신 통계를 주기적으로 읽어 트랙의 배율 / fps 조정
+
+    size_cap() 은 해당 카메라 화면의 표시 크기 (width, height) 또는 None.
+    통계를 읽을 때 송신 바이트 / 마지막 RTCP 리포트 시각도 기록해 둔다 (PeerRegistry 가 사용).
+    """
+
+    def __init__(self, pc, track, size_cap=None, interval=ADAPT_INTERVAL):
+        self.pc = pc
+        self.track = track
+        self.size_cap = size_cap
+        self.interval = interval
+
+        self.step = 0
+        self.good_streak = 0
+        self.last_sample = {}
+        self.bytes_sent = 0
+        self.packets_sent = 0
+        self.rtcp_at = None  # 마지막 수신측 RTCP 리포트 시각 (epoch 초)
+        self._sent = 0
+        self._composed = 0
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def sample(self):
+        loss = rtt = None
+        report = await self.pc.getStats()
+        for stats in report.values():
+            if stats.type == "remote-inbound-rtp" and stats.kind == "video":
+                loss = stats.fractionLost / 256  # RTCP fraction lost (8bit 고정소수점)
+                rtt = stats.roundTripTime
+                self.rtcp_at = stats.timestamp.timestamp()
+            elif stats.type == "outbound-rtp" and stats.kind == "video":
+                self.bytes_sent = stats.bytesSent
+                self.packets_sent = stats.packetsSent
+
+        # 카메라가 목표 fps 보다 느리게 들어오면 들어온 만큼만 기대
+        sent, composed = self.track.sent, self.track.broadcaster.composed
+        expected = min(self.track.fps * self.interval, composed - self._composed)
+        delivery = (sent - self._sent) / expected if expected > 0 else None
+        self._sent, self._composed = sent, composed
+        return {"loss": loss, "rtt": rtt, "delivery": delivery}
+
+    def apply(self):
+        scale, fps = QUALITY_STEPS[self.step]
+        if self.size_cap is not None:
+            scale = min(scale, cap_scale(self.track.frame_size, self.size_cap()))
+        self.track.set_quality(scale, fps)
+
+    async def _run(self):
+        self.apply()
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                if self.pc.connectionState != "connected":
+                    self._sent = self.track.sent
+                    self._composed = self.track.broadcaster.composed
+                    continue
+
+                try:
+                    self.last_sample = await self.sample()
+                except Exception as e:
+                    logger.error(
+                        f"WebRTC 통계 조회 실패 - 카메라: {self.track.cam_id}, 오류: {e}"
+                    )
+                    continue
+
+                step, self.good_streak = next_step(
+                    self.step, self.last_sample, self.good_streak
+                )
+                if step != self.step:
+                    logger.info(
+                        f"송신 품질 변경 - 카메라: {self.track.cam_id}, "
+                        f"단계 {self.step} → {step} {QUALITY_STEPS[step]}, "
+                        f"측정: {self.last_sample}"
+                    )
+                    self.step = step
+                self.apply()
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,349 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from services.frame.shm_registry import get_frame_buffer
+from services.webrtc.activity import IDLE_FPS, ActivityDetector
+from services.webrtc.adaptation import SCALE_LADDER
+from services.webrtc.overlay import TARGET_COLOR, TARGET_THICKNESS, TargetOverlay
+
+logger = logging.getLogger("smartbow.webrtc")
+
+# 합성 / 색공간 변환 / VideoFrame 생성은 이벤트 루프 밖 스레드에서 (cv2 / av 는 GIL 해제)
+COMPOSE_WORKERS = int(
+    os.getenv("SMARTBOW_COMPOSE_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+compose_executor = ThreadPoolExecutor(
+    max_workers=COMPOSE_WORKERS, thread_name_prefix="compose"
+)
+# 0 이면 화살 / 모래 표시를 영상에 그리지 않음 (클라이언트가 /ws 궤적 구독으로 직접 그릴 때)
+VIDEO_ARROW_OVERLAY = os.getenv("SMARTBOW_VIDEO_ARROW_OVERLAY", "1") != "0"
+
+
+def compose_frame(
+    frame, arrow_service, person_service, overlay=None, draw_arrow=True
+):
+    """공유 메모리 프레임에 과녁 / 화살 / 모래 / 사람 오버레이를 그린 복사본
+
+    overlay (TargetOverlay) 가 있으면 과녁 외곽선은 미리 준비해 둔 좌표로 그린다.
+    정적인 과녁을 먼저, 동적인 요소를 그 위에 그린다.
+    draw_arrow 가 False 면 화살 / 모래 표시는 생략한다.
+    """
+    processed_frame = frame.copy()
+
+    if overlay is not None:
+        overlay.apply(processed_frame)
+    else:
+        target = arrow_service.target
+
+        if target is not None:
+            # target: np.ndarray shape (4, 2) or list[[x,y],...]
+            pts = np.array(target, dtype=np.int32).reshape((-1, 1, 2))
+
+            # 외곽선
+            cv2.polylines(
+                processed_frame,
+                [pts],
+                isClosed=True,
+                color=TARGET_COLOR,
+                thickness=TARGET_THICKNESS,
+                lineType=cv2.LINE_AA,
+            )
+
+    curr = arrow_service.current_arrow if draw_arrow else None
+    if curr:
+        t1 = tuple(map(int, curr["tail"]))
+        t2 = tuple(map(int, curr["tip"]))
+
+        cv2.line(processed_frame, t1, t2, (0, 255, 0), 2, cv2.LINE_AA)
+
+    splash = arrow_service.current_splash if draw_arrow else None
+
+    if splash:
+        s_x1, s_y1, s_x2, s_y2 = map(int, splash)
+        cv2.rectangle(
+            processed_frame, (s_x1, s_y1), (s_x2, s_y2), (0, 0, 255), 2, cv2.LINE_AA
+        )
+
+    for person in person_service.get_tracks():
+        x1, y1, x2, y2 = map(int, person["bbox"])
+
+        cv2.rectangle(processed_frame, (x1, y1), (x2, y2), (255, 0, 0), 2, cv2.LINE_AA)
+        cv2.putText(
+            processed_frame,
+            f"#{person['track_id']} {person['conf']:.2f}",
+            (x1, y1 - 5),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.9,
+            (255, 0, 0),
+            2,
+            cv2.LINE_AA,
+        )
+
+    return processed_frame
+
+
+class FrameBroadcaster:
+    """합성한 프레임을 구독 중인 모든 트랙에 공유 (합성 방식은 compose() 에서 정의)
+
+    합성 결과는 시청자들이 요청한 배율(SCALE_LADDER)별로 한 번씩 축소 /
+    인코더 입력 포맷(yuv420p) 변환해 읽기 전용으로 공유하고,
+    트랙마다 VideoFrame 만 따로 만든다. aiortc 인코더가 VideoFrame 의 pict_type 을
+    바꾸기 때문에 VideoFrame 자체는 공유하지 않는다.
+
+    합성은 compose_executor 에서 한 번에 한 프레임만 진행한다
+    (합성이 주기보다 길어지면 밀린 주기는 건너뛰고 overruns 로 센다).
+
+    구독자는 scale 과 get_stats() 를 가진다. scale 이 None 인 구독자(JpegCache 등)는
+    축소 / 변환 결과 없이 합성된 BGR 프레임(next_image)만 쓴다.
+    """
+
+    def __init__(self, cam_id, shape, fps_limit=30):
+        self.cam_id = cam_id
+        self.shape = shape
+        self.fps_limit = fps_limit
+
+        self.subscribers = set()
+        self.seq = 0
+        self.frame = None  # 배율 -> (포맷, 배열)
+        self.image = None  # 합성된 원본 크기 BGR 프레임 (읽기 전용)
+        self._cond = asyncio.Condition()
+        self._task = None
+
+        self.composed = 0
+        self.skipped = 0  # 새 프레임이 없어 건너뛴 주기
+        self.overruns = 0  # 합성이 주기를 넘겨 건너뛴 주기
+        self.failed = 0
+        self.compose_time = 0.0
+
+    def subscribe(self, track):
+        self.subscribers.add(track)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+            logger.info(f"프레임 브로드캐스터 시작 - 카메라: {self.cam_id}")
+
+    def unsubscribe(self, track):
+        self.subscribers.discard(track)
+        if not self.subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+            logger.info(f"프레임 브로드캐스터 중지 - 카메라: {self.cam_id}")
+
+    async def next_frame(self, last_seq):
+        """last_seq 이후 합성된 프레임 (seq, {배율: (포맷, 배열)})"""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.seq > last_seq)
+            return self.seq, self.frame
+
+    async def next_image(self, last_seq):
+        """last_seq 이후 합성된 프레임 (seq, 원본 크기 BGR 배열)"""
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.seq > last_seq)
+            return self.seq, self.image
+
+    def compose(self):
+        """새로 합성한 BGR 프레임 (새 프레임이 없으면 None), compose_executor 에서 호출"""
+        raise NotImplementedError
+
+    def get_stats(self):
+        return {
+            "viewers": len(self.subscribers),
+            "running": self._task is not None,
+            "composed": self.composed,
+            "skipped": self.skipped,
+            "overruns": self.overruns,
+            "failed": self.failed,
+            "avg_compose_ms": (
+                self.compose_time / self.composed * 1000 if self.composed else 0.0
+            ),
+            "peers": [track.get_stats() for track in self.subscribers],
+        }
+
+    def render(self, scales):
+        """합성 + 배율별 축소 / yuv420p 변환 (compose_executor 스레드에서 실행)
+
+        (합성 프레임, {배율: (포맷, 배열)}), 새로 합성한 프레임이 없으면 None
+        """
+        frame = self.compose()
+        if frame is None:
+            return None
+        frame.setflags(write=False)
+
+        scaled = {1.0: frame}
+        variants = {}
+        for scale in scales:
+            image = self._scaled(scaled, scale)
+            h, w = image.shape[:2]
+            if h % 2 == 0 and w % 2 == 0:
+                i420 = cv2.cvtColor(image, cv2.COLOR_BGR2YUV_I420)
+                variants[scale] = ("yuv420p", i420)
+            else:
+                variants[scale] = ("bgr24", image)
+        return frame, variants
+
+    def _scaled(self, scaled, scale):
+        """scale 배율 BGR 프레임 (scaled: 이미 만든 배율별 프레임 캐시)
+
+        2배 관계인 단계가 있으면 그 단계에서 INTER_AREA 로 절반 축소 (1080p 기준 1ms 미만),
+        아니면 원본에서 INTER_LINEAR (INTER_AREA 는 정수배가 아니면 수십 ms)
+        """
+        image = scaled.get(scale)
+        if image is not None:
+            return image
+
+        if scale * 2 in SCALE_LADDER:
+            source, interpolation = self._scaled(scaled, scale * 2), cv2.INTER_AREA
+        else:
+            source, interpolation = scaled[1.0], cv2.INTER_LINEAR
+
+        h, w = self.shape[:2]
+        # yuv420p 는 짝수 크기만 가능
+        size = (max(int(w * scale) // 2 * 2, 2), max(int(h * scale) // 2 * 2, 2))
+        image = cv2.resize(source, size, interpolation=interpolation)
+        scaled[scale] = image
+        return image
+
+    @staticmethod
+    def pick_variant(variants, scale):
+        """요청 배율의 (포맷, 배열), 아직 없으면 (배율이 막 바뀐 경우) 가장 가까운 배율"""
+        variant = variants.get(scale)
+        if variant is None:
+            variant = variants[min(variants, key=lambda s: abs(s - scale))]
+        return variant
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        interval = 1.0 / self.fps_limit
+        next_tick = time.time()
+
+        try:
+            while True:
+                scales = {track.scale for track in self.subscribers} - {None}
+                try:
+                    rendered = await loop.run_in_executor(
+                        compose_executor, self.render, scales
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    self.failed += 1
+                    logger.error(f"프레임 합성 실패 - 카메라: {self.cam_id}, 오류: {e}")
+                    rendered = None
+
+                if rendered is not None:
+                    async with self._cond:
+                        self.image, self.frame = rendered
+                        self.seq += 1
+                        self._cond.notify_all()
+
+                next_tick += interval
+                delay = next_tick - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.overruns += 1
+                    next_tick = time.time()
+                    await asyncio.sleep(0)
+        except asyncio.CancelledError:
+            pass
+
+
+class CameraBroadcaster(FrameBroadcaster):
+    """카메라당 한 번만 프레임을 합성해 구독 중인 모든 트랙에 공유
+
+    움직임 / 이벤트가 없는 동안은 idle_fps 로만 합성한다 (ActivityDetector).
+    """
+
+    def __init__(
+        self, cam_id, arrow_service, person_service, fps_limit=30, idle_fps=IDLE_FPS
+    ):
+        self.shm = get_frame_buffer(cam_id)
+        super().__init__(cam_id, self.shm.shape, fps_limit)
+
+        self.arrow_service = arrow_service
+        self.person_service = person_service
+        self.idle_fps = idle_fps
+        self.activity = ActivityDetector(arrow_service, person_service)
+
+        self.frame_seq = 0  # 마지막으로 합성한 공유 메모리 프레임 번호
+        self.overlay = None  # 과녁 외곽선 (set_target 으로 과녁이 바뀌면 재생성)
+
+        self.gated = 0  # 활동이 없어 건너뛴 프레임
+        self._composed_at = 0.0
+
+    def compose(self):
+        """새 공유 메모리 프레임이 있으면 합성 (없거나 읽는 중 덮어써지면 None)"""
+        latest = self.shm.read_latest(self.frame_seq)
+        if latest is None:
+            self.skipped += 1
+            return None
+        seq, _, frame = latest
+
+        # 활동이 없으면 keep-alive 간격으로만 합성 (움직임 / 이벤트가 생기면 바로 복귀)
+        now = time.monotonic()
+        active = self.activity.update(frame)
+        if not active and now - self._composed_at < 1.0 / self.idle_fps:
+            self.frame_seq = seq
+            self.gated += 1
+            return None
+        self._composed_at = now
+
+        start = time.perf_counter()
+        processed_frame = compose_frame(
+            frame,
+            self.arrow_service,
+            self.person_service,
+            self.target_overlay(frame),
+            draw_arrow=VIDEO_ARROW_OVERLAY,
+        )
+        self.compose_time += time.perf_counter() - start
+
+        # 합성은 뷰를 복사한 뒤 그리므로, 복사 도중 덮어써졌는지만 확인
+        if not self.shm.validate(seq):
+            self.shm.torn += 1
+            return None
+
+        self.frame_seq = seq
+        self.composed += 1
+
+        # 화살 위치 디버그용 추후 서비스 안정화되면 제거
+        self.arrow_service.last_frame = processed_frame
+        return processed_frame
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats.update(
+            gated=self.gated,
+            active=self.activity.is_active(),
+            active_reason=self.activity.reason,
+            motion=self.activity.last_motion,
+            torn=self.shm.torn,
+        )
+        return stats
+
+    def target_overlay(self, frame):
+        geometry = self.arrow_service.geometry
+        if geometry is None:
+            self.overlay = None
+        elif self.overlay is None or not self.overlay.matches(geometry, frame.shape):
+            self.overlay = TargetOverlay(geometry, frame.shape)
+            logger.info(f"과녁 오버레이 생성 - 카메라: {self.cam_id}")
+        return self.overlay
+
+
+_broadcasters = {}
+
+
+def get_broadcaster(cam_id, arrow_service, person_service):
+    if cam_id not in _broadcasters:
+        _broadcasters[cam_id] = CameraBroadcaster(cam_id, arrow_service, person_service)
+    return _broadcasters[cam_id]
+
+
+def get_broadcaster_stats():
+    return {cam_id: b.get_stats() for cam_id, b in _broadcasters.items()}
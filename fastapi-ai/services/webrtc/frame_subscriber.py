@@ -1,49 +1,197 @@
-import zmq.asyncio, cv2, numpy as np, asyncio, msgpack, logging
-
-logger = logging.getLogger(__name__)
-
-
-async def camera_frame_sub(tracks, ports):
-
-    ctx = zmq.asyncio.Context()
-    sub = ctx.socket(zmq.SUB)
-
-    sub.setsockopt(zmq.LINGER, 0)
-    sub.setsockopt(zmq.RCVHWM, 2)
-    sub.setsockopt(zmq.CONFLATE, 1)
-
-    for port in ports:
-        sub.connect(f"tcp://localhost:{port}")
-        logger.info(f"ZMQ 구독 연결: {port}")
-    sub.setsockopt_string(zmq.SUBSCRIBE, "")
-
-    try:
-        while True:
-            data = await sub.recv()
-            msg = msgpack.unpackb(data, raw=False)
-
-            cam_id = msg["cam_id"]
-            jpg = msg["jpeg"]
-            np_arr = np.frombuffer(jpg, dtype=np.uint8)
-            frame = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-
-            for track in list(tracks):
-                try:
-                    await asyncio.wait_for(track.push(frame), timeout=0.1)
-                except asyncio.TimeoutError:
-                    pass
-                except Exception as e:
-                    logger.error(f"트랙 push 실패: {e}", exc_info=True)
-
-    except asyncio.CancelledError:
-        logger.info("ZMQ 구독 작업 취소됨")
-        raise
-    except Exception as e:
-        logger.error(f"ZMQ 구독 오류: {e}", exc_info=True)
-        import traceback
-
-        traceback.print_exc()
-    finally:
-        sub.close()
-        ctx.term()
-        logger.info("ZMQ 구독 정리 완료")
+import asyncio
+import logging
+import threading
+import time
+
+import cv2
+import msgpack
+import numpy as np
+import zmq
+import zmq.asyncio
+
+logger = logging.getLogger("smartbow.webrtc")
+
+PUSH_TIMEOUT_SEC = 0.1
+MAX_DRAIN = 64  # 소켓당 한 번에 비우는 최대 메시지 수
+
+
+class CameraFrame:
+    """수신한 JPEG 한 장 (픽셀이 필요할 때 한 번만 디코딩)"""
+
+    def __init__(self, cam_id, jpeg, received_at):
+        self.cam_id = cam_id
+        self.jpeg = jpeg
+        self.received_at = received_at
+        self._image = None
+        self._lock = threading.Lock()
+
+    @property
+    def decoded(self):
+        return self._image is not None
+
+    def decode(self):
+        with self._lock:
+            if self._image is None:
+                np_arr = np.frombuffer(self.jpeg, dtype=np.uint8)
+                self._image = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+            return self._image
+
+
+class _CameraRoute:
+    def __init__(self, cam_id):
+        self.cam_id = cam_id
+        self.subscribers = set()
+        self.latest = None  # 아직 전달하지 않은 최신 프레임 (카메라 단위 conflate)
+        self.event = asyncio.Event()
+        self.task = None
+
+        self.received = 0
+        self.conflated = 0  # 전달 전에 더 새 프레임으로 대체된 수
+        self.decoded = 0
+        self.delivered = 0
+        self.timeouts = 0
+
+
+class FrameSubscriber:
+    """ZMQ JPEG 프레임을 cam_id 별 구독자에게만 전달
+
+    - 포트마다 SUB 소켓을 따로 두고, 전달 전 밀린 프레임은 카메라 단위로 최신 것만 남김
+      (한 카메라가 바빠도 다른 카메라 프레임이 밀려나지 않음)
+    - 카메라마다 전달 작업이 따로 돌아 느린 구독자가 다른 카메라를 막지 않음
+    - 구독자 중 needs_pixels 가 True 인 것이 있을 때만 JPEG 를 (프레임당 한 번) 디코딩
+
+    구독자: cam_id 별로 등록, async push(CameraFrame) 구현.
+    needs_pixels (기본 True) 가 False 면 CameraFrame.jpeg 만 사용한다는 뜻.
+    """
+
+    def __init__(self, ports, push_timeout=PUSH_TIMEOUT_SEC):
+        self.ports = list(ports)
+        self.push_timeout = push_timeout
+        self.routes = {}  # cam_id -> _CameraRoute
+        self.unrouted = 0  # 구독자가 없어 버린 프레임
+
+    def subscribe(self, cam_id, subscriber):
+        route = self.routes.get(cam_id)
+        if route is None:
+            route = self.routes[cam_id] = _CameraRoute(cam_id)
+        route.subscribers.add(subscriber)
+        if route.task is None or route.task.done():
+            route.task = asyncio.ensure_future(self._deliver(route))
+
+    def unsubscribe(self, cam_id, subscriber):
+        route = self.routes.get(cam_id)
+        if route is None:
+            return
+        route.subscribers.discard(subscriber)
+        if not route.subscribers and route.task is not None:
+            route.task.cancel()
+            route.task = None
+            route.latest = None
+
+    def get_stats(self):
+        return {
+            "unrouted": self.unrouted,
+            "cameras": {
+                cam_id: {
+                    "subscribers": len(route.subscribers),
+                    "received": route.received,
+                    "conflated": route.conflated,
+                    "decoded": route.decoded,
+                    "delivered": route.delivered,
+                    "timeouts": route.timeouts,
+                }
+                for cam_id, route in self.routes.items()
+            },
+        }
+
+    def route(self, data):
+        """수신 메시지 하나를 해당 카메라의 최신 프레임 자리에 넣음"""
+        msg = msgpack.unpackb(data, raw=False)
+        route = self.routes.get(msg["cam_id"])
+        if route is None or not route.subscribers:
+            self.unrouted += 1
+            return
+
+        route.received += 1
+        if route.latest is not None:
+            route.conflated += 1
+        route.latest = CameraFrame(route.cam_id, msg["jpeg"], time.time())
+        route.event.set()
+
+    async def _push(self, route, subscriber, frame):
+        try:
+            await asyncio.wait_for(subscriber.push(frame), timeout=self.push_timeout)
+            route.delivered += 1
+        except asyncio.TimeoutError:
+            route.timeouts += 1
+        except Exception as e:
+            logger.error(
+                f"트랙 push 실패 - 카메라: {route.cam_id}, 오류: {e}", exc_info=True
+            )
+
+    async def _deliver(self, route):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                await route.event.wait()
+                route.event.clear()
+                frame, route.latest = route.latest, None
+                if frame is None:
+                    continue
+
+                subscribers = list(route.subscribers)
+                if any(getattr(s, "needs_pixels", True) for s in subscribers):
+                    # 디코딩은 이벤트 루프 밖에서, 구독자가 몇이든 한 번만
+                    image = await loop.run_in_executor(None, frame.decode)
+                    if image is None:
+                        logger.warning(f"JPEG 디코딩 실패 - 카메라: {route.cam_id}")
+                        continue
+                    route.decoded += 1
+
+                await asyncio.gather(
+                    *(self._push(route, s, frame) for s in subscribers)
+                )
+        except asyncio.CancelledError:
+            pass
+
+    async def run(self):
+        ctx = zmq.asyncio.Context.instance()
+        poller = zmq.asyncio.Poller()
+        sockets = []
+
+        for port in self.ports:
+            sub = ctx.socket(zmq.SUB)
+            sub.setsockopt(zmq.LINGER, 0)
+            sub.setsockopt(zmq.RCVHWM, 2)
+            sub.connect(f"tcp://localhost:{port}")
+            sub.setsockopt_string(zmq.SUBSCRIBE, "")
+            poller.register(sub, zmq.POLLIN)
+            sockets.append(sub)
+            logger.info(f"ZMQ 구독 연결: {port}")
+
+        try:
+            while True:
+                for sub, _ in await poller.poll():
+                    for _ in range(MAX_DRAIN):
+                        try:
+                            data = await sub.recv(zmq.NOBLOCK)
+                        except zmq.Again:
+                            break
+                        try:
+                            self.route(data)
+                        except Exception as e:
+                            logger.error(f"프레임 메시지 처리 실패: {e}")
+
+        except asyncio.CancelledError:
+            logger.info("ZMQ 구독 작업 취소됨")
+            raise
+        except Exception as e:
+            logger.error(f"ZMQ 구독 오류: {e}", exc_info=True)
+        finally:
+            for sub in sockets:
+                sub.close()
+            for route in self.routes.values():
+                if route.task is not None:
+                    route.task.cancel()
+            logger.info("ZMQ 구독 정리 완료")
+
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+
+import cv2
+
+from services.webrtc.broadcaster import compose_executor, get_broadcaster
+
+logger = logging.getLogger("smartbow.webrtc")
+
+JPEG_QUALITY = int(os.getenv("SMARTBOW_MJPEG_QUALITY", "80"))
+MJPEG_MAX_FPS = float(os.getenv("SMARTBOW_MJPEG_MAX_FPS", "10"))
+# 마지막 HTTP 시청자가 떠난 뒤에도 합성을 유지하는 시간 (주기적인 스냅샷 요청 대비)
+JPEG_LINGER_SEC = float(os.getenv("SMARTBOW_MJPEG_LINGER_SEC", "5"))
+
+
+class JpegCache:
+    """카메라 합성 프레임의 JPEG 인코딩 캐시 (합성 프레임 seq 당 최대 한 번 인코딩)
+
+    CameraBroadcaster 의 구독자로 붙어 WebRTC 와 같은 합성 결과를 쓴다.
+    HTTP 시청자가 몇 명이든 인코딩은 max_fps 이하로 한 번씩만 하고,
+    동시에 들어온 요청은 lock 으로 합쳐 같은 결과를 받는다.
+    """
+
+    scale = None  # broadcaster 의 축소 / yuv420p 변환 결과는 필요 없음
+
+    def __init__(
+        self,
+        broadcaster,
+        quality=JPEG_QUALITY,
+        max_fps=MJPEG_MAX_FPS,
+        linger=JPEG_LINGER_SEC,
+    ):
+        self.broadcaster = broadcaster
+        self.quality = quality
+        self.max_fps = max_fps
+        self.linger = linger
+
+        self.seq = 0  # 캐시된 JPEG 의 합성 프레임 번호
+        self.jpeg = None
+        self._encoded_at = 0.0
+        self._lock = asyncio.Lock()
+
+        self.viewers = 0
+        self._release_handle = None
+
+        self.encoded = 0
+        self.served = 0
+        self.encode_time = 0.0
+
+    def get_stats(self):
+        return {
+            "kind": "jpeg",
+            "viewers": self.viewers,
+            "quality": self.quality,
+            "max_fps": self.max_fps,
+            "encoded": self.encoded,
+            "served": self.served,
+            "avg_encode_ms": (
+                self.encode_time / self.encoded * 1000 if self.encoded else 0.0
+            ),
+        }
+
+    def acquire(self):
+        self.viewers += 1
+        if self._release_handle is not None:
+            self._release_handle.cancel()
+            self._release_handle = None
+
+        if self not in self.broadcaster.subscribers:
+            # 구독이 끊겨 있던 동안의 캐시는 오래됐으므로 다음 합성 프레임부터 사용
+            self.jpeg = None
+            self.seq = self.broadcaster.seq
+            self.broadcaster.subscribe(self)
+
+    def release(self):
+        self.viewers -= 1
+        if self.viewers == 0:
+            loop = asyncio.get_running_loop()
+            self._release_handle = loop.call_later(self.linger, self._unsubscribe)
+
+    def _unsubscribe(self):
+        self._release_handle = None
+        if self.viewers == 0:
+            self.broadcaster.unsubscribe(self)
+
+    @asynccontextmanager
+    async def viewer(self):
+        self.acquire()
+        try:
+            yield self
+        finally:
+            self.release()
+
+    def _encode(self, image):
+        start = time.perf_counter()
+        ok, buf = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise RuntimeError("JPEG 인코딩 실패")
+        self.encode_time += time.perf_counter() - start
+        self.encoded += 1
+        return buf.tobytes()
+
+    async def get(self, last_seq=0):
+        """last_seq 이후 프레임의 (seq, JPEG bytes) (viewer() 안에서 호출)
+
+        max_fps 주기 안에 인코딩한 게 있거나 더 새 합성 프레임이 없으면 캐시를 그대로 주고,
+        아니면 다음 합성 프레임을 한 번만 인코딩한다.
+        """
+        async with self._lock:
+            if self.jpeg is not None and self.seq > last_seq:
+                fresh = time.monotonic() - self._encoded_at < 1.0 / self.max_fps
+                if fresh or self.broadcaster.seq <= self.seq:
+                    self.served += 1
+                    return self.seq, self.jpeg
+
+            seq, image = await self.broadcaster.next_image(max(last_seq, self.seq))
+            loop = asyncio.get_running_loop()
+            jpeg = await loop.run_in_executor(compose_executor, self._encode, image)
+
+            self.seq, self.jpeg, self._encoded_at = seq, jpeg, time.monotonic()
+            self.served += 1
+            return seq, jpeg
+
+    async def snapshot(self, timeout):
+        """현재 프레임 한 장 (seq, JPEG bytes), timeout 안에 프레임이 없으면 TimeoutError"""
+        async with self.viewer():
+            return await asyncio.wait_for(self.get(), timeout)
+
+    async def frames(self, fps=None):
+        """MJPEG 용 JPEG 프레임 스트림 (fps 는 max_fps 이하로 제한)"""
+        fps = min(fps or self.max_fps, self.max_fps)
+        interval = 1.0 / fps
+
+        async with self.viewer():
+            last_seq = 0
+            while True:
+                started = time.monotonic()
+                last_seq, jpeg = await self.get(last_seq)
+                yield jpeg
+
+                delay = interval - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+
+
+_caches = {}
+
+
+def get_jpeg_cache(cam_id, arrow_service, person_service):
+    if cam_id not in _caches:
+        broadcaster = get_broadcaster(cam_id, arrow_service, person_service)
+        _caches[cam_id] = JpegCache(broadcaster)
+    return _caches[cam_id]
+
+
+def get_jpeg_cache_stats():
+    return {cam_id: cache.get_stats() for cam_id, cache in _caches.items()}
@@ -0,0 +1,207 @@
+import logging
+import math
+import os
+import time
+
+import cv2
+import numpy as np
+
+from services.frame.shm_registry import get_frame_buffer
+from services.webrtc.broadcaster import FrameBroadcaster
+
+logger = logging.getLogger("smartbow.webrtc")
+
+MOSAIC_WIDTH = int(os.getenv("SMARTBOW_MOSAIC_WIDTH", "1920"))
+MOSAIC_FPS = float(os.getenv("SMARTBOW_MOSAIC_FPS", "15"))
+MOSAIC_MAX_CAMERAS = int(os.getenv("SMARTBOW_MOSAIC_MAX_CAMERAS", "16"))
+MOSAIC_RETRY_SEC = 1.0  # 아직 열리지 않은 프레임 버퍼 재시도 간격
+DEFAULT_SHAPE = (1080, 1920, 3)
+LABEL_COLOR = (255, 255, 255)
+
+
+class MosaicLayout:
+    """카메라별 타일 위치 (그리드 / 종횡비 유지 / 짝수 크기)
+
+    카메라 목록과 프레임 크기로 한 번만 계산해 재사용한다.
+    tiles: (cam_id, x, y, width, height), 캔버스 좌표
+    """
+
+    def __init__(self, cam_ids, shapes, width=MOSAIC_WIDTH):
+        count = max(len(cam_ids), 1)
+        cols = math.ceil(math.sqrt(count))
+        rows = math.ceil(count / cols)
+
+        known = [shape for shape in shapes if shape is not None]
+        ref_h, ref_w = (known[0] if known else DEFAULT_SHAPE)[:2]
+        cell_w = max(width // cols // 2 * 2, 2)
+        cell_h = max(int(cell_w * ref_h / ref_w) // 2 * 2, 2)
+        self.cell_size = (cell_w, cell_h)
+        self.shape = (rows * cell_h, cols * cell_w, 3)
+
+        self.tiles = []
+        for i, (cam_id, shape) in enumerate(zip(cam_ids, shapes)):
+            row, col = divmod(i, cols)
+            h, w = (shape or (ref_h, ref_w))[:2]
+            scale = min(cell_w / w, cell_h / h)
+            tile_w = max(int(w * scale) // 2 * 2, 2)
+            tile_h = max(int(h * scale) // 2 * 2, 2)
+            x = col * cell_w + (cell_w - tile_w) // 2
+            y = row * cell_h + (cell_h - tile_h) // 2
+            self.tiles.append((cam_id, x, y, tile_w, tile_h))
+
+    def to_dict(self):
+        height, width = self.shape[:2]
+        return {
+            "width": width,
+            "height": height,
+            "tiles": [
+                {"cam_id": cam_id, "x": x, "y": y, "width": w, "height": h}
+                for cam_id, x, y, w, h in self.tiles
+            ],
+        }
+
+
+def downscale(frame, size):
+    """size (w, h) 로 축소: 2배 이상 클 동안 INTER_AREA 로 절반씩, 마지막은 INTER_LINEAR
+
+    INTER_AREA 로 정수배가 아닌 크기에 바로 맞추면 1080p 기준 6~12ms,
+    절반 축소를 이어 붙이면 2ms 안쪽에 비슷한 화질
+    """
+    w, h = size
+    while frame.shape[1] >= w * 2 and frame.shape[0] >= h * 2:
+        half = (frame.shape[1] // 2, frame.shape[0] // 2)
+        frame = cv2.resize(frame, half, interpolation=cv2.INTER_AREA)
+    if frame.shape[1] == w and frame.shape[0] == h:
+        return frame
+    return cv2.resize(frame, size, interpolation=cv2.INTER_LINEAR)
+
+
+class MosaicBroadcaster(FrameBroadcaster):
+    """여러 카메라 프레임을 한 화면(그리드)으로 합성해 트랙 하나로 공유
+
+    카메라마다 새 공유 메모리 프레임이 들어온 타일만 다시 축소해 캔버스에 덮어쓰고,
+    캔버스 복사본을 내보낸다. 오버레이는 그리지 않는다 (개요 화면용, 타일 클릭 시
+    카메라별 스트림으로 전환).
+    """
+
+    def __init__(self, cam_ids, fps_limit=MOSAIC_FPS, width=MOSAIC_WIDTH):
+        self.cam_ids = list(cam_ids)
+        self.buffers = {cam_id: self._open(cam_id) for cam_id in self.cam_ids}
+        self.layout = MosaicLayout(
+            self.cam_ids, [_shape(buffer) for buffer in self.buffers.values()], width
+        )
+        super().__init__("mosaic", self.layout.shape, fps_limit)
+
+        self.canvas = np.zeros(self.layout.shape, dtype=np.uint8)
+        self.tile_seq = dict.fromkeys(self.cam_ids, 0)
+        self._retry_at = 0.0
+
+        self.tiles_updated = 0
+        self.torn = 0
+
+    @staticmethod
+    def _open(cam_id, log=logger.warning):
+        try:
+            return get_frame_buffer(cam_id)
+        except (FileNotFoundError, ValueError) as e:
+            log(f"모자이크 프레임 버퍼 없음 - 카메라: {cam_id}, 오류: {e}")
+            return None
+
+    def _reopen_missing(self):
+        now = time.monotonic()
+        if now < self._retry_at:
+            return
+        self._retry_at = now + MOSAIC_RETRY_SEC
+        for cam_id, buffer in self.buffers.items():
+            if buffer is None:
+                self.buffers[cam_id] = self._open(cam_id, log=logger.debug)
+
+    def compose(self):
+        """새 프레임이 들어온 타일을 갱신한 캔버스 복사본 (갱신된 타일이 없으면 None)"""
+        start = time.perf_counter()
+        if None in self.buffers.values():
+            self._reopen_missing()
+
+        updated = 0
+        for cam_id, x, y, w, h in self.layout.tiles:
+            buffer = self.buffers[cam_id]
+            if buffer is None:
+                continue
+            latest = buffer.read_latest(self.tile_seq[cam_id])
+            if latest is None:
+                continue
+            seq, _, frame = latest
+
+            tile = downscale(frame, (w, h))
+            if tile is frame:
+                tile = frame.copy()  # 축소가 필요 없으면 공유 메모리 뷰 그대로라 복사
+            if not buffer.validate(seq):
+                self.torn += 1
+                continue
+
+            roi = self.canvas[y : y + h, x : x + w]
+            roi[:] = tile
+            cv2.putText(
+                roi, cam_id, (8, 24), cv2.FONT_HERSHEY_SIMPLEX, 0.6, LABEL_COLOR, 1
+            )
+            self.tile_seq[cam_id] = seq
+            updated += 1
+
+        if not updated:
+            self.skipped += 1
+            return None
+
+        self.tiles_updated += updated
+        self.composed += 1
+        frame = self.canvas.copy()
+        self.compose_time += time.perf_counter() - start
+        return frame
+
+    def get_stats(self):
+        stats = super().get_stats()
+        stats.update(
+            cameras=self.cam_ids,
+            missing=[cam_id for cam_id, b in self.buffers.items() if b is None],
+            tiles_updated=self.tiles_updated,
+            torn=self.torn,
+        )
+        return stats
+
+    def unsubscribe(self, track):
+        super().unsubscribe(track)
+        # 마지막 시청자가 나가면 캐시에서 제거 (카메라 조합마다 캔버스가 남지 않게)
+        key = tuple(self.cam_ids)
+        if not self.subscribers and _mosaics.get(key) is self:
+            del _mosaics[key]
+            logger.info(f"모자이크 제거 - 카메라: {','.join(key)}")
+
+
+def _shape(buffer):
+    return buffer.shape if buffer else None
+
+
+_mosaics = {}  # 카메라 조합 -> 시청자가 있는 MosaicBroadcaster
+
+
+def get_mosaic(cam_ids):
+    """cam_ids 조합의 MosaicBroadcaster (호출 측에서 검증 / 정규화한 목록)
+
+    만든 직후 트랙이 구독해야 하며, 마지막 구독자가 나가면 캐시에서 빠진다.
+    """
+    key = tuple(cam_ids)
+    if key not in _mosaics:
+        _mosaics[key] = MosaicBroadcaster(key)
+    return _mosaics[key]
+
+
+def get_mosaic_layout(cam_ids, width=MOSAIC_WIDTH):
+    """cam_ids 조합의 타일 배치 (이미 있는 모자이크면 그 배치, 없으면 캐시 없이 계산)"""
+    mosaic = _mosaics.get(tuple(cam_ids))
+    if mosaic is not None:
+        return mosaic.layout
+    shapes = [_shape(MosaicBroadcaster._open(cam_id, logger.debug)) for cam_id in cam_ids]
+    return MosaicLayout(cam_ids, shapes, width)
+
+
+def get_mosaic_stats():
+    return {",".join(key): m.get_stats() for key, m in _mosaics.items()}
@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+
+TARGET_COLOR = (0, 255, 255)  # 노란색
+TARGET_THICKNESS = 2
+
+
+class TargetOverlay:
+    """과녁 외곽선 그리기 준비물 (set_target 으로 과녁이 바뀔 때만 다시 생성)
+
+    꼭짓점 몇 개짜리 외곽선은 미리 그린 알파 레이어를 합성하는 것보다
+    cv2.polylines 로 직접 그리는 쪽이 빠르다 (scripts/bench_overlay.py).
+    그래서 레이어 대신 int32 좌표 배열과 클리핑 여부만 미리 계산해 둔다.
+    """
+
+    def __init__(
+        self, geometry, frame_shape, color=TARGET_COLOR, thickness=TARGET_THICKNESS
+    ):
+        self.geometry = geometry
+        self.frame_shape = tuple(frame_shape[:2])
+        self.color = color
+        self.thickness = thickness
+
+        pts = np.ascontiguousarray(geometry.points, dtype=np.int32).reshape(-1, 1, 2)
+        pts.setflags(write=False)
+        self.pts = [pts]
+
+        # 외곽선이 프레임과 겹치지 않으면 그리지 않음
+        h, w = self.frame_shape
+        min_x, min_y, max_x, max_y = geometry.bbox
+        pad = thickness + 1
+        self.visible = (
+            max_x + pad >= 0
+            and max_y + pad >= 0
+            and min_x - pad < w
+            and min_y - pad < h
+        )
+
+    def matches(self, geometry, frame_shape):
+        return geometry is self.geometry and tuple(frame_shape[:2]) == self.frame_shape
+
+    def apply(self, frame):
+        """frame (BGR) 에 외곽선을 제자리로 그림"""
+        if self.visible:
+            cv2.polylines(
+                frame, self.pts, True, self.color, self.thickness, cv2.LINE_AA
+            )
+        return frame
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+
+logger = logging.getLogger("smartbow.webrtc")
+
+MAX_PEERS = int(os.getenv("SMARTBOW_WEBRTC_MAX_PEERS", "32"))
+MAX_PEERS_PER_CAMERA = int(os.getenv("SMARTBOW_WEBRTC_MAX_PEERS_PER_CAMERA", "8"))
+# 연결되지 않은 상태(new / connecting / disconnected)로 이만큼 지나면 정리
+CONNECT_TIMEOUT_SEC = float(os.getenv("SMARTBOW_WEBRTC_CONNECT_TIMEOUT_SEC", "20"))
+# 연결된 상태에서 수신측 RTCP 리포트가 이만큼 없으면 정리 (브라우저가 반쯤 죽은 경우)
+RTCP_TIMEOUT_SEC = float(os.getenv("SMARTBOW_WEBRTC_RTCP_TIMEOUT_SEC", "15"))
+REAP_INTERVAL_SEC = float(os.getenv("SMARTBOW_WEBRTC_REAP_INTERVAL_SEC", "5"))
+RETRY_AFTER_SEC = 10  # 503 응답의 Retry-After
+
+
+class Peer:
+    def __init__(self, pc, label, clock):
+        self.pc = pc
+        self.label = label  # cam_id 또는 "mosaic"
+        self.track = None
+        self.created_at = clock()
+        self.state = pc.connectionState
+        self.state_at = self.created_at  # 마지막 연결 상태 변경 시각
+        self.connected_at = None
+
+    def get_stats(self, now):
+        stats = {
+            "label": self.label,
+            "state": self.state,
+            "age_sec": round(now - self.created_at, 1),
+        }
+        track = self.track
+        if track is not None:
+            stats.update(track.get_stats())
+            adapter = track.adapter
+            if adapter is not None:
+                stats.update(
+                    bytes_sent=adapter.bytes_sent,
+                    packets_sent=adapter.packets_sent,
+                    rtcp_age_sec=(
+                        round(now - adapter.rtcp_at, 1) if adapter.rtcp_at else None
+                    ),
+                )
+        return stats
+
+
+class PeerRegistry:
+    """PeerConnection 입장 제한 / 정리 / 피어별 통계
+
+    - 전체 / 카메라(label)별 최대 피어 수를 넘으면 reject_reason() 이 사유를 돌려줌
+      (아직 연결되지 않은 피어도 자리를 차지하므로 한꺼번에 몰려도 인코더 수가 제한됨)
+    - 연결되지 않은 채 connect_timeout 이 지나거나, 연결된 뒤 RTCP 리포트가
+      rtcp_timeout 동안 없으면 reaper 가 닫는다 (RTCP 시각은 PeerAdapter 가 기록)
+    """
+
+    def __init__(
+        self,
+        max_peers=MAX_PEERS,
+        max_per_camera=MAX_PEERS_PER_CAMERA,
+        connect_timeout=CONNECT_TIMEOUT_SEC,
+        rtcp_timeout=RTCP_TIMEOUT_SEC,
+        interval=REAP_INTERVAL_SEC,
+        clock=time.time,
+    ):
+        self.max_peers = max_peers
+        self.max_per_camera = max_per_camera
+        self.connect_timeout = connect_timeout
+        self.rtcp_timeout = rtcp_timeout
+        self.interval = interval
+        self.clock = clock
+
+        self.peers = {}  # pc -> Peer
+        self.rejected = Counter()
+        self.reaped = Counter()
+        self._task = None
+
+    def __len__(self):
+        return len(self.peers)
+
+    def count(self, label):
+        return sum(1 for peer in self.peers.values() if peer.label == label)
+
+    def reject_reason(self, label):
+        """새 피어를 받을 수 없으면 사유 문자열, 받을 수 있으면 None"""
+        if len(self.peers) >= self.max_peers:
+            self.rejected["total"] += 1
+            return f"Too many viewers ({len(self.peers)}/{self.max_peers})"
+
+        count = self.count(label)
+        if count >= self.max_per_camera:
+            self.rejected["camera"] += 1
+            return f"Too many viewers for {label} ({count}/{self.max_per_camera})"
+        return None
+
+    def add(self, pc, label):
+        peer = self.peers[pc] = Peer(pc, label, self.clock)
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+        return peer
+
+    def update_state(self, pc):
+        peer = self.peers.get(pc)
+        if peer is None:
+            return
+        peer.state = pc.connectionState
+        peer.state_at = self.clock()
+        if peer.state == "connected" and peer.connected_at is None:
+            peer.connected_at = peer.state_at
+
+    async def close(self, pc):
+        self.peers.pop(pc, None)
+        # 송신 트랙을 멈춰야 카메라 브로드캐스터 구독이 해제됨
+        for sender in pc.getSenders():
+            if sender.track is not None:
+                sender.track.stop()
+        await pc.close()
+
+    async def close_all(self):
+        pcs = list(self.peers)
+        await asyncio.gather(*(self.close(pc) for pc in pcs), return_exceptions=True)
+
+    def stale_reason(self, peer, now):
+        """정리할 피어면 사유, 아니면 None"""
+        if peer.state != "connected":
+            if now - peer.state_at > self.connect_timeout:
+                return "not_connected"
+            return None
+
+        adapter = peer.track.adapter if peer.track is not None else None
+        last_rtcp = adapter.rtcp_at if adapter is not None else None
+        if now - max(last_rtcp or 0.0, peer.connected_at) > self.rtcp_timeout:
+            return "no_rtcp"
+        return None
+
+    async def reap(self):
+        now = self.clock()
+        stale = []
+        for peer in list(self.peers.values()):
+            reason = self.stale_reason(peer, now)
+            if reason is not None:
+                stale.append((peer, reason))
+
+        for peer, reason in stale:
+            self.reaped[reason] += 1
+            logger.info(
+                f"PeerConnection 정리 - 카메라: {peer.label}, 사유: {reason}, "
+                f"상태: {peer.state}"
+            )
+            try:
+                await self.close(peer.pc)
+            except Exception as e:
+                logger.error(
+                    f"PeerConnection 정리 실패 - 카메라: {peer.label}, 오류: {e}"
+                )
+        return len(stale)
+
+    async def _run(self):
+        try:
+            while self.peers:
+                await asyncio.sleep(self.interval)
+                await self.reap()
+        except asyncio.CancelledError:
+            pass
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.close_all()
+
+    def get_stats(self):
+        now = self.clock()
+        return {
+            "count": len(self.peers),
+            "max_peers": self.max_peers,
+            "max_per_camera": self.max_per_camera,
+            "per_camera": dict(Counter(p.label for p in self.peers.values())),
+            "rejected": dict(self.rejected),
+            "reaped": dict(self.reaped),
+            "peers": [peer.get_stats(now) for peer in self.peers.values()],
+        }
+
+
+peer_registry = PeerRegistry()
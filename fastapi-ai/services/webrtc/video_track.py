@@ -1,98 +1,110 @@
 import asyncio
 import time
 
-import cv2
-import numpy as np
 from aiortc import VideoStreamTrack
+from aiortc.mediastreams import VIDEO_CLOCK_RATE, VIDEO_TIME_BASE, MediaStreamError
 from av import VideoFrame
 
-from services.frame.shm_registry import get_frame_buffer
+from services.webrtc.broadcaster import compose_executor, get_broadcaster
 
 
-class CameraVideoTrack(VideoStreamTrack):
-    def __init__(self, cam_id: str, shape, arrow_service, person_service, fps_limit=30):
+class BroadcastVideoTrack(VideoStreamTrack):
+    """FrameBroadcaster 가 합성한 프레임을 보내는 트랙 (시청자 한 명분)"""
+
+    def __init__(self, cam_id: str, broadcaster):
         super().__init__()
         self.cam_id = cam_id
-        self.shape = shape
-        self.arrow_service = arrow_service
-        self.person_service = person_service
 
-        self.last_frame_time = 0
-        self.fps_limit = fps_limit
+        self.broadcaster = broadcaster
+        self.shape = self.broadcaster.shape
+        self.frame_size = (self.shape[1], self.shape[0])
+        self.last_seq = 0
+
+        # PeerAdapter 가 조정 (배율은 broadcaster 가 공유하는 축소 단계 중 하나)
+        self.scale = 1.0
+        self.fps = self.broadcaster.fps_limit
+        self.adapter = None
+
+        self.sent = 0
+        self.late = 0  # 송신 루프가 늦어 받지 못한 합성 프레임 수
+        self._last_sent = 0.0
+        # recv 반환부터 다음 recv 호출까지 = 송신측 인코딩 + 패킷화 / 송신 시간
+        self.encode_time = 0.0
+        self._returned_at = None
+
+        self.broadcaster.subscribe(self)
+
+    def set_quality(self, scale, fps):
+        self.scale = scale
+        self.fps = fps
+
+    def get_stats(self):
+        stats = {
+            "scale": self.scale,
+            "fps": self.fps,
+            "sent": self.sent,
+            "late": self.late,
+            "avg_encode_ms": (
+                self.encode_time / self.sent * 1000 if self.sent else 0.0
+            ),
+        }
+        if self.adapter is not None:
+            stats.update(step=self.adapter.step, sample=self.adapter.last_sample)
+        return stats
+
+    async def next_timestamp(self):
+        # fps 가 바뀔 수 있으므로 고정 1/30 초 간격 대신 실제 경과 시간으로 pts 계산
+        if self.readyState != "live":
+            raise MediaStreamError
 
-        self.shm = get_frame_buffer(cam_id, shape)
+        now = time.time()
+        if hasattr(self, "_timestamp"):
+            pts = int((now - self._start) * VIDEO_CLOCK_RATE)
+            self._timestamp = max(pts, self._timestamp + 1)
+        else:
+            self._start = now
+            self._timestamp = 0
+        return self._timestamp, VIDEO_TIME_BASE
 
     async def recv(self):
-        now = time.time()
-        elapsed = now - self.last_frame_time
-        target_delay = 1.0 / self.fps_limit
-
-        if elapsed < target_delay:
-            await asyncio.sleep(target_delay - elapsed)
-
-        self.last_frame_time = time.time()
-
-        frame = self.shm.read()
-        if frame is None:
-            raise asyncio.TimeoutError
-
-        processed_frame = frame.copy()
-
-        # 화살 위치 디버그용 추후 서비스 안정화되면 제거
-        self.arrow_service.last_frame = processed_frame
-        curr = self.arrow_service.current_arrow
-        if curr:
-            t1 = tuple(map(int, curr["tail"]))
-            t2 = tuple(map(int, curr["tip"]))
-
-            cv2.line(processed_frame, t1, t2, (0, 255, 0), 2, cv2.LINE_AA)
-
-        splash = self.arrow_service.current_splash
-
-        if splash:
-            s_x1, s_y1, s_x2, s_y2 = map(int, splash)
-            cv2.rectangle(
-                processed_frame, (s_x1, s_y1), (s_x2, s_y2), (0, 0, 255), 2, cv2.LINE_AA
-            )
-
-        person = self.person_service.get_detection()
-
-        target = self.arrow_service.target
-
-        if target is not None:
-            # target: np.ndarray shape (4, 2) or list[[x,y],...]
-            pts = np.array(target, dtype=np.int32).reshape((-1, 1, 2))
-
-            # 외곽선
-            cv2.polylines(
-                processed_frame,
-                [pts],
-                isClosed=True,
-                color=(0, 255, 255),  # 노란색
-                thickness=2,
-                lineType=cv2.LINE_AA,
-            )
-
-        if person:
-            x1, y1, x2, y2 = map(int, person["bbox"])
-
-            cv2.rectangle(
-                processed_frame, (x1, y1), (x2, y2), (255, 0, 0), 2, cv2.LINE_AA
-            )
-            cv2.putText(
-                processed_frame,
-                f"{person['conf']:.2f}",
-                (x1, y1 - 5),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.9,
-                (255, 0, 0),
-                2,
-                cv2.LINE_AA,
-            )
-
-        # 오탐영역 확인
-        # cv2.rectangle(processed_frame, (640, 280), (700, 410), (0, 0, 255), 2)
-
-        av_frame = VideoFrame.from_ndarray(processed_frame, format="bgr24")
+        if self._returned_at is not None:
+            self.encode_time += time.perf_counter() - self._returned_at
+            self._returned_at = None
+
+        # 합성은 카메라당 한 번 (CameraBroadcaster), 트랙은 새 프레임만 받아 감
+        # 목표 fps 보다 빨리 들어온 프레임은 건너뜀 (10% 여유)
+        while True:
+            seq, variants = await self.broadcaster.next_frame(self.last_seq)
+            if self.last_seq:
+                self.late += max(seq - self.last_seq - 1, 0)
+            self.last_seq = seq
+
+            # 이 트랙이 구독하기 전에 시작된 합성이면 축소 / 변환 결과가 없을 수 있음
+            if variants and time.monotonic() - self._last_sent >= 0.9 / self.fps:
+                break
+        self._last_sent = time.monotonic()
+
+        # 인코더용 색공간 변환 / 축소도 카메라당 한 번 (배율별 공유)
+        # VideoFrame 생성(평면 복사)도 이벤트 루프 밖에서
+        fmt, array = self.broadcaster.pick_variant(variants, self.scale)
+        loop = asyncio.get_running_loop()
+        av_frame = await loop.run_in_executor(
+            compose_executor, VideoFrame.from_ndarray, array, fmt
+        )
         av_frame.pts, av_frame.time_base = await self.next_timestamp()
+        self.sent += 1
+        self._returned_at = time.perf_counter()
         return av_frame
+
+    def stop(self):
+        if self.adapter is not None:
+            self.adapter.stop()
+        self.broadcaster.unsubscribe(self)
+        super().stop()
+
+
+class CameraVideoTrack(BroadcastVideoTrack):
+    def __init__(self, cam_id: str, arrow_service, person_service):
+        super().__init__(
+            cam_id, get_broadcaster(cam_id, arrow_service, person_service)
+        )
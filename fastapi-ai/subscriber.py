@@ -1,31 +1,182 @@
+import logging
 import threading
+from collections import defaultdict
 
 import zmq
+from utils.event_codec import decode_frames
 
+logger = logging.getLogger("smartbow.ingest")
 
-def start_subscriber_thread(ipc_name, cam_id, callback):
-    def run():
-        ctx = zmq.Context()
-        socket = ctx.socket(zmq.SUB)
+BURST_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
 
-        ipc_path = f"ipc:///tmp/{ipc_name}.ipc"
 
+class IngestStats:
+    """소켓별 수신 적체량 / 버스트 크기 통계"""
+
+    def __init__(self, cam_id, ipc_name):
+        self.cam_id = cam_id
+        self.ipc_name = ipc_name
+        self.queue_depth = 0  # 마지막 수신 시 한번에 비운 메시지 수
+        self.max_queue_depth = 0
+        self.messages = 0
+        self.events = 0
+        self.burst_hist = [0] * (len(BURST_BUCKETS) + 1)
+
+    def record(self, num_messages, num_events):
+        self.queue_depth = num_messages
+        self.max_queue_depth = max(self.max_queue_depth, num_messages)
+        self.messages += num_messages
+        self.events += num_events
+
+        for i, bound in enumerate(BURST_BUCKETS):
+            if num_events <= bound:
+                self.burst_hist[i] += 1
+                return
+        self.burst_hist[-1] += 1
+
+    def to_dict(self):
+        labels = [f"<={b}" for b in BURST_BUCKETS] + [f">{BURST_BUCKETS[-1]}"]
+        return {
+            "cam_id": self.cam_id,
+            "ipc_name": self.ipc_name,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "messages": self.messages,
+            "events": self.events,
+            "burst_hist": dict(zip(labels, self.burst_hist)),
+        }
+
+
+class IngestEngine:
+    """모든 추론 IPC 소켓을 하나의 Poller 스레드로 수신하는 엔진"""
+
+    def __init__(self, poll_timeout_ms=500, max_drain=1024):
+        self.ctx = zmq.Context.instance()
+        self.poll_timeout_ms = poll_timeout_ms
+        self.max_drain = max_drain  # 한 소켓을 비울 때 최대 메시지 수 (다른 소켓 기아 방지)
+
+        self.poller = zmq.Poller()
+        self.routes = {}  # socket -> (cam_id, callback, stats)
+        self.stats = {}  # ipc_name -> IngestStats
+
+        self._pending = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def subscribe(self, ipc_name, cam_id, callback):
+        """callback(cam_id, events): 한 번의 수신에서 비운 이벤트 묶음을 전달"""
+        socket = self.ctx.socket(zmq.SUB)
+        socket.setsockopt(zmq.LINGER, 0)
+
+        ipc_path = f"ipc:///tmp/{ipc_name}.ipc"
         try:
             socket.connect(ipc_path)
             socket.subscribe("")
-            print(f"[SUB] Connected (IPC) → cam={cam_id}, path={ipc_path}")
-        except Exception as e:
-            print(f"[SUB] Connection Failed({cam_id}): {e}")
-            return
+        except Exception:
+            socket.close()
+            raise
+
+        stats = IngestStats(cam_id, ipc_name)
+        self.stats[ipc_name] = stats
+
+        # 실행 중에 추가되는 소켓은 수신 스레드에서 Poller 에 등록
+        with self._lock:
+            self._pending.append((socket, cam_id, callback, stats))
+
+        logger.info(f"[SUB] Connected (IPC) → cam={cam_id}, path={ipc_path}")
+        return socket
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
 
-        while True:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+        # 등록 전(수신 스레드가 아직 Poller 에 넣지 않은) 소켓도 닫음
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for socket, _, _, _ in pending:
+            socket.close()
+
+    def _register_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        for socket, cam_id, callback, stats in pending:
+            self.poller.register(socket, zmq.POLLIN)
+            self.routes[socket] = (cam_id, callback, stats)
+
+    def get_stats(self):
+        return [stats.to_dict() for stats in list(self.stats.values())]
+
+    def _drain(self, socket, cam_id):
+        """대기 중인 메시지를 논블로킹으로 모두 읽어 이벤트 목록으로 반환"""
+        events = []
+        num_messages = 0
+
+        while num_messages < self.max_drain:
             try:
-                event = socket.recv_json()
+                frames = socket.recv_multipart(zmq.NOBLOCK)
+            except zmq.Again:
+                break
+            num_messages += 1
 
-                callback(cam_id, event)
+            try:
+                events.extend(decode_frames(frames))
             except Exception as e:
-                print(f"[SUB] Error({cam_id}):", e)
+                logger.error(f"[SUB] 디코딩 오류({cam_id}): {e}")
+
+        return num_messages, events
+
+    def _run(self):
+        logger.info("이벤트 수신 스레드 시작")
+
+        try:
+            while not self._stop.is_set():
+                self._register_pending()
+
+                try:
+                    ready = self.poller.poll(self.poll_timeout_ms)
+                except zmq.ZMQError as e:
+                    logger.error(f"[SUB] Poll 오류: {e}")
+                    continue
+
+                # 소켓별로 쌓인 메시지를 모두 비운 뒤 카메라 단위로 한번에 전달
+                batches = defaultdict(list)
+                for socket, _ in ready:
+                    cam_id, callback, stats = self.routes[socket]
+                    try:
+                        num_messages, events = self._drain(socket, cam_id)
+                    except Exception as e:
+                        logger.error(f"[SUB] 수신 오류({cam_id}): {e}")
+                        continue
+
+                    if num_messages:
+                        stats.record(num_messages, len(events))
+                    if events:
+                        batches[(cam_id, callback)].extend(events)
+
+                for (cam_id, callback), events in batches.items():
+                    try:
+                        callback(cam_id, events)
+                    except Exception as e:
+                        logger.error(f"[SUB] 콜백 오류({cam_id}): {e}", exc_info=True)
+        finally:
+            for socket in list(self.routes):
+                self.poller.unregister(socket)
+                socket.close()
+            self.routes.clear()
+            logger.info("이벤트 수신 스레드 종료")
+
 
-    thread = threading.Thread(target=run, daemon=True)
-    thread.start()
-    return thread
+ingest_engine = IngestEngine()
@@ -0,0 +1,33 @@
+import json
+
+import msgpack
+
+# 추론 이벤트 전송 포맷
+#   JSON    : [json 객체]                       (기존 포맷, 단일 프레임)
+#   MSGPACK : [MSGPACK_HEADER, 이벤트, 이벤트, ...] (멀티파트, 프레임당 이벤트 1개)
+MSGPACK_HEADER = b"SBMP1"
+
+WIRE_JSON = "json"
+WIRE_MSGPACK = "msgpack"
+SUPPORTED_FORMATS = [WIRE_MSGPACK, WIRE_JSON]
+
+
+def encode_events(events, wire_format=WIRE_MSGPACK):
+    """이벤트 목록을 send_multipart 로 보낼 메시지 목록으로 변환"""
+    if wire_format == WIRE_MSGPACK:
+        frames = [msgpack.packb(e, use_bin_type=True) for e in events]
+        return [[MSGPACK_HEADER] + frames]
+
+    if wire_format == WIRE_JSON:
+        # JSON 포맷은 묶음 전송이 없어 이벤트마다 한 메시지
+        return [[json.dumps(e).encode("utf-8")] for e in events]
+
+    raise ValueError(f"Unknown wire format: {wire_format}")
+
+
+def decode_frames(frames):
+    """수신한 멀티파트 프레임을 이벤트 목록으로 변환"""
+    if frames[0] == MSGPACK_HEADER:
+        return [msgpack.unpackb(f, raw=False) for f in frames[1:]]
+
+    return [json.loads(f) for f in frames]
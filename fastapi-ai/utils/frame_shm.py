@@ -1,41 +1,188 @@
+import time
 from multiprocessing import shared_memory
 
 import numpy as np
 
+# 공유 메모리 레이아웃
+#   [헤더 64B][슬롯 테이블 N x 16B][패딩][슬롯 0 프레임][슬롯 1 프레임]...
+# 생산자는 슬롯을 돌아가며 쓰고 (seqlock), 소비자는 최신 완성 프레임을 복사 없이 읽는다.
+FRAME_MAGIC = b"SBFB"
+FRAME_VERSION = 1
+FRAME_SLOTS = 3
+MAX_NDIM = 4
+
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S4"),
+        ("version", "<u4"),
+        ("slots", "<u4"),
+        ("ndim", "<u4"),
+        ("shape", "<u4", (MAX_NDIM,)),
+        ("dtype", "S8"),
+        ("seq", "<u8"),  # 마지막으로 완성된 프레임 번호 (0 = 아직 없음)
+    ]
+)
+HEADER_SIZE = 64
+
+SLOT_DTYPE = np.dtype(
+    [
+        ("seq", "<u8"),  # 슬롯에 담긴 프레임 번호 (0 = 쓰는 중)
+        ("ts", "<f8"),  # 촬영 시각
+    ]
+)
+
+_ALIGN = 64
+
+
+def _align(n):
+    return (n + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _layout(shape, dtype, slots):
+    frame_size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    data_offset = _align(HEADER_SIZE + slots * SLOT_DTYPE.itemsize)
+    stride = _align(frame_size)
+    return data_offset, stride, data_offset + stride * slots
+
 
 class FrameBuffer:
-    def __init__(self, name, shape, dtype=np.uint8, create=False):
+    """헤더 + N 슬롯 공유 메모리 프레임 버퍼
+
+    생산자(create=True)는 shape / dtype 을 헤더에 기록하고, 소비자는 헤더에서 읽는다.
+    쓰기: 슬롯 seq 를 0 으로 → 프레임 복사 → 촬영 시각 / seq 기록 → 헤더 seq 갱신.
+    읽기: read_latest() 가 최신 완성 프레임의 뷰를 돌려주고, 사용을 마친 뒤
+    validate(seq) 로 그 사이 생산자가 슬롯을 덮어쓰지 않았는지 확인한다.
+    """
+
+    def __init__(
+        self, name, shape=None, dtype=np.uint8, create=False, slots=FRAME_SLOTS
+    ):
         self.name = name
-        self.shape = tuple(shape)
-        self.dtype = dtype
-        self.size = int(np.prod(shape) * np.dtype(dtype).itemsize)
 
         if create:
+            if shape is None:
+                raise ValueError("shape is required to create a FrameBuffer")
+            if len(shape) > MAX_NDIM:
+                raise ValueError(f"Frame ndim {len(shape)} > {MAX_NDIM}")
+
+            self.shape = tuple(shape)
+            self.dtype = np.dtype(dtype)
+            self.slots = slots
+            _, _, size = _layout(self.shape, self.dtype, slots)
+
             try:
                 shm = shared_memory.SharedMemory(name=name)
                 shm.close()
                 shm.unlink()
             except FileNotFoundError:
                 pass
-            self.shm = shared_memory.SharedMemory(
-                name=name, create=True, size=self.size
-            )
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+
+            header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.shm.buf)
+            header["seq"] = 0
+            header["slots"] = slots
+            header["ndim"] = len(self.shape)
+            header["shape"] = list(self.shape) + [0] * (MAX_NDIM - len(self.shape))
+            header["dtype"] = self.dtype.str.encode()
+            header["version"] = FRAME_VERSION
+            header["magic"] = FRAME_MAGIC  # 마지막에 기록 (소비자는 magic 으로 초기화 완료 판단)
         else:
             self.shm = shared_memory.SharedMemory(name=name)
+            if self.shm.size < HEADER_SIZE:
+                self.shm.close()
+                raise ValueError(f"Frame buffer too small: {name}")
 
-        self.frame = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+            header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.shm.buf)
+            magic, version = header["magic"].item(), int(header["version"])
+            if magic != FRAME_MAGIC or version != FRAME_VERSION:
+                self.shm.close()
+                raise ValueError(
+                    f"Unknown frame buffer layout: {name} "
+                    f"(magic={magic!r}, version={version})"
+                )
 
-    def write(self, frame):
+            ndim = int(header["ndim"])
+            self.shape = tuple(int(d) for d in header["shape"][:ndim])
+            self.dtype = np.dtype(header["dtype"].item().decode())
+            self.slots = int(header["slots"])
+
+            if shape is not None and tuple(shape) != self.shape:
+                self.shm.close()
+                raise ValueError(
+                    f"Frame shape mismatch: {tuple(shape)} != {self.shape}"
+                )
+
+        self._header = header
+        self._slot_table = np.ndarray(
+            (self.slots,), dtype=SLOT_DTYPE, buffer=self.shm.buf, offset=HEADER_SIZE
+        )
+
+        data_offset, stride, _ = _layout(self.shape, self.dtype, self.slots)
+        self.size = int(np.prod(self.shape)) * self.dtype.itemsize
+        self.frames = [
+            np.ndarray(
+                self.shape,
+                dtype=self.dtype,
+                buffer=self.shm.buf,
+                offset=data_offset + i * stride,
+            )
+            for i in range(self.slots)
+        ]
+
+        self.torn = 0  # 읽는 중 덮어써져 버린 프레임 수 (소비자 측)
+
+    @property
+    def seq(self):
+        return int(self._header["seq"])
+
+    def write(self, frame, ts=None):
         if frame.shape != self.shape:
             raise ValueError(f"Frame shape mismatch: {frame.shape} != {self.shape}")
         if frame.dtype != self.dtype:
             raise ValueError(f"Frame dtype mismatch: {frame.dtype} != {self.dtype}")
-        self.frame[:] = frame[:]
+
+        seq = self.seq + 1
+        slot = self._slot_table[(seq - 1) % self.slots]
+
+        slot["seq"] = 0
+        np.copyto(self.frames[(seq - 1) % self.slots], frame)
+        slot["ts"] = time.time() if ts is None else ts
+        slot["seq"] = seq
+        self._header["seq"] = seq
+        return seq
+
+    def read_latest(self, last_seq=0, retries=3):
+        """last_seq 이후의 최신 완성 프레임 (seq, 촬영 시각, 뷰), 새 프레임이 없으면 None
+
+        뷰는 생산자가 (slots - 1) 프레임을 더 쓰기 전까지 유효하다.
+        """
+        for _ in range(retries):
+            seq = self.seq
+            if seq == 0 or seq <= last_seq:
+                return None
+
+            idx = (seq - 1) % self.slots
+            slot = self._slot_table[idx]
+            ts = float(slot["ts"])
+            if int(slot["seq"]) == seq:
+                return seq, ts, self.frames[idx]
+
+        self.torn += 1
+        return None
+
+    def validate(self, seq):
+        """read_latest() 로 받은 seq 프레임이 아직 덮어써지지 않았는지"""
+        return int(self._slot_table[(seq - 1) % self.slots]["seq"]) == seq
 
     def read(self):
-        return self.frame
+        """최신 완성 프레임의 뷰 (아직 없으면 None)"""
+        latest = self.read_latest()
+        return None if latest is None else latest[2]
 
     def close(self):
+        self.frames = []
+        self._header = None
+        self._slot_table = None
         self.shm.close()
 
     def unlink(self):